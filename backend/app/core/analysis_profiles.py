@@ -0,0 +1,90 @@
+"""
+Voice analysis quality profiles.
+
+- "accurate": 16 kHz, n_fft=2048, hop 512 (32 ms), 128 mel bands (the original settings)
+- "fast":     8 kHz, n_fft=512, hop 320 (40 ms), 40 mel bands; roughly a quarter of
+              the samples and a much smaller FFT per frame
+
+Requests use "accurate" unless they ask for "fast" or for "auto", which uses
+"fast" while more than VOICE_FAST_PROFILE_THRESHOLD analyses are already
+running. "fast" is opt-in because the classifier's thresholds were set on
+accurate-profile MFCCs and the two disagree on many clips. A trained model
+(VOICE_MODEL_PATH) only accepts MFCCs of the profile it was trained on
+(`trained_profile`): "auto" resolves to that profile and other explicit
+requests are rejected.
+Compare latency and classifier agreement with `python -m benchmarks.bench_profiles`.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from app.core.audio_features import N_FFT, HOP_LENGTH, N_MELS
+from app.core.metrics import increment, set_max
+
+ACCURATE = "accurate"
+FAST = "fast"
+AUTO = "auto"
+
+PROFILES = {
+    ACCURATE: {"sample_rate": 16000, "n_fft": N_FFT, "hop_length": HOP_LENGTH, "n_mels": N_MELS},
+    FAST: {"sample_rate": 8000, "n_fft": 512, "hop_length": 320, "n_mels": 40},
+}
+
+FAST_PROFILE_THRESHOLD = int(os.getenv("VOICE_FAST_PROFILE_THRESHOLD", str(2 * (os.cpu_count() or 2))))
+
+_active_lock = threading.Lock()
+_active = 0
+
+
+def active_analyses() -> int:
+    with _active_lock:
+        return _active
+
+
+def allowed_profiles(classifier=None) -> tuple:
+    """Profiles whose MFCCs `classifier` accepts (a trained model only the one it was trained on)."""
+    trained = getattr(classifier, "trained_profile", None)
+    return (trained,) if trained else tuple(PROFILES)
+
+
+def validate_profile(requested: str, classifier=None):
+    """
+    Raises:
+        ValueError: for an unknown profile, or one the classifier wasn't trained on
+    """
+    if requested != AUTO and requested not in PROFILES:
+        raise ValueError(f"Unknown analysis profile '{requested}'. Use one of: {', '.join(PROFILES)}, {AUTO}")
+    allowed = allowed_profiles(classifier)
+    if requested != AUTO and requested not in allowed:
+        raise ValueError(
+            f"The '{requested}' profile is not available with the loaded voice model "
+            f"(trained on '{allowed[0]}' features)."
+        )
+
+
+def choose_profile(requested: str = AUTO, classifier=None) -> str:
+    """Resolve a requested profile name for `classifier` ("auto" picks by current load)."""
+    validate_profile(requested, classifier)
+    if requested != AUTO:
+        return requested
+    allowed = allowed_profiles(classifier)
+    if FAST in allowed and active_analyses() >= FAST_PROFILE_THRESHOLD:
+        increment("profiles", "auto_fast")
+        return FAST
+    return ACCURATE if ACCURATE in allowed else allowed[0]
+
+
+@contextmanager
+def analysis_slot(profile: str):
+    """Count an analysis as running (drives the "auto" choice)."""
+    global _active
+    with _active_lock:
+        _active += 1
+        current = _active
+    set_max("profiles", "peak_active", current)
+    increment("profiles", profile)
+    try:
+        yield
+    finally:
+        with _active_lock:
+            _active -= 1
@@ -0,0 +1,164 @@
+"""
+Fast in-process audio decoding for voice uploads.
+
+Sniffs the container from the first bytes instead of letting librosa try
+soundfile and then fall back to audioread (which shells out to ffmpeg):
+- WAV / FLAC / OGG / MP3 decode directly through soundfile (libsndfile)
+- WebM / Matroska / MP4 (browser MediaRecorder output) decode in-process via PyAV
+Resampling goes through soxr at a configurable quality
+(VOICE_RESAMPLE_QUALITY = QQ | LQ | MQ | HQ | VHQ, default HQ).
+"""
+
+import io
+import os
+import time
+from typing import Tuple
+import numpy as np
+import soundfile as sf
+import soxr
+from app.core.metrics import record_timing, increment
+
+try:
+    import av
+except ImportError:  # PyAV is optional; compressed containers then use librosa/audioread
+    av = None
+
+RESAMPLE_QUALITY = os.getenv("VOICE_RESAMPLE_QUALITY", "HQ").upper()
+
+SOUNDFILE_FORMATS = {"wav", "flac", "ogg", "mp3"}
+CONTAINER_FORMATS = {"webm", "mp4"}
+
+
+def sniff_format(data) -> str:
+    """Identify the audio container from its magic bytes."""
+    head = bytes(data[:12])
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return "unknown"
+
+
+class _BufferReader(io.RawIOBase):
+    """Seekable read-only file over a memoryview/bytearray without copying it (BytesIO would)."""
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), len(self._view) - self._pos)
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+def _open(data):
+    """File object over encoded audio; bytes are shared by BytesIO, other buffers are wrapped."""
+    return io.BytesIO(data) if isinstance(data, bytes) else _BufferReader(data)
+
+
+def _to_mono(audio: np.ndarray) -> np.ndarray:
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def _decode_soundfile(data) -> Tuple[np.ndarray, int]:
+    audio, sr = sf.read(_open(data), dtype="float32", always_2d=False)
+    return _to_mono(audio), sr
+
+
+def _decode_av(data) -> Tuple[np.ndarray, int]:
+    """Decode any FFmpeg-supported container in-process to mono float32."""
+    chunks = []
+    with av.open(_open(data), mode="r") as container:
+        stream = container.streams.audio[0]
+        sr = stream.codec_context.sample_rate or stream.rate
+        # Downmix to packed mono float32 at the native rate; soxr handles resampling
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=sr)
+        for frame in container.decode(stream):
+            for out in resampler.resample(frame):
+                chunks.append(out.to_ndarray().reshape(-1))
+        for out in resampler.resample(None):
+            chunks.append(out.to_ndarray().reshape(-1))
+    audio = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    return np.ascontiguousarray(audio, dtype=np.float32), sr
+
+
+def _decode_librosa(data) -> Tuple[np.ndarray, int]:
+    """Last-resort decoder (audioread subprocess); counted so it shows up in metrics."""
+    import librosa
+    audio, sr = librosa.load(io.BytesIO(bytes(data)), sr=None, mono=True)
+    return np.ascontiguousarray(audio, dtype=np.float32), sr
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int, quality: str = None) -> np.ndarray:
+    """Resample with soxr; returns the input unchanged when rates match."""
+    if orig_sr == target_sr or audio.size == 0:
+        return audio
+    return soxr.resample(audio, orig_sr, target_sr, quality=quality or RESAMPLE_QUALITY).astype(np.float32, copy=False)
+
+
+def decode_audio(data, target_sr: int = 16000) -> Tuple[np.ndarray, int]:
+    """
+    Decode encoded audio bytes to mono float32 at `target_sr`.
+
+    Args:
+        data: Encoded audio (bytes, bytearray or memoryview)
+        target_sr: Output sample rate
+
+    Returns:
+        audio: 1D float32 array
+        sr: Sample rate of `audio` (== target_sr)
+    """
+    fmt = sniff_format(data)
+    start = time.perf_counter()
+
+    if fmt in SOUNDFILE_FORMATS:
+        try:
+            audio, sr = _decode_soundfile(data)
+            decoder = "soundfile"
+        except Exception:
+            # e.g. libsndfile built without MP3/Opus support
+            audio, sr = (_decode_av(data) if av is not None else _decode_librosa(data))
+            decoder = "av" if av is not None else "audioread"
+    elif av is not None:
+        audio, sr = _decode_av(data)
+        decoder = "av"
+    else:
+        audio, sr = _decode_librosa(data)
+        decoder = "audioread"
+
+    decoded_at = time.perf_counter()
+    audio = resample(audio, sr, target_sr)
+    finished = time.perf_counter()
+
+    record_timing("decode", fmt, (decoded_at - start) * 1000)
+    record_timing("resample", f"{sr}->{target_sr}", (finished - decoded_at) * 1000)
+    increment("decoder", decoder)
+    print(f"🎧 Decoded {fmt} via {decoder} in {(decoded_at - start) * 1000:.1f}ms "
+          f"(+{(finished - decoded_at) * 1000:.1f}ms resample {sr}->{target_sr}Hz)")
+    return audio, target_sr
@@ -0,0 +1,147 @@
+"""
+Fused audio feature engine for voice stress analysis.
+
+Computes a single framing + power spectrogram per clip and derives MFCC,
+spectral centroid, RMS and zero-crossing rate from it with vectorized NumPy.
+Matches the librosa defaults previously used in `extract_mfcc_features`
+(center=True, zero padding, periodic Hann window, Slaney mel filterbank,
+power_to_db with top_db=80, orthonormal DCT-II).
+"""
+
+from functools import lru_cache
+from typing import Dict
+import numpy as np
+import librosa
+
+N_MFCC = 20
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+TOP_DB = 80.0
+AMIN = 1e-10
+ZCR_THRESHOLD = 1e-10
+
+
+@lru_cache(maxsize=8)
+def get_window(n_fft: int) -> np.ndarray:
+    """Periodic Hann window (same as scipy.signal.get_window('hann', fftbins=True))."""
+    return (0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+
+
+@lru_cache(maxsize=8)
+def get_mel_basis(sr: int, n_fft: int, n_mels: int = N_MELS) -> np.ndarray:
+    """Cached Slaney-normalized mel filterbank of shape (n_mels, 1 + n_fft // 2)."""
+    return librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels).astype(np.float32)
+
+
+@lru_cache(maxsize=8)
+def get_dct_matrix(n_mfcc: int, n_mels: int = N_MELS) -> np.ndarray:
+    """Cached orthonormal DCT-II matrix truncated to the first n_mfcc rows."""
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)[:, None]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+    basis[0] *= np.sqrt(0.5)
+    return basis.astype(np.float32)
+
+
+@lru_cache(maxsize=8)
+def get_fft_frequencies(sr: int, n_fft: int) -> np.ndarray:
+    """Center frequency of each rfft bin."""
+    return np.linspace(0, sr / 2, 1 + n_fft // 2, dtype=np.float32)
+
+
+def frame_signal(audio: np.ndarray, n_fft: int = N_FFT, hop_length: int = HOP_LENGTH) -> np.ndarray:
+    """
+    Zero-pad the signal by n_fft // 2 on both sides and return a strided
+    (n_frames, n_fft) view of it. No samples are copied.
+    """
+    padded = np.pad(audio, n_fft // 2, mode="constant")
+    return np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop_length]
+
+
+def power_spectrogram(frames: np.ndarray, n_fft: int = N_FFT) -> np.ndarray:
+    """Power spectrogram of shape (1 + n_fft // 2, n_frames) from framed audio."""
+    spectrum = np.fft.rfft(frames * get_window(n_fft), n=n_fft, axis=1)
+    return (spectrum.real ** 2 + spectrum.imag ** 2).T
+
+
+def log_mel_from_power(power: np.ndarray, sr: int, n_fft: int = N_FFT, n_mels: int = N_MELS) -> np.ndarray:
+    """Unclipped log-mel spectrogram in dB (ref=1.0)."""
+    mel = get_mel_basis(sr, n_fft, n_mels) @ power
+    return 10.0 * np.log10(np.maximum(mel, AMIN))
+
+
+def mfcc_from_log_mel(log_mel: np.ndarray, n_mfcc: int = N_MFCC, top_db: float = TOP_DB) -> np.ndarray:
+    """Apply the global top_db floor and project onto the cached DCT basis."""
+    if log_mel.size and top_db is not None:
+        log_mel = np.maximum(log_mel, log_mel.max() - top_db)
+    return get_dct_matrix(n_mfcc, log_mel.shape[0]) @ log_mel
+
+
+def spectral_centroid_from_power(power: np.ndarray, sr: int, n_fft: int = N_FFT) -> np.ndarray:
+    """Spectral centroid per frame, computed on the magnitude spectrum."""
+    magnitude = np.sqrt(power)
+    total = magnitude.sum(axis=0)
+    total = np.where(total < np.finfo(magnitude.dtype).tiny, 1.0, total)
+    return (get_fft_frequencies(sr, n_fft) @ magnitude) / total
+
+
+def rms_from_frames(frames: np.ndarray) -> np.ndarray:
+    """Root-mean-square energy per (unwindowed) frame."""
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames) / frames.shape[1])
+
+
+def zero_crossing_rate(audio: np.ndarray, n_fft: int = N_FFT, hop_length: int = HOP_LENGTH) -> np.ndarray:
+    """
+    Zero-crossing rate per frame using a cumulative sum over sample-level
+    sign changes instead of re-framing the signal (edge padding, as librosa).
+    """
+    padded = np.pad(audio, n_fft // 2, mode="edge")
+    signs = np.signbit(np.where(np.abs(padded) <= ZCR_THRESHOLD, 0, padded))
+    crossings = np.concatenate(([0], np.cumsum(signs[1:] != signs[:-1])))
+    n_frames = 1 + (len(padded) - n_fft) // hop_length
+    starts = np.arange(n_frames) * hop_length
+    return (crossings[starts + n_fft - 1] - crossings[starts]) / n_fft
+
+
+def compute_features(
+    audio: np.ndarray,
+    sr: int,
+    n_mfcc: int = N_MFCC,
+    n_fft: int = N_FFT,
+    hop_length: int = HOP_LENGTH,
+    n_mels: int = N_MELS,
+) -> Dict[str, np.ndarray]:
+    """
+    Compute all frame-level features from one shared framing/spectrogram.
+
+    Returns:
+        Dict with "mfcc" (n_mfcc, n_frames) plus "zcr", "spectral_centroid"
+        and "rms" (each (n_frames,)).
+    """
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    frames = frame_signal(audio, n_fft, hop_length)
+    power = power_spectrogram(frames, n_fft)
+
+    return {
+        "mfcc": mfcc_from_log_mel(log_mel_from_power(power, sr, n_fft, n_mels), n_mfcc),
+        "zcr": zero_crossing_rate(audio, n_fft, hop_length),
+        "spectral_centroid": spectral_centroid_from_power(power, sr, n_fft),
+        "rms": rms_from_frames(frames),
+    }
+
+
+def summarize_features(features: Dict[str, np.ndarray], duration: float) -> dict:
+    """Scalar summary returned to clients as `mfccFeatures`."""
+    mfcc = features["mfcc"]
+    return {
+        "duration": float(duration),
+        "mean_mfcc": float(np.mean(mfcc)),
+        "std_mfcc": float(np.std(mfcc)),
+        "var_mfcc": float(np.var(mfcc)),
+        "mean_zcr": float(np.mean(features["zcr"])),
+        "mean_spectral_centroid": float(np.mean(features["spectral_centroid"])),
+        "mean_rms": float(np.mean(features["rms"])),
+        "speech_ratio": float(features.get("speech_ratio", 1.0)),
+        "mfcc_shape": list(mfcc.shape)
+    }
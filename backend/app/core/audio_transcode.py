@@ -0,0 +1,116 @@
+"""
+In-memory transcoding of recordings before they are uploaded to Groq Whisper.
+
+Upload size is the main driver of transcription latency, so audio is
+downmixed to 16 kHz mono and re-encoded as low-bitrate Ogg/Opus entirely in
+memory (PyAV, no temp files or ffmpeg subprocess). Inputs that are already
+compact are forwarded unchanged.
+"""
+
+import io
+import os
+import time
+from typing import Optional, Tuple
+import numpy as np
+from app.core.audio_decode import decode_audio, sniff_format, av
+from app.core.metrics import increment, record_timing
+
+WHISPER_SAMPLE_RATE = 16000
+TRANSCODE_BITRATE = int(os.getenv("WHISPER_UPLOAD_BITRATE", "24000"))  # bits/s, speech quality
+# Opus/Vorbis uploads at or below this rate are already compact (~48 kbps)
+COMPACT_BYTES_PER_SECOND = int(os.getenv("WHISPER_COMPACT_BYTES_PER_SECOND", "6000"))
+# Below this size transcoding cannot save meaningful upload time
+MIN_TRANSCODE_BYTES = int(os.getenv("WHISPER_MIN_TRANSCODE_BYTES", str(64 * 1024)))
+
+COMPRESSED_SPEECH_FORMATS = {"webm", "ogg"}
+EXTENSIONS = {"wav": "wav", "flac": "flac", "ogg": "ogg", "mp3": "mp3", "webm": "webm", "mp4": "m4a"}
+
+
+def encode_opus(audio: np.ndarray, sr: int = WHISPER_SAMPLE_RATE, bitrate: int = TRANSCODE_BITRATE) -> bytes:
+    """Encode mono float32 samples as Ogg/Opus in memory."""
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format="ogg") as container:
+        stream = container.add_stream("libopus", rate=sr, layout="mono")
+        stream.bit_rate = bitrate
+        frame = av.AudioFrame.from_ndarray(
+            np.ascontiguousarray(audio, dtype=np.float32).reshape(1, -1), format="flt", layout="mono"
+        )
+        frame.sample_rate = sr
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def prepare_for_transcription(
+    audio_bytes,
+    filename: Optional[str] = None,
+    audio: Optional[np.ndarray] = None,
+    trimmed: bool = False,
+) -> Tuple[bytes, str, dict]:
+    """
+    Shrink a recording for the Whisper upload.
+
+    Args:
+        audio_bytes: Original upload (bytes or memoryview)
+        filename: Original filename, used when the input is passed through
+        audio: Already-decoded 16 kHz mono samples, if the caller has them
+        trimmed: `audio` had silence removed (VAD), so re-encoding it is worthwhile
+            even when the original is already compact
+
+    Returns:
+        payload: Bytes to upload
+        filename: Filename matching the payload's container
+        info: {"transcoded", "format", "original_bytes", "upload_bytes", "bytes_saved", "transcode_ms"}
+    """
+    fmt = sniff_format(audio_bytes)
+    original_size = len(audio_bytes)
+    info = {
+        "transcoded": False,
+        "format": fmt,
+        "original_bytes": original_size,
+        "upload_bytes": original_size,
+        "bytes_saved": 0,
+        "transcode_ms": 0.0
+    }
+    passthrough_name = filename or f"recording.{EXTENSIONS.get(fmt, 'webm')}"
+
+    if av is None or original_size < MIN_TRANSCODE_BYTES:
+        increment("transcode", "skipped")
+        return bytes(audio_bytes), passthrough_name, info
+
+    start = time.perf_counter()
+    try:
+        if audio is None:
+            audio, _ = decode_audio(audio_bytes, WHISPER_SAMPLE_RATE)
+        duration = len(audio) / WHISPER_SAMPLE_RATE
+
+        if not trimmed and fmt in COMPRESSED_SPEECH_FORMATS and duration > 0 and original_size / duration <= COMPACT_BYTES_PER_SECOND:
+            increment("transcode", "skipped")
+            return bytes(audio_bytes), passthrough_name, info
+
+        payload = encode_opus(audio)
+    except Exception as e:
+        # Whisper can still handle the original upload
+        print(f"⚠️ Transcoding failed, uploading original audio: {e}")
+        increment("transcode", "failed")
+        return bytes(audio_bytes), passthrough_name, info
+
+    info["transcode_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    if len(payload) >= original_size:
+        increment("transcode", "skipped")
+        return bytes(audio_bytes), passthrough_name, info
+
+    info.update({
+        "transcoded": True,
+        "upload_bytes": len(payload),
+        "bytes_saved": original_size - len(payload)
+    })
+    increment("transcode", "transcoded")
+    increment("transcode", "bytes_saved", info["bytes_saved"])
+    record_timing("transcode", fmt, info["transcode_ms"])
+    print(f"🗜️ Transcoded {fmt} {original_size / 1024:.0f}KB → ogg/opus {len(payload) / 1024:.0f}KB "
+          f"(saved {info['bytes_saved'] / original_size:.0%}) in {info['transcode_ms']:.0f}ms")
+    return payload, "recording.ogg", info
@@ -0,0 +1,92 @@
+"""
+Circuit breaker for an external dependency (used for the MongoDB connection).
+
+Closed: calls go through. After a connection failure the breaker opens and
+callers skip the dependency (using their fallback) until a reconnect probe
+succeeds. Probes are spaced with exponential backoff and jitter, from
+`initial_backoff` up to `max_backoff` seconds. Transitions are counted under
+the breaker's metrics group (opened, closed, probes, probe_failures) and the
+time spent open is recorded as the `open` timing.
+"""
+
+import random
+import threading
+import time
+from typing import Optional
+from app.core.metrics import increment, record_timing
+
+CLOSED = "closed"
+OPEN = "open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, initial_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.name = name
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.state = CLOSED
+        self.backoff = initial_backoff
+        self.next_probe = 0.0
+        self.opened_at: Optional[float] = None
+        self.probe_failures = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def _schedule_probe(self):
+        self.next_probe = time.monotonic() + self.backoff * random.uniform(0.8, 1.2)
+
+    def open(self, error) -> bool:
+        """Open after a failure; returns True if the breaker was closed until now."""
+        with self._lock:
+            self.last_error = str(error)
+            if self.state == OPEN:
+                return False
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.backoff = self.initial_backoff
+            self.probe_failures = 0
+            self._schedule_probe()
+        increment(self.name, "opened")
+        print(f"🔌 {self.name} circuit opened: {error}")
+        return True
+
+    def probe_due(self) -> bool:
+        return self.state == OPEN and time.monotonic() >= self.next_probe
+
+    def probe_failed(self, error):
+        """Record a failed reconnect probe and back off further."""
+        with self._lock:
+            self.last_error = str(error)
+            self.probe_failures += 1
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            self._schedule_probe()
+        increment(self.name, "probes")
+        increment(self.name, "probe_failures")
+
+    def close(self):
+        """A probe succeeded: let traffic through again."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            self.state = CLOSED
+            open_seconds = time.monotonic() - self.opened_at
+        increment(self.name, "probes")
+        increment(self.name, "closed")
+        record_timing(self.name, "open", open_seconds * 1000)
+        print(f"🔌 {self.name} circuit closed after {open_seconds:.1f}s")
+
+    def status(self) -> dict:
+        with self._lock:
+            status = {"state": self.state, "lastError": self.last_error}
+            if self.state == OPEN:
+                now = time.monotonic()
+                status.update({
+                    "openSeconds": round(now - self.opened_at, 1),
+                    "probeFailures": self.probe_failures,
+                    "nextProbeIn": round(max(0.0, self.next_probe - now), 1)
+                })
+            return status
@@ -0,0 +1,155 @@
+"""
+Per-user index for the conversation file fallback.
+
+Listing a user's conversations used to open and parse every file in
+data/conversations. The index keeps one small JSON file per user under
+`<conversations dir>/_index/` mapping sessionId to the summary fields the
+list endpoint returns (savedAt, messageCount, mainEmotion, riskLevel), so a
+listing reads a single file. Entries are updated on every save and delete;
+each index file is rewritten through a temporary file and `os.replace`, so
+readers never see a partial write.
+
+A `BUILT` marker records that the index is complete. Without it (first start
+after upgrading, or after deleting `_index/`), the index is rebuilt from the
+conversation files on first use; `python -m tools.rebuild_conversation_index`
+does the same on demand.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Callable, Iterable, List, Optional
+
+INDEX_DIRNAME = "_index"
+BUILT_MARKER = "BUILT"
+ANONYMOUS = "anonymous"
+
+
+def shard_of(key: str, chars: int = 2) -> str:
+    """Fan-out directory for `key` (first hex chars of its SHA-1)."""
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:chars]
+
+
+def summarize(doc: dict) -> dict:
+    return {
+        "sessionId": doc["sessionId"],
+        "savedAt": doc["savedAt"],
+        "messageCount": doc["messageCount"],
+        "mainEmotion": doc.get("mainEmotion", "neutral"),
+        "riskLevel": doc.get("riskLevel", "low")
+    }
+
+
+def _write_atomic(path: str, data: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+class UserIndex:
+    """sessionId -> summary per user, one JSON file each (synchronous; call from a worker thread)."""
+
+    def __init__(self, conversations_dir: str):
+        self.directory = os.path.join(conversations_dir, INDEX_DIRNAME)
+        self._lock = threading.Lock()
+
+    def _path(self, user_id: str, directory: Optional[str] = None) -> str:
+        digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+        return os.path.join(directory or self.directory, digest[:2], f"{digest}.json")
+
+    def _read(self, path: str, user_id: str) -> dict:
+        if not os.path.exists(path):
+            return {"userId": user_id, "sessions": {}}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @property
+    def built(self) -> bool:
+        return os.path.exists(os.path.join(self.directory, BUILT_MARKER))
+
+    def ensure(self, scan: Callable[[], Iterable[dict]]):
+        """Build the index from `scan()` if it has never been built."""
+        if not self.built:
+            with self._lock:
+                if not self.built:
+                    self._build(scan())
+
+    def entries(self, user_id: str) -> List[dict]:
+        path = self._path(user_id or ANONYMOUS)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            sessions = json.load(f)["sessions"]
+        return [{"sessionId": session_id, **summary} for session_id, summary in sessions.items()]
+
+    def all_entries(self) -> List[dict]:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                if filename.endswith(".json"):
+                    with open(os.path.join(root, filename), 'r', encoding='utf-8') as f:
+                        sessions = json.load(f)["sessions"]
+                    entries.extend({"sessionId": sid, **summary} for sid, summary in sessions.items())
+        return entries
+
+    def upsert(self, doc: dict, previous_user: Optional[str] = None):
+        """Record a saved conversation (moving it if its userId changed)."""
+        user_id = doc.get("userId") or ANONYMOUS
+        summary = summarize(doc)
+        del summary["sessionId"]
+        with self._lock:
+            if previous_user is not None and previous_user != user_id:
+                self._remove(previous_user, doc["sessionId"])
+            path = self._path(user_id)
+            index = self._read(path, user_id)
+            index["sessions"][doc["sessionId"]] = summary
+            _write_atomic(path, index)
+
+    def remove(self, user_id: Optional[str], session_id: str):
+        with self._lock:
+            self._remove(user_id or ANONYMOUS, session_id)
+
+    def _remove(self, user_id: str, session_id: str):
+        path = self._path(user_id)
+        index = self._read(path, user_id)
+        if index["sessions"].pop(session_id, None) is None:
+            return
+        if index["sessions"]:
+            _write_atomic(path, index)
+        else:
+            os.remove(path)
+
+    def rebuild(self, docs: Iterable[dict]) -> dict:
+        """Replace the index with one built from `docs`; returns counts."""
+        with self._lock:
+            return self._build(docs)
+
+    def _build(self, docs: Iterable[dict]) -> dict:
+        users = {}
+        count = 0
+        for doc in docs:
+            user_id = doc.get("userId") or ANONYMOUS
+            summary = summarize(doc)
+            del summary["sessionId"]
+            users.setdefault(user_id, {})[doc["sessionId"]] = summary
+            count += 1
+
+        # Build next to the live index, then swap it in
+        staging = f"{self.directory}.building"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for user_id, sessions in users.items():
+            _write_atomic(self._path(user_id, staging), {"userId": user_id, "sessions": sessions})
+        open(os.path.join(staging, BUILT_MARKER), 'w').close()
+
+        old = f"{self.directory}.old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(self.directory):
+            os.replace(self.directory, old)
+        os.replace(staging, self.directory)
+        shutil.rmtree(old, ignore_errors=True)
+        return {"conversations": count, "users": len(users)}
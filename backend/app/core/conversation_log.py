@@ -0,0 +1,118 @@
+"""
+Append-only conversation saves.
+
+Every stored message carries a sequence number `seq` (1-based); a
+conversation's `messageCount` is the seq of its last message. Clients send
+only the messages added after the last seq they know the server has
+(`afterSeq`), so a save writes the new messages instead of the whole
+history. Messages a resent batch shares with what is already stored are
+skipped (like overlapping upload chunks); a batch that starts past the stored
+messages is rejected with the current seq so the client can resend from there.
+
+The conversation document keeps the newest CONVERSATION_HOT_WINDOW messages
+(default 100). In MongoDB older messages overflow into the
+`conversation_archive` collection, one chunk document per overflow; the file
+and SQLite stores keep every message in an append-only log and read the hot
+window from its tail. Nothing is dropped.
+
+Documents saved before sequence numbers hold the last messages of the
+conversation without `seq`; `with_seq` numbers them from `messageCount`.
+"""
+
+import os
+from datetime import datetime
+from typing import List, Optional
+from app.core.metrics import increment
+
+HOT_WINDOW = int(os.getenv("CONVERSATION_HOT_WINDOW", "100"))
+ARCHIVE_COLLECTION = "conversation_archive"
+METADATA_FIELDS = ("intakeSummary", "mainEmotion", "riskLevel")
+
+
+class SequenceGap(Exception):
+    """A batch starts after the last stored message (some messages in between were never received)."""
+
+    def __init__(self, after_seq: int, current: int):
+        super().__init__(f"Messages after seq {after_seq} do not follow the stored conversation; resume after seq {current}.")
+        self.after_seq = after_seq
+        self.current = current
+
+
+def new_messages(after_seq: int, messages: List[dict], current: int) -> List[dict]:
+    """
+    The part of a batch sent after `after_seq` that is not stored yet, numbered
+    from `current` (the stored messageCount).
+
+    Raises:
+        SequenceGap: if `after_seq` is past `current`
+    """
+    if after_seq > current:
+        raise SequenceGap(after_seq, current)
+    overlap = min(len(messages), current - after_seq)
+    if overlap:
+        increment("conversations", "retransmitted_messages", overlap)
+    return number(messages[overlap:], current)
+
+
+def number(messages: List[dict], after_seq: int = 0) -> List[dict]:
+    return [{**message, "seq": after_seq + i + 1} for i, message in enumerate(messages)]
+
+
+def with_seq(messages: List[dict], message_count: int) -> List[dict]:
+    """Stored messages with their seq; unnumbered ones are the last messages before `message_count`."""
+    first = message_count - len(messages) + 1
+    return [message if "seq" in message else {**message, "seq": first + i} for i, message in enumerate(messages)]
+
+
+def overflow(head: List[dict], message_count: int, new: List[dict]) -> List[dict]:
+    """
+    Messages pushed out of the hot window by appending `new`, oldest first.
+
+    `head` is the start of the window before the append (its first len(new)
+    messages, or all of them) and `message_count` the count before it; the
+    window always holds min(messageCount, HOT_WINDOW) messages. A batch longer
+    than the window overflows itself too: its oldest messages never reach the
+    window but still have to be archived.
+    """
+    hot = min(message_count, HOT_WINDOW)
+    dropped = max(0, hot + len(new) - HOT_WINDOW)
+    first = message_count - hot + 1
+    return [
+        message if "seq" in message else {**message, "seq": first + i}
+        for i, message in enumerate(head[:min(dropped, hot)])
+    ] + new[:max(0, len(new) - HOT_WINDOW)]
+
+
+def archive_chunk(session_id: str, messages: List[dict]) -> dict:
+    first = messages[0]["seq"]
+    return {
+        "_id": f"{session_id}:{first:012d}",
+        "sessionId": session_id,
+        "firstSeq": first,
+        "lastSeq": messages[-1]["seq"],
+        "messages": messages
+    }
+
+
+def metadata(fields: dict, message_count: int) -> dict:
+    """Fields set on every append: savedAt, messageCount and any metadata the client sent."""
+    changes = {key: fields[key] for key in METADATA_FIELDS if fields.get(key) is not None}
+    changes["savedAt"] = datetime.now().isoformat()
+    changes["messageCount"] = message_count
+    return changes
+
+
+def new_conversation(session_id: str, fields: dict) -> dict:
+    return {
+        "sessionId": session_id,
+        "userId": fields.get("userId"),
+        "messages": [],
+        **metadata(fields, 0)
+    }
+
+
+def page(messages: List[dict], before_seq: Optional[int], limit: int) -> List[dict]:
+    """The last `limit` of `messages` (numbered, oldest first) with seq below `before_seq`."""
+    if before_seq is not None:
+        messages = [message for message in messages if message["seq"] < before_seq]
+    return messages[-limit:] if limit > 0 else []
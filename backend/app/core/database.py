@@ -1,55 +1,146 @@
 """
 MongoDB database connection and configuration.
 Uses MongoDB Atlas free tier (M0 cluster - 512MB storage).
+
+Connection failures open a circuit breaker: while it is open, `get_database`
+and `get_async_database` return None immediately (callers use their file
+fallback) instead of waiting out a server-selection timeout on every call,
+and a background task pings the cluster with exponential backoff
+(MONGO_RECONNECT_MIN_SECONDS up to MONGO_RECONNECT_MAX_SECONDS) until it
+answers again. Breaker transitions are counted in the "mongo" metrics group.
 """
 
 import os
+import time
+import asyncio
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
+from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.conversation_log import ARCHIVE_COLLECTION
+from app.core.metrics import increment
 
 load_dotenv()
 
 MONGODB_URL = os.getenv("MONGODB_URL")
 
-# Global MongoDB client
+PLACEHOLDER_URL = "mongodb+srv://<username>:<password>@cluster0.xxxxx.mongodb.net/?retryWrites=true&w=majority"
+CLIENT_OPTIONS = {
+    "serverSelectionTimeoutMS": 5000,
+    "connectTimeoutMS": 10000,
+    "maxPoolSize": 10  # Limit connections for free tier
+}
+
+mongo_breaker = CircuitBreaker(
+    "mongo",
+    initial_backoff=float(os.getenv("MONGO_RECONNECT_MIN_SECONDS", "1")),
+    max_backoff=float(os.getenv("MONGO_RECONNECT_MAX_SECONDS", "60"))
+)
+
+# Global MongoDB clients (pymongo for scripts/tools, motor for the API)
 _client = None
 _db = None
+_async_client = None
+_async_db = None
+_async_connect_lock = asyncio.Lock()
+_indexes_created = False
+_reconnect_task = None
+
+def mongodb_configured() -> bool:
+    return bool(MONGODB_URL) and MONGODB_URL != PLACEHOLDER_URL
+
+def report_failure(error: Exception):
+    """
+    Open the breaker if `error` means the cluster is unreachable.
+    Called on connection failures and by callers whose operations failed mid-request.
+    """
+    global _db, _async_db
+    if not isinstance(error, ConnectionFailure):
+        return
+    _db = None
+    _async_db = None
+    if mongo_breaker.open(error):
+        print("⚠️ Falling back to file storage")
+    _schedule_reconnect()
+
+def _schedule_reconnect():
+    """Start the background reconnect probe (only possible from the event loop)."""
+    global _reconnect_task
+    if _reconnect_task is not None and not _reconnect_task.done():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Scripts and worker threads: `get_database` probes again once the backoff has passed
+        return
+    _reconnect_task = loop.create_task(_reconnect_loop())
+
+async def _reconnect_loop():
+    global _async_db
+    client = _get_async_client()
+    while mongo_breaker.is_open:
+        await asyncio.sleep(max(0.0, mongo_breaker.next_probe - time.monotonic()))
+        try:
+            await client.admin.command('ping')
+        except Exception as e:
+            mongo_breaker.probe_failed(e)
+            continue
+        _async_db = client['serenova']
+        await create_indexes_async(_async_db)
+        mongo_breaker.close()
+        print("✅ Reconnected to MongoDB Atlas")
+
+def _get_async_client():
+    # Created once; motor reconnects the same client after an outage
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncIOMotorClient(MONGODB_URL, **CLIENT_OPTIONS)
+    return _async_client
+
+def mongodb_status() -> dict:
+    """Connection/breaker state for health checks."""
+    return {"configured": mongodb_configured(), **mongo_breaker.status()}
 
 def get_database():
     """Get MongoDB database connection."""
     global _client, _db
     
-    if _db is not None:
+    if _db is not None and not mongo_breaker.is_open:
         return _db
     
-    if not MONGODB_URL or MONGODB_URL == "mongodb+srv://<username>:<password>@cluster0.xxxxx.mongodb.net/?retryWrites=true&w=majority":
+    if not mongodb_configured():
         print("⚠️ MongoDB URL not configured. Using fallback file storage.")
         return None
     
+    # Open breaker: skip straight to the fallback until a probe is due
+    if mongo_breaker.is_open and (_reconnect_task is not None or not mongo_breaker.probe_due()):
+        increment("mongo", "fallback_calls")
+        return None
+    
     try:
-        _client = MongoClient(
-            MONGODB_URL,
-            serverSelectionTimeoutMS=5000,
-            connectTimeoutMS=10000,
-            maxPoolSize=10  # Limit connections for free tier
-        )
+        if _client is None:
+            _client = MongoClient(MONGODB_URL, **CLIENT_OPTIONS)
         
         # Test connection
         _client.admin.command('ping')
         
         _db = _client['serenova']
         print("✅ Connected to MongoDB Atlas")
+        mongo_breaker.close()
         
         # Create indexes for performance (stays within free tier)
-        create_indexes()
+        create_indexes(_db)
         
         return _db
         
     except ConnectionFailure as e:
         print(f"❌ MongoDB connection failed: {e}")
-        print("⚠️ Falling back to file storage")
+        if mongo_breaker.is_open:
+            mongo_breaker.probe_failed(e)
+        else:
+            report_failure(e)
         return None
     except Exception as e:
         print(f"❌ MongoDB error: {e}")
@@ -62,26 +153,90 @@ def get_collection(name: str):
         return None
     return db[name]
 
-def create_indexes():
+async def get_async_database():
+    """
+    Get the motor (asyncio) database handle used by the API routes.
+    Same fallback semantics as `get_database`: None when MongoDB is not
+    configured, unreachable or the breaker is open, so callers use file storage instead.
+    """
+    global _async_db
+    
+    if _async_db is not None:
+        return _async_db
+    
+    if not mongodb_configured():
+        return None
+    
+    if mongo_breaker.is_open:
+        _schedule_reconnect()
+        increment("mongo", "fallback_calls")
+        return None
+    
+    async with _async_connect_lock:
+        if _async_db is not None or mongo_breaker.is_open:
+            return _async_db
+        client = _get_async_client()
+        try:
+            await client.admin.command('ping')
+        except Exception as e:
+            print(f"❌ MongoDB connection failed: {e}")
+            report_failure(e)
+            return None
+        
+        _async_db = client['serenova']
+        print("✅ Connected to MongoDB Atlas (async)")
+        await create_indexes_async(_async_db)
+        return _async_db
+
+async def get_async_collection(name: str):
+    """Get a motor collection by name (None when MongoDB is unavailable)."""
+    db = await get_async_database()
+    if db is None:
+        return None
+    return db[name]
+
+# (collection, field, options) - kept small to stay within the free tier
+INDEXES = [
+    # Users collection indexes
+    ("users", "userId", {"unique": True}),
+    ("users", "email", {}),
+    
+    # Conversations collection indexes
+    ("conversations", "sessionId", {"unique": True}),
+    ("conversations", "userId", {}),
+    ("conversations", "savedAt", {}),
+    
+    # Messages overflowed out of conversations' hot window
+    (ARCHIVE_COLLECTION, "sessionId", {}),
+    
+    # Assessments collection indexes
+    ("assessments", "userId", {}),
+    ("assessments", "date", {}),
+    
+    # Stored voice features (re-scoring)
+    ("voice_features", "analysisId", {}),
+    ("voice_features", "userId", {}),
+    ("voice_baselines", "userId", {"unique": True}),
+]
+
+def create_indexes(db):
     """Create indexes for better query performance (free tier optimized)."""
     try:
-        db = get_database()
-        if db is None:
-            return
-        
-        # Users collection indexes
-        db.users.create_index("userId", unique=True)
-        db.users.create_index("email")
-        
-        # Conversations collection indexes
-        db.conversations.create_index("sessionId", unique=True)
-        db.conversations.create_index("userId")
-        db.conversations.create_index("savedAt")
-        
-        # Assessments collection indexes
-        db.assessments.create_index("userId")
-        db.assessments.create_index("date")
-        
+        for collection, field, options in INDEXES:
+            db[collection].create_index(field, **options)
+        print("✅ MongoDB indexes created")
+    except Exception as e:
+        print(f"⚠️ Index creation skipped: {e}")
+
+async def create_indexes_async(db):
+    """`create_indexes` through motor (once per process)."""
+    global _indexes_created
+    if _indexes_created:
+        return
+    try:
+        for collection, field, options in INDEXES:
+            await db[collection].create_index(field, **options)
+        _indexes_created = True
         print("✅ MongoDB indexes created")
     except Exception as e:
         print(f"⚠️ Index creation skipped: {e}")
@@ -90,15 +245,10 @@ def clean_for_storage(data: dict) -> dict:
     """
     Remove unnecessary fields to minimize storage.
     Keep only essential data for M0 512MB limit.
+    (Conversation messages past the hot window are archived by the repository.)
     """
     # Remove null/None values
-    cleaned = {k: v for k, v in data.items() if v is not None}
-    
-    # Limit message history to last 100 messages per conversation
-    if 'messages' in cleaned and isinstance(cleaned['messages'], list):
-        cleaned['messages'] = cleaned['messages'][-100:]
-    
-    return cleaned
+    return {k: v for k, v in data.items() if v is not None}
 
 def cleanup_old_data(days_old: int = 90):
     """
@@ -112,10 +262,10 @@ def cleanup_old_data(days_old: int = 90):
         
         cutoff_date = datetime.utcnow() - timedelta(days=days_old)
         
-        # Clean old conversations
-        result = db.conversations.delete_many({
-            "savedAt": {"$lt": cutoff_date.isoformat()}
-        })
+        # Clean old conversations and their archived messages
+        old_ids = db.conversations.distinct("_id", {"savedAt": {"$lt": cutoff_date.isoformat()}})
+        result = db.conversations.delete_many({"_id": {"$in": old_ids}})
+        db[ARCHIVE_COLLECTION].delete_many({"sessionId": {"$in": old_ids}})
         
         print(f"🧹 Cleaned {result.deleted_count} old conversations")
         return True
@@ -124,8 +274,16 @@ def cleanup_old_data(days_old: int = 90):
         return False
 
 def close_connection():
-    """Close MongoDB connection."""
-    global _client
+    """Close MongoDB connections and stop reconnect probes."""
+    global _client, _db, _async_client, _async_db, _reconnect_task
+    if _reconnect_task is not None:
+        _reconnect_task.cancel()
+        _reconnect_task = None
     if _client:
         _client.close()
+        _client, _db = None, None
         print("MongoDB connection closed")
+    if _async_client:
+        _async_client.close()
+        _async_client, _async_db = None, None
+        print("MongoDB async connection closed")
@@ -19,5 +19,11 @@ def get_emotion_pipe():
         )
     return _emotion_pipe
 
+def predict_emotion(text: str):
+    """Return the top (label, score) emotion for a piece of text."""
+    preds = get_emotion_pipe()(text)[0]  # list[dict]: {'label', 'score'}
+    top = max(preds, key=lambda x: x["score"])
+    return top["label"].lower(), float(top["score"])
+
 # For backwards compatibility
 emotion_pipe = None  # Will be loaded on first use
@@ -0,0 +1,116 @@
+"""
+Binary feature payload ("SVF1") for client-side feature extraction.
+
+Low-bandwidth clients can compute features locally and send them instead of
+audio. Layout (all little-endian):
+
+    offset  size  field
+    0       4     magic          b"SVF1"
+    4       1     version        1
+    5       1     dtype          1 = float16, 2 = float32
+    6       1     flags          bit 0: body is zlib-compressed
+    7       1     reserved       0
+    8       4     sample_rate    u32, must be 16000
+    12      2     hop_length     u16, must be 512
+    14      2     n_fft          u16, must be 2048
+    16      2     n_mfcc         u16, must be 20
+    18      4     n_frames       u32
+    22      2     reserved       0
+    24      ...   body           mfcc (n_mfcc x n_frames, row-major), then
+                                 zcr, spectral_centroid, rms (n_frames each)
+
+Features must be computed like `compute_features` (librosa defaults:
+center=True, Hann window, 128 Slaney mel bands, ortho DCT-II, top_db=80).
+"""
+
+import struct
+import zlib
+from typing import Tuple
+import numpy as np
+from app.core.audio_features import N_MFCC, N_FFT, HOP_LENGTH
+
+MAGIC = b"SVF1"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBBIHHHIH")
+DTYPES = {1: np.dtype("<f2"), 2: np.dtype("<f4")}
+FLAG_ZLIB = 0x01
+EXPECTED_SAMPLE_RATE = 16000
+MAX_FRAMES = 4096  # ~130 s at 16 kHz / hop 512; duration is validated separately
+MAX_PAYLOAD_BYTES = HEADER.size + (N_MFCC + 3) * MAX_FRAMES * 4
+
+
+def encode_payload(features: dict, sample_rate: int = EXPECTED_SAMPLE_RATE, dtype: int = 1, compress: bool = False) -> bytes:
+    """Build an SVF1 payload from `compute_features` output (reference encoder for clients)."""
+    mfcc = np.asarray(features["mfcc"])
+    n_mfcc, n_frames = mfcc.shape
+    body = np.concatenate([
+        mfcc.reshape(-1),
+        np.asarray(features["zcr"]).reshape(-1),
+        np.asarray(features["spectral_centroid"]).reshape(-1),
+        np.asarray(features["rms"]).reshape(-1),
+    ]).astype(DTYPES[dtype]).tobytes()
+    if compress:
+        body = zlib.compress(body, 6)
+    header = HEADER.pack(MAGIC, VERSION, dtype, FLAG_ZLIB if compress else 0, 0,
+                         sample_rate, HOP_LENGTH, N_FFT, n_mfcc, n_frames, 0)
+    return header + body
+
+
+def decode_payload(data) -> Tuple[dict, dict]:
+    """
+    Validate and unpack an SVF1 payload.
+
+    Returns:
+        features: {"mfcc", "zcr", "spectral_centroid", "rms"} as float32 arrays
+        meta: {"version", "dtype", "compressed", "sample_rate", "hop_length", "n_frames", "duration"}
+
+    Raises:
+        ValueError: Malformed payload or parameters that don't match the server's features
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Feature payload too short")
+    magic, version, dtype, flags, _, sample_rate, hop_length, n_fft, n_mfcc, n_frames, _ = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a feature payload (bad magic)")
+    if version != VERSION:
+        raise ValueError(f"Unsupported feature payload version {version}")
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported feature dtype {dtype}")
+    if (sample_rate, hop_length, n_fft, n_mfcc) != (EXPECTED_SAMPLE_RATE, HOP_LENGTH, N_FFT, N_MFCC):
+        raise ValueError(
+            f"Features must use sample_rate={EXPECTED_SAMPLE_RATE}, hop_length={HOP_LENGTH}, "
+            f"n_fft={N_FFT}, n_mfcc={N_MFCC}"
+        )
+    if not 0 < n_frames <= MAX_FRAMES:
+        raise ValueError(f"Invalid frame count {n_frames}")
+
+    body = memoryview(data)[HEADER.size:]
+    expected = (n_mfcc + 3) * n_frames * DTYPES[dtype].itemsize
+    if flags & FLAG_ZLIB:
+        decompressor = zlib.decompressobj()
+        body = decompressor.decompress(body, expected + 1)  # Bounded: no decompression bombs
+    if len(body) != expected:
+        raise ValueError(f"Feature payload body is {len(body)} bytes, expected {expected}")
+
+    values = np.frombuffer(body, dtype=DTYPES[dtype]).astype(np.float32)
+    if not np.isfinite(values).all():
+        raise ValueError("Feature payload contains NaN or infinite values")
+
+    mfcc_size = n_mfcc * n_frames
+    features = {
+        "mfcc": values[:mfcc_size].reshape(n_mfcc, n_frames),
+        "zcr": values[mfcc_size:mfcc_size + n_frames],
+        "spectral_centroid": values[mfcc_size + n_frames:mfcc_size + 2 * n_frames],
+        "rms": values[mfcc_size + 2 * n_frames:],
+    }
+    meta = {
+        "version": version,
+        "dtype": DTYPES[dtype].name,
+        "compressed": bool(flags & FLAG_ZLIB),
+        "sample_rate": sample_rate,
+        "hop_length": hop_length,
+        "n_frames": n_frames,
+        # center=True framing: frame k is centred on sample k * hop
+        "duration": (n_frames - 1) * hop_length / sample_rate
+    }
+    return features, meta
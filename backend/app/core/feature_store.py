@@ -0,0 +1,127 @@
+"""
+Compact storage of MFCC matrices for re-scoring past voice analyses.
+
+Each saved analysis gets a document in `voice_features` holding its MFCC
+matrix as float16 bytes (optionally zlib-compressed and averaged over
+VOICE_FEATURE_DOWNSAMPLE frames), so a new classifier can be run over
+history without the original audio. Kept out of `voice_analyses` so history
+queries don't load binary data. Each document records the analysis profile
+its MFCCs were computed with; MFCCs from different profiles are not
+interchangeable, so re-scoring only uses documents of the profile the
+classifier expects.
+
+Settings:
+- VOICE_FEATURE_STORE=0 disables storage
+- VOICE_FEATURE_COMPRESSION = zlib (default) | none
+- VOICE_FEATURE_DOWNSAMPLE = frames averaged per stored frame (default 1, full resolution)
+"""
+
+import os
+import zlib
+from datetime import datetime
+import numpy as np
+from typing import Optional
+from app.core.analysis_profiles import PROFILES, ACCURATE
+from app.core.audio_features import HOP_LENGTH
+from app.core.metrics import increment
+
+FEATURE_STORE_ENABLED = os.getenv("VOICE_FEATURE_STORE", "1") != "0"
+FEATURE_COMPRESSION = os.getenv("VOICE_FEATURE_COMPRESSION", "zlib")
+FEATURE_DOWNSAMPLE = int(os.getenv("VOICE_FEATURE_DOWNSAMPLE", "1"))
+ZLIB_LEVEL = 6
+FEATURE_FORMAT = "f16"
+
+
+def downsample_frames(mfcc: np.ndarray, factor: int) -> np.ndarray:
+    """Average each run of `factor` frames (a trailing partial run is averaged on its own)."""
+    if factor <= 1 or mfcc.shape[1] <= 1:
+        return mfcc
+    n_mfcc, n_frames = mfcc.shape
+    full = n_frames // factor * factor
+    pooled = mfcc[:, :full].reshape(n_mfcc, -1, factor).mean(axis=2)
+    if full < n_frames:
+        pooled = np.concatenate([pooled, mfcc[:, full:].mean(axis=1, keepdims=True)], axis=1)
+    return pooled
+
+
+def encode_mfcc(
+    mfcc: np.ndarray,
+    compression: str = FEATURE_COMPRESSION,
+    downsample: int = FEATURE_DOWNSAMPLE,
+    sample_rate: int = 16000,
+    hop_length: int = HOP_LENGTH,
+    profile: str = ACCURATE,
+) -> dict:
+    """
+    Pack an MFCC matrix into a BSON-friendly dict.
+
+    Returns:
+        {"format", "compression", "shape", "downsample", "profile", "sampleRate",
+         "hopLength", "data", "bytes", "rawBytes"}; `rawBytes` is the float32 size for comparison.
+    """
+    mfcc = np.asarray(mfcc, dtype=np.float32)
+    stored = downsample_frames(mfcc, downsample)
+    data = np.ascontiguousarray(stored, dtype="<f2").tobytes()
+    if compression == "zlib":
+        data = zlib.compress(data, ZLIB_LEVEL)
+    return {
+        "format": FEATURE_FORMAT,
+        "compression": compression,
+        "shape": list(stored.shape),
+        "downsample": max(1, downsample),
+        "profile": profile,
+        "sampleRate": sample_rate,
+        "hopLength": hop_length,
+        "data": data,
+        "bytes": len(data),
+        "rawBytes": mfcc.nbytes
+    }
+
+
+def decode_mfcc(doc: dict) -> np.ndarray:
+    """Inverse of `encode_mfcc`: float32 array of the stored shape."""
+    if doc.get("format") != FEATURE_FORMAT:
+        raise ValueError(f"Unsupported feature format: {doc.get('format')}")
+    data = bytes(doc["data"])
+    if doc.get("compression") == "zlib":
+        data = zlib.decompress(data)
+    return np.frombuffer(data, dtype="<f2").reshape(doc["shape"]).astype(np.float32)
+
+
+def stored_profile(doc: dict) -> Optional[str]:
+    """Profile a feature document was computed with (inferred from its frame settings for older documents)."""
+    if doc.get("profile"):
+        return doc["profile"]
+    for name, settings in PROFILES.items():
+        if doc.get("sampleRate") == settings["sample_rate"] and doc.get("hopLength") == settings["hop_length"]:
+            return name
+    return None
+
+
+async def save_features(db, analysis_id, user_id: str, packed: dict):
+    """Store an `encode_mfcc` result for one analysis (`db` is the motor database)."""
+    await db.voice_features.insert_one({
+        "analysisId": analysis_id,
+        "userId": user_id,
+        "createdAt": datetime.now(),
+        **packed
+    })
+    increment("feature_store", "saved")
+    increment("feature_store", "bytes", packed["bytes"])
+    increment("feature_store", "raw_bytes", packed["rawBytes"])
+
+
+def storage_report(db) -> dict:
+    """Totals and per-analysis averages of stored feature size."""
+    totals = next(db.voice_features.aggregate([
+        {"$group": {"_id": None, "count": {"$sum": 1}, "bytes": {"$sum": "$bytes"}, "rawBytes": {"$sum": "$rawBytes"}}}
+    ]), None)
+    if not totals:
+        return {"count": 0, "bytes": 0, "raw_bytes": 0, "avg_bytes": 0, "ratio": None}
+    return {
+        "count": totals["count"],
+        "bytes": totals["bytes"],
+        "raw_bytes": totals["rawBytes"],
+        "avg_bytes": round(totals["bytes"] / totals["count"]),
+        "ratio": round(totals["bytes"] / totals["rawBytes"], 3) if totals["rawBytes"] else None
+    }
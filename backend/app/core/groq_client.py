@@ -4,6 +4,9 @@ Groq provides fast, free inference with generous rate limits (30 req/min).
 """
 
 import os
+import asyncio
+import time
+from collections import deque
 from typing import List, Dict, Tuple
 from groq import Groq
 
@@ -14,6 +17,44 @@ CRISIS_KEYWORDS = [
     'overdose', 'can\'t go on', 'nothing to live for'
 ]
 
+class AsyncRateLimiter:
+    """
+    Caps concurrent requests and requests per minute (sliding window).
+    Use as `async with limiter:` around each API call.
+    """
+    
+    def __init__(self, max_concurrent: int, requests_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._sent = deque()
+        self._lock = asyncio.Lock()
+    
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    while self._sent and now - self._sent[0] >= 60:
+                        self._sent.popleft()
+                    if len(self._sent) < self.requests_per_minute:
+                        break
+                    await asyncio.sleep(60 - (now - self._sent[0]))
+                self._sent.append(time.monotonic())
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+    
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+# Shared limiter for Whisper transcription requests (Groq free tier: 20 req/min)
+whisper_limiter = AsyncRateLimiter(
+    max_concurrent=int(os.getenv("WHISPER_MAX_CONCURRENCY", "4")),
+    requests_per_minute=int(os.getenv("WHISPER_REQUESTS_PER_MINUTE", "20"))
+)
+
 def check_groq_available() -> bool:
     """Check if Groq API key is configured."""
     api_key = os.getenv('GROQ_API_KEY')
@@ -0,0 +1,235 @@
+"""
+JSON file storage used when MongoDB is unavailable (OFFLINE_STORAGE=json, the default).
+
+Users are one pretty-printed file each under data/users; conversations are
+sharded under data/conversations with a per-user index for listing (see
+`app.core.conversation_index`). Messages appended to a conversation go to an
+NDJSON log next to its file (`<sessionId>.log`, see `app.core.conversation_log`).
+All methods are synchronous; the repositories call them from a worker thread.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, Optional
+from app.core.conversation_index import UserIndex, shard_of
+from app.core.conversation_log import HOT_WINDOW, metadata, new_conversation, new_messages, page, with_seq
+from app.core.update_ops import apply_update
+
+USERS_DIR = "data/users"
+CONVERSATIONS_DIR = "data/conversations"
+CONVERSATION_SHARD_CHARS = 2
+LOG_READ_BLOCK = 64 * 1024
+
+
+class JsonFileStore:
+    """
+    One JSON document per key in a directory (synchronous; call from a worker thread).
+
+    With `shard_chars`, files fan out into subdirectories named after the first
+    hex chars of the key's SHA-1 (256 directories for 2). Files from before
+    sharding are still found at the top level and move into their shard when
+    next written. Directories starting with "_" hold metadata and are not scanned.
+    """
+
+    def __init__(self, directory: str, shard_chars: int = 0):
+        self.directory = directory
+        self.shard_chars = shard_chars
+        self._update_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        if self.shard_chars:
+            return os.path.join(self.directory, shard_of(key, self.shard_chars), f"{key}.json")
+        return os.path.join(self.directory, f"{key}.json")
+
+    def legacy_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _existing_path(self, key: str) -> Optional[str]:
+        for path in (self.path(key), self.legacy_path(key)):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._existing_path(key)
+        if path is None:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, key: str, doc: dict):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=2)
+        if self.shard_chars and os.path.exists(self.legacy_path(key)):
+            os.remove(self.legacy_path(key))
+
+    def update(self, key: str, update: dict) -> Optional[dict]:
+        """Apply a Mongo-style update (see `update_ops`); returns the new document or None if missing."""
+        with self._update_lock:
+            doc = self.get(key)
+            if doc is None:
+                return None
+            self.put(key, apply_update(doc, update))
+            return doc
+
+    def update_many(self, updates: Dict[str, dict]) -> int:
+        """Apply {key: update} in one pass under the update lock; missing keys are skipped. Returns the count updated."""
+        updated = 0
+        with self._update_lock:
+            for key, update in updates.items():
+                doc = self.get(key)
+                if doc is not None:
+                    self.put(key, apply_update(doc, update))
+                    updated += 1
+        return updated
+
+    def delete(self, key: str) -> bool:
+        path = self._existing_path(key)
+        if path is None:
+            return False
+        os.remove(path)
+        return True
+
+    def paths(self) -> Iterator[str]:
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = [d for d in dirs if not d.startswith('_')]
+            for filename in files:
+                if filename.endswith('.json'):
+                    yield os.path.join(root, filename)
+
+    def scan(self) -> Iterator[dict]:
+        for path in self.paths():
+            with open(path, 'r', encoding='utf-8') as f:
+                yield json.load(f)
+
+
+class JsonConversationStore:
+    """
+    Sharded conversation files plus the per-user index.
+
+    A conversation that has been appended to keeps its messages in the log
+    only; its file holds the metadata. Files from full saves keep their
+    messages inline (a full save replaces the log), and the first append moves
+    them into the log.
+    """
+
+    def __init__(self, directory: str = CONVERSATIONS_DIR):
+        self.files = JsonFileStore(directory, shard_chars=CONVERSATION_SHARD_CHARS)
+        self.index = UserIndex(directory)
+        self._lock = threading.Lock()
+
+    def _log_path(self, session_id: str) -> str:
+        return os.path.splitext(self.files.path(session_id))[0] + ".log"
+
+    def _read_log(self, session_id: str, last: Optional[int] = None) -> List[dict]:
+        """Logged messages, or only the `last` ones (read back from the end of the file)."""
+        path = self._log_path(session_id)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'rb') as f:
+            if last is None:
+                data = f.read()
+            else:
+                pos = f.seek(0, os.SEEK_END)
+                data = b""
+                while pos > 0 and data.count(b"\n") <= last:
+                    step = min(LOG_READ_BLOCK, pos)
+                    pos -= step
+                    f.seek(pos)
+                    data = f.read(step) + data
+        lines = [line for line in data.splitlines() if line.strip()]
+        if last is not None:
+            lines = lines[-last:] if last > 0 else []
+        return [json.loads(line) for line in lines]
+
+    def append_log(self, session_id: str, messages: List[dict]):
+        """Append numbered messages to the conversation's log (one write)."""
+        path = self._log_path(session_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write("".join(json.dumps(message, separators=(",", ":")) + "\n" for message in messages))
+
+    def _remove_log(self, session_id: str):
+        path = self._log_path(session_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def get(self, session_id: str) -> Optional[dict]:
+        doc = self.files.get(session_id)
+        if doc is not None and os.path.exists(self._log_path(session_id)):
+            doc["messages"] = self._read_log(session_id, last=HOT_WINDOW)
+        return doc
+
+    def save(self, conversation_data: dict):
+        session_id = conversation_data['sessionId']
+        self.index.ensure(self.files.scan)
+        with self._lock:
+            previous = self.files.get(session_id)
+            self._remove_log(session_id)
+            self.files.put(session_id, conversation_data)
+            self.index.upsert(conversation_data, previous_user=previous.get('userId') if previous else None)
+
+    def append(self, session_id: str, after_seq: int, messages: List[dict], fields: dict) -> dict:
+        """
+        Append the messages sent after `after_seq` (see `conversation_log.new_messages`).
+        Writes the new messages to the log and rewrites only the small metadata file.
+
+        Returns:
+            {"messageCount": stored count, "appended": number of new messages}
+        """
+        self.index.ensure(self.files.scan)
+        with self._lock:
+            doc = self.files.get(session_id)
+            current = doc["messageCount"] if doc else 0
+            new = new_messages(after_seq, messages, current)
+            if not new:
+                return {"messageCount": current, "appended": 0}
+            if doc is None:
+                doc = new_conversation(session_id, fields)
+            elif doc.get("messages"):
+                # Messages from a full save move into the log ahead of the new ones
+                new = with_seq(doc["messages"], current) + new
+                self._remove_log(session_id)
+            doc["messages"] = []
+            self.append_log(session_id, new)
+            doc.update(metadata(fields, new[-1]["seq"]))
+            self.files.put(session_id, doc)
+            self.index.upsert(doc)
+            return {"messageCount": doc["messageCount"], "appended": doc["messageCount"] - current}
+
+    def messages(self, session_id: str, before_seq: Optional[int] = None, limit: int = HOT_WINDOW) -> Optional[dict]:
+        """Up to `limit` messages before `before_seq` (the newest by default), oldest first."""
+        doc = self.files.get(session_id)
+        if doc is None:
+            return None
+        stored = with_seq(doc.get("messages") or [], doc["messageCount"]) + self._read_log(session_id)
+        return {"messages": page(stored, before_seq, limit), "messageCount": doc["messageCount"]}
+
+    def delete(self, session_id: str) -> bool:
+        self.index.ensure(self.files.scan)
+        with self._lock:
+            previous = self.files.get(session_id)
+            if previous is None:
+                return False
+            self.files.delete(session_id)
+            self._remove_log(session_id)
+            self.index.remove(previous.get('userId'), session_id)
+            return True
+
+    def list_summaries(self, user_id: Optional[str] = None) -> List[dict]:
+        # One index file per user instead of parsing every conversation
+        self.index.ensure(self.files.scan)
+        conversations = self.index.entries(user_id) if user_id else self.index.all_entries()
+        return sorted(conversations, key=lambda x: x['savedAt'], reverse=True)
+
+    def scan(self) -> Iterator[dict]:
+        """Every conversation with its full message history (for migrations)."""
+        for doc in self.files.scan():
+            logged = self._read_log(doc["sessionId"])
+            if logged:
+                doc["messages"] = with_seq(doc.get("messages") or [], logged[0]["seq"] - 1) + logged
+            yield doc
@@ -0,0 +1,130 @@
+"""
+Write-coalescing for `profile.lastActive`.
+
+Routes call `last_active.touch(user_id)` instead of writing the timestamp with
+every request. The latest timestamp per user is kept in memory and a
+background task writes them every LAST_ACTIVE_FLUSH_SECONDS as one unordered
+`bulk_write` of targeted `$set`s (one batched pass over the offline store
+otherwise). A user is written once their first pending touch is
+LAST_ACTIVE_MAX_STALENESS_SECONDS old, so a busy user costs one write per
+window however many requests they make; the stored value lags by at most
+the staleness plus one flush interval (0 writes every pending user on each
+flush). Pending timestamps are flushed on shutdown and overlaid on profiles
+read in the meantime.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from app.core.metrics import increment, record_timing, set_max
+from app.core.repositories import UserRepository, user_repo
+
+LAST_ACTIVE_FLUSH_SECONDS = float(os.getenv("LAST_ACTIVE_FLUSH_SECONDS", "5"))
+LAST_ACTIVE_MAX_STALENESS_SECONDS = float(os.getenv("LAST_ACTIVE_MAX_STALENESS_SECONDS", "60"))
+
+
+class LastActiveBuffer:
+    """Per-user latest lastActive timestamps waiting to be written (event-loop only, no locking)."""
+
+    def __init__(self, repo: UserRepository, flush_seconds: float = LAST_ACTIVE_FLUSH_SECONDS,
+                 max_staleness: float = LAST_ACTIVE_MAX_STALENESS_SECONDS):
+        self.repo = repo
+        self.flush_seconds = flush_seconds
+        self.max_staleness = max_staleness
+        # user_id -> (monotonic time of the first pending touch, latest ISO timestamp)
+        self._pending: Dict[str, Tuple[float, str]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, user_id: str, timestamp: Optional[str] = None):
+        """Record activity now (or at `timestamp`); replaces any pending value for the user."""
+        first_seen = self._pending.get(user_id, (time.monotonic(), None))[0]
+        self._pending[user_id] = (first_seen, timestamp or datetime.now().isoformat())
+        increment("last_active", "touches")
+        set_max("last_active", "max_pending", len(self._pending))
+
+    def pending(self, user_id: str) -> Optional[str]:
+        entry = self._pending.get(user_id)
+        return entry[1] if entry else None
+
+    def overlay(self, user_data: dict) -> dict:
+        """Show a pending lastActive on a document read from storage."""
+        profile = user_data.get("profile")
+        if profile:
+            timestamp = self.pending(profile.get("userId"))
+            if timestamp:
+                profile["lastActive"] = timestamp
+        return user_data
+
+    def discard(self, user_id: str):
+        self._pending.pop(user_id, None)
+
+    def _take(self, force: bool) -> Dict[str, Tuple[float, str]]:
+        cutoff = time.monotonic() - self.max_staleness
+        due = {
+            user_id: entry for user_id, entry in self._pending.items()
+            if force or entry[0] <= cutoff
+        }
+        for user_id in due:
+            del self._pending[user_id]
+        return due
+
+    def _requeue(self, entries: Dict[str, Tuple[float, str]]):
+        # Newer touches that arrived during the flush win
+        for user_id, entry in entries.items():
+            self._pending.setdefault(user_id, entry)
+
+    async def flush(self, force: bool = False) -> int:
+        """
+        Write due timestamps (all of them with `force`) in one batch.
+
+        Returns:
+            Number of users written; on failure the batch is put back for the next flush
+        """
+        due = self._take(force)
+        if not due:
+            return 0
+        start = time.perf_counter()
+        try:
+            written = await self.repo.update_many({
+                user_id: {"$set": {"profile.lastActive": timestamp}}
+                for user_id, (_, timestamp) in due.items()
+            })
+        except asyncio.CancelledError:
+            # Shutdown mid-flush: the final forced flush picks these up
+            self._requeue(due)
+            raise
+        except Exception as e:
+            print(f"Failed to flush lastActive for {len(due)} users: {str(e)}")
+            increment("last_active", "flush_failures")
+            self._requeue(due)
+            return 0
+        record_timing("last_active", "flush", (time.perf_counter() - start) * 1000)
+        increment("last_active", "flushes")
+        increment("last_active", "users_written", written)
+        return written
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    def start(self):
+        """Start the periodic flush on the running event loop (app startup)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush and write everything still pending (app shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush(force=True)
+
+
+last_active = LastActiveBuffer(user_repo)
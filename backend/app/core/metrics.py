@@ -0,0 +1,73 @@
+"""
+Lightweight in-process metrics (counters and latency summaries).
+Exposed through `/api/voice/metrics`; no external monitoring dependency.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+_lock = threading.Lock()
+_timings: Dict[str, Dict[str, dict]] = {}
+_counters: Dict[str, Dict[str, float]] = {}
+
+
+def record_timing(group: str, key: str, elapsed_ms: float):
+    """Add one latency sample to `group/key`."""
+    with _lock:
+        stats = _timings.setdefault(group, {}).setdefault(
+            key, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+        )
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["last_ms"] = elapsed_ms
+
+
+def increment(group: str, key: str, amount: float = 1):
+    """Increase counter `group/key` by `amount`."""
+    with _lock:
+        counters = _counters.setdefault(group, {})
+        counters[key] = counters.get(key, 0) + amount
+
+
+def set_max(group: str, key: str, value: float):
+    """Keep the largest value seen for `group/key` (high-water marks)."""
+    with _lock:
+        counters = _counters.setdefault(group, {})
+        counters[key] = max(counters.get(key, 0), value)
+
+
+@contextmanager
+def timed(group: str, key: str):
+    """Context manager that records the wall-clock time of its body."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(group, key, (time.perf_counter() - start) * 1000)
+
+
+def get_metrics() -> dict:
+    """Snapshot of all counters and timings (with average latency)."""
+    with _lock:
+        timings = {
+            group: {
+                key: {
+                    **stats,
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 3) if stats["count"] else 0.0
+                }
+                for key, stats in keys.items()
+            }
+            for group, keys in _timings.items()
+        }
+        counters = {group: dict(keys) for group, keys in _counters.items()}
+    return {"timings": timings, "counters": counters}
+
+
+def reset_metrics():
+    """Clear all metrics (used by benchmarks)."""
+    with _lock:
+        _timings.clear()
+        _counters.clear()
@@ -0,0 +1,368 @@
+"""
+Async data access for users, accounts, conversations and assessments.
+
+Each repository awaits MongoDB through motor when it is available and
+otherwise falls back to the offline store for users and conversations,
+the same semantics the routes had with synchronous pymongo. OFFLINE_STORAGE
+selects it: "json" (default, files under data/) or "sqlite" (an embedded
+WAL-mode database, see `app.core.sqlite_store`). Nothing here blocks the
+event loop: Mongo calls are awaited and offline I/O runs in a worker thread.
+Compare with the old synchronous calls using `python -m benchmarks.bench_storage`.
+
+If the cluster becomes unreachable mid-request, the failure opens the Mongo
+circuit breaker and the call is retried once, which then takes the fallback.
+
+Conversations can also be saved incrementally with `ConversationRepository.append`
+(one `$push` of the new messages; see `app.core.conversation_log`).
+"""
+
+import asyncio
+import functools
+import os
+from typing import Dict, List, Optional
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import ConnectionFailure, DuplicateKeyError
+from app.core.database import get_async_collection, clean_for_storage, report_failure
+from app.core.conversation_index import summarize
+from app.core.conversation_log import (
+    ARCHIVE_COLLECTION, HOT_WINDOW, archive_chunk, metadata, new_conversation, new_messages, number, overflow,
+    page, with_seq
+)
+from app.core.metrics import increment
+from app.core.json_store import JsonFileStore, JsonConversationStore, USERS_DIR
+
+OFFLINE_STORAGE = os.getenv("OFFLINE_STORAGE", "json").lower()
+
+
+def offline_stores():
+    """(users store, conversations store) for the configured OFFLINE_STORAGE."""
+    if OFFLINE_STORAGE == "sqlite":
+        from app.core.sqlite_store import SqliteDatabase, SqliteDocumentStore, SqliteConversationStore
+        db = SqliteDatabase()
+        return SqliteDocumentStore(db), SqliteConversationStore(db)
+    if OFFLINE_STORAGE != "json":
+        raise ValueError(f"OFFLINE_STORAGE must be 'json' or 'sqlite', not '{OFFLINE_STORAGE}'")
+    return JsonFileStore(USERS_DIR), JsonConversationStore()
+
+
+def with_fallback(method):
+    """Retry a repository call once after a connection failure (served by the fallback)."""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        except ConnectionFailure as e:
+            report_failure(e)
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+class MongoRepository:
+    collection_name: str = None
+
+    async def collection(self):
+        """The motor collection, or None when MongoDB is unavailable."""
+        return await get_async_collection(self.collection_name)
+
+    async def available(self) -> bool:
+        return await self.collection() is not None
+
+
+class UserRepository(MongoRepository):
+    """User profiles keyed by userId (`_id` in Mongo, one offline document each otherwise)."""
+
+    collection_name = 'users'
+
+    def __init__(self, offline):
+        self.offline = offline
+
+    @with_fallback
+    async def get(self, user_id: str) -> Optional[dict]:
+        users_col = await self.collection()
+        if users_col is not None:
+            return await users_col.find_one({'_id': user_id})
+        return await asyncio.to_thread(self.offline.get, user_id)
+
+    @with_fallback
+    async def save(self, user_data: dict):
+        users_col = await self.collection()
+        user_id = user_data['profile']['userId']
+        if users_col is not None:
+            # Clean data to minimize storage
+            await users_col.update_one({'_id': user_id}, {'$set': clean_for_storage(user_data)}, upsert=True)
+        else:
+            await asyncio.to_thread(self.offline.put, user_id, user_data)
+
+    @with_fallback
+    async def update(self, user_id: str, update: dict, projection: Optional[dict] = None) -> Optional[dict]:
+        """
+        Apply a field-level update ($set/$push/$addToSet) atomically in one round trip.
+
+        Returns:
+            The updated document (limited to `projection` in Mongo), or None if the user doesn't exist
+        """
+        users_col = await self.collection()
+        if users_col is not None:
+            return await users_col.find_one_and_update(
+                {'_id': user_id}, update, projection=projection, return_document=ReturnDocument.AFTER
+            )
+        return await asyncio.to_thread(self.offline.update, user_id, update)
+
+    @with_fallback
+    async def update_many(self, updates: Dict[str, dict]) -> int:
+        """
+        Apply {user_id: update} as one unordered bulk_write (one batched offline pass otherwise).
+        Users that no longer exist are skipped, never recreated.
+
+        Returns:
+            Number of users matched
+        """
+        users_col = await self.collection()
+        if users_col is not None:
+            result = await users_col.bulk_write(
+                [UpdateOne({'_id': user_id}, update) for user_id, update in updates.items()], ordered=False
+            )
+            return result.matched_count
+        return await asyncio.to_thread(self.offline.update_many, updates)
+
+    @with_fallback
+    async def delete(self, user_id: str):
+        users_col = await self.collection()
+        if users_col is not None:
+            await users_col.delete_one({'_id': user_id})
+        else:
+            await asyncio.to_thread(self.offline.delete, user_id)
+
+
+class AccountRepository(MongoRepository):
+    """Login accounts created by the auth routes (MongoDB only)."""
+
+    collection_name = 'users'
+
+    @with_fallback
+    async def find_by_user_id(self, user_id: str) -> Optional[dict]:
+        users_col = await self.collection()
+        if users_col is None:
+            return None
+        return await users_col.find_one({"userId": user_id})
+
+    @with_fallback
+    async def find_by_email(self, email: str) -> Optional[dict]:
+        users_col = await self.collection()
+        if users_col is None:
+            return None
+        return await users_col.find_one({"email": email})
+
+    @with_fallback
+    async def create(self, account: dict) -> bool:
+        """Insert a new account; False when MongoDB is unavailable."""
+        users_col = await self.collection()
+        if users_col is None:
+            return False
+        await users_col.insert_one(account)
+        return True
+
+
+class ConversationRepository(MongoRepository):
+    """
+    Saved chat sessions keyed by sessionId.
+
+    In Mongo the conversation document holds the newest HOT_WINDOW messages;
+    older ones are chunks in the archive collection.
+    """
+
+    collection_name = 'conversations'
+
+    def __init__(self, offline):
+        self.offline = offline
+
+    async def archive_collection(self):
+        archive_col = await get_async_collection(ARCHIVE_COLLECTION)
+        if archive_col is None:
+            raise ConnectionFailure("MongoDB became unavailable")
+        return archive_col
+
+    async def _archive(self, session_id: str, messages: List[dict]):
+        """Store messages that left the hot window (offline if the archive write fails: they're nowhere else)."""
+        if not messages:
+            return
+        try:
+            archive_col = await self.archive_collection()
+            await archive_col.insert_one(archive_chunk(session_id, messages))
+        except ConnectionFailure as e:
+            report_failure(e)
+            print(f"⚠️ Archiving {len(messages)} messages of {session_id} offline: {str(e)}")
+            await asyncio.to_thread(self.offline.append_log, session_id, messages)
+        increment("conversations", "archived_messages", len(messages))
+
+    @with_fallback
+    async def get(self, session_id: str) -> Optional[dict]:
+        conv_col = await self.collection()
+        if conv_col is not None:
+            return await conv_col.find_one({'_id': session_id})
+        return await asyncio.to_thread(self.offline.get, session_id)
+
+    @with_fallback
+    async def save(self, conversation_data: dict):
+        conv_col = await self.collection()
+        session_id = conversation_data['sessionId']
+        if conv_col is not None:
+            # Clean data to minimize storage (M0 512MB limit); older messages go to the archive
+            messages = number(conversation_data.get('messages') or [])
+            hot = {**conversation_data, 'messages': messages[-HOT_WINDOW:]}
+            await conv_col.update_one({'_id': session_id}, {'$set': clean_for_storage(hot)}, upsert=True)
+            # A full save replaces the archived messages too
+            archive_col = await self.archive_collection()
+            await archive_col.delete_many({'sessionId': session_id})
+            await self._archive(session_id, messages[:-HOT_WINDOW])
+        else:
+            await asyncio.to_thread(self.offline.save, conversation_data)
+
+    @with_fallback
+    async def append(self, session_id: str, after_seq: int, messages: List[dict], fields: dict) -> dict:
+        """
+        Append the messages sent after `after_seq` with one `$push` (`$each`, trimmed to
+        the hot window by `$slice`). The same call returns the head of the window
+        before the push, i.e. the messages that overflow into the archive, along
+        with any of the new messages that don't fit in the window themselves.
+
+        Raises:
+            SequenceGap: if `after_seq` is past the stored messages
+
+        Returns:
+            {"messageCount": stored count, "appended": number of new messages}
+        """
+        conv_col = await self.collection()
+        if conv_col is None:
+            return await asyncio.to_thread(self.offline.append, session_id, after_seq, messages, fields)
+
+        current = after_seq
+        while True:
+            new = new_messages(after_seq, messages, current)
+            if not new:
+                return {"messageCount": current, "appended": 0}
+            count = new[-1]['seq']
+            before = await conv_col.find_one_and_update(
+                {'_id': session_id, 'messageCount': current},
+                {
+                    '$push': {'messages': {'$each': new, '$slice': -HOT_WINDOW}},
+                    '$set': metadata(fields, count)
+                },
+                projection={'messages': {'$slice': len(new)}},
+                return_document=ReturnDocument.BEFORE
+            )
+            if before is not None:
+                await self._archive(session_id, overflow(before.get('messages') or [], current, new))
+                return {"messageCount": count, "appended": len(new)}
+
+            if current == 0:
+                doc = {**new_conversation(session_id, fields), **metadata(fields, count), 'messages': new[-HOT_WINDOW:]}
+                try:
+                    await conv_col.insert_one({'_id': session_id, **clean_for_storage(doc)})
+                except DuplicateKeyError:
+                    pass
+                else:
+                    await self._archive(session_id, new[:-HOT_WINDOW])
+                    return {"messageCount": count, "appended": len(new)}
+
+            # Another save got there first: continue from what is stored now
+            stored = await conv_col.find_one({'_id': session_id}, {'messageCount': 1})
+            current = stored['messageCount'] if stored else 0
+
+    @with_fallback
+    async def delete(self, session_id: str) -> bool:
+        """Delete a conversation; False if it did not exist."""
+        conv_col = await self.collection()
+        if conv_col is not None:
+            result = await conv_col.delete_one({'_id': session_id})
+            archive_col = await self.archive_collection()
+            await archive_col.delete_many({'sessionId': session_id})
+            return result.deleted_count > 0
+        return await asyncio.to_thread(self.offline.delete, session_id)
+
+    @with_fallback
+    async def messages(self, session_id: str, before_seq: Optional[int] = None,
+                       limit: int = HOT_WINDOW) -> Optional[dict]:
+        """
+        Up to `limit` messages with seq below `before_seq` (the newest by default), oldest first,
+        reading archive chunks only when the hot window doesn't cover the page.
+
+        Returns:
+            {"messages": [...], "messageCount": int}, or None if the conversation doesn't exist
+        """
+        conv_col = await self.collection()
+        if conv_col is None:
+            return await asyncio.to_thread(self.offline.messages, session_id, before_seq, limit)
+        doc = await conv_col.find_one({'_id': session_id}, {'messages': 1, 'messageCount': 1})
+        if doc is None:
+            return None
+
+        count = doc['messageCount']
+        hot = with_seq(doc.get('messages') or [], count)
+        result = page(hot, before_seq, limit)
+        boundary = min(before_seq if before_seq is not None else count + 1, hot[0]['seq'] if hot else count + 1)
+        if len(result) < limit and boundary > 1:
+            archive_col = await self.archive_collection()
+            cursor = archive_col.find({'sessionId': session_id, 'firstSeq': {'$lt': boundary}}).sort('firstSeq', -1)
+            older = []
+            async for chunk in cursor:
+                older = page(chunk['messages'], boundary, limit) + older
+                if len(older) + len(result) >= limit:
+                    break
+            result = (older + result)[-limit:] if limit > 0 else []
+        return {"messages": result, "messageCount": count}
+
+    async def history(self, session_id: str, page_size: int = 1000) -> List[dict]:
+        """Every message of a conversation (hot window and archive), oldest first, read as pages from the newest."""
+        pages, before_seq = [], None
+        while before_seq is None or before_seq > 1:
+            result = await self.messages(session_id, before_seq, page_size)
+            if not result or not result["messages"]:
+                break
+            pages.append(result["messages"])
+            before_seq = result["messages"][0]["seq"]
+        return [message for messages in reversed(pages) for message in messages]
+
+    @with_fallback
+    async def list_summaries(self, user_id: Optional[str] = None) -> List[dict]:
+        """Newest-first session summaries, filtered by user_id if provided."""
+        conv_col = await self.collection()
+        if conv_col is not None:
+            query = {'userId': user_id} if user_id else {}
+            projection = ['sessionId', 'savedAt', 'messageCount', 'mainEmotion', 'riskLevel']
+            cursor = conv_col.find(query, projection).sort('savedAt', -1)
+            return [summarize(doc) async for doc in cursor]
+        return await asyncio.to_thread(self.offline.list_summaries, user_id)
+
+
+class AssessmentRepository(MongoRepository):
+    """One intake assessment per user (MongoDB only)."""
+
+    collection_name = 'assessments'
+
+    @with_fallback
+    async def get(self, user_id: str) -> Optional[dict]:
+        assessment_col = await self.collection()
+        if assessment_col is None:
+            return None
+        return await assessment_col.find_one({'_id': user_id})
+
+    @with_fallback
+    async def save(self, assessment_doc: dict) -> bool:
+        """Upsert the user's assessment; False when MongoDB is unavailable."""
+        assessment_col = await self.collection()
+        if assessment_col is None:
+            return False
+        await assessment_col.update_one(
+            {'_id': assessment_doc['_id']},
+            {'$set': clean_for_storage(assessment_doc)},
+            upsert=True
+        )
+        return True
+
+
+_offline_users, _offline_conversations = offline_stores()
+user_repo = UserRepository(_offline_users)
+account_repo = AccountRepository()
+conversation_repo = ConversationRepository(_offline_conversations)
+assessment_repo = AssessmentRepository()
@@ -0,0 +1,52 @@
+"""
+Streaming (Welford / Chan) statistics.
+Lets voice features be summarized incrementally without keeping every value.
+"""
+
+import numpy as np
+
+
+class RunningStats:
+    """
+    Running count, mean, variance, min and max over a stream of values.
+
+    `update` merges a whole batch at once using Chan's parallel form of
+    Welford's algorithm, so per-chunk updates stay vectorized. With `axis`
+    set, statistics are tracked per column (e.g. per MFCC coefficient).
+    """
+
+    def __init__(self, shape=()):
+        self.count = 0
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.m2 = np.zeros(shape, dtype=np.float64)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def update(self, values, axis=None):
+        """Merge a batch of values (all values, or along `axis`)."""
+        values = np.asarray(values, dtype=np.float64)
+        n = values.size if axis is None else values.shape[axis]
+        if n == 0:
+            return
+        batch_mean = values.mean(axis=axis)
+        batch_m2 = ((values - (batch_mean if axis is None else np.expand_dims(batch_mean, axis))) ** 2).sum(axis=axis)
+        self.merge(n, batch_mean, batch_m2)
+        self.min = np.minimum(self.min, values.min(axis=axis))
+        self.max = np.maximum(self.max, values.max(axis=axis))
+
+    def merge(self, n, mean, m2):
+        """Combine with another partition summarized by (n, mean, M2)."""
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+    @property
+    def var(self):
+        """Population variance (matches np.var)."""
+        return self.m2 / self.count if self.count else np.zeros_like(self.m2)
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
@@ -0,0 +1,297 @@
+"""
+Embedded SQLite storage used when MongoDB is unavailable (OFFLINE_STORAGE=sqlite).
+
+One database file (SQLITE_PATH, default data/serenova.db) in WAL mode, so
+readers don't block the writer and each save is one small append to the log
+instead of rewriting a pretty-printed JSON document. Documents are kept as
+compact JSON payload columns; the fields that are queried or listed
+(userId, savedAt and the conversation summary) are real, indexed columns.
+Appended conversation messages are rows of their own (conversation_messages,
+keyed by sessionId and seq), so an append inserts only the new messages.
+
+Every statement is a constant parameterized string, so sqlite3's per-connection
+statement cache prepares each one once. Connections are per thread (the
+repositories call in from worker threads). Import existing JSON files with
+`python -m tools.migrate_to_sqlite`; compare against the JSON files with
+`python -m benchmarks.bench_offline_storage`.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional
+from app.core.conversation_log import HOT_WINDOW, metadata, new_conversation, new_messages, page, with_seq
+from app.core.update_ops import apply_update
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/serenova.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS conversations (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    saved_at TEXT,
+    message_count INTEGER,
+    main_emotion TEXT,
+    risk_level TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS conversations_user_saved ON conversations (user_id, saved_at);
+CREATE INDEX IF NOT EXISTS conversations_saved ON conversations (saved_at);
+CREATE TABLE IF NOT EXISTS conversation_messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+def _dumps(doc: dict) -> str:
+    return json.dumps(doc, separators=(",", ":"), default=str)
+
+
+class SqliteDatabase:
+    """Per-thread connections to one WAL-mode database file."""
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Durable across application crashes; an OS crash may lose the last commits
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+class SqliteDocumentStore:
+    """Same interface as `JsonFileStore` (get/put/update/delete/scan) on the users table."""
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    def get(self, key: str) -> Optional[dict]:
+        row = self.db.connection().execute("SELECT doc FROM users WHERE user_id = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, doc: dict):
+        with self.db.connection() as conn:
+            conn.execute(
+                "INSERT INTO users (user_id, doc) VALUES (?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET doc = excluded.doc",
+                (key, _dumps(doc))
+            )
+
+    def put_many(self, docs: dict):
+        """Insert/replace {key: doc} in one transaction (migrations)."""
+        with self.db.connection() as conn:
+            conn.executemany(
+                "INSERT INTO users (user_id, doc) VALUES (?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET doc = excluded.doc",
+                [(key, _dumps(doc)) for key, doc in docs.items()]
+            )
+
+    def update(self, key: str, update: dict) -> Optional[dict]:
+        """Apply a Mongo-style update in one write transaction; returns the new document or None if missing."""
+        conn = self.db.connection()
+        with conn:
+            # Take the write lock before reading so concurrent updates can't interleave
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT doc FROM users WHERE user_id = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            doc = apply_update(json.loads(row[0]), update)
+            conn.execute("UPDATE users SET doc = ? WHERE user_id = ?", (_dumps(doc), key))
+        return doc
+
+    def update_many(self, updates: Dict[str, dict]) -> int:
+        """Apply {key: update} in one write transaction; missing keys are skipped. Returns the count updated."""
+        conn = self.db.connection()
+        rows = []
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for key, update in updates.items():
+                row = conn.execute("SELECT doc FROM users WHERE user_id = ?", (key,)).fetchone()
+                if row is not None:
+                    rows.append((_dumps(apply_update(json.loads(row[0]), update)), key))
+            conn.executemany("UPDATE users SET doc = ? WHERE user_id = ?", rows)
+        return len(rows)
+
+    def delete(self, key: str) -> bool:
+        with self.db.connection() as conn:
+            return conn.execute("DELETE FROM users WHERE user_id = ?", (key,)).rowcount > 0
+
+    def scan(self) -> Iterator[dict]:
+        for (doc,) in self.db.connection().execute("SELECT doc FROM users"):
+            yield json.loads(doc)
+
+
+CONVERSATION_UPSERT = (
+    "INSERT INTO conversations (session_id, user_id, saved_at, message_count, main_emotion, risk_level, doc) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (session_id) DO UPDATE SET user_id = excluded.user_id, saved_at = excluded.saved_at, "
+    "message_count = excluded.message_count, main_emotion = excluded.main_emotion, "
+    "risk_level = excluded.risk_level, doc = excluded.doc"
+)
+
+
+MESSAGE_INSERT = "INSERT OR REPLACE INTO conversation_messages (session_id, seq, message) VALUES (?, ?, ?)"
+
+
+def _conversation_row(doc: dict) -> tuple:
+    return (
+        doc["sessionId"],
+        doc.get("userId"),
+        doc["savedAt"],
+        doc["messageCount"],
+        doc.get("mainEmotion", "neutral"),
+        doc.get("riskLevel", "low"),
+        _dumps(doc)
+    )
+
+
+class SqliteConversationStore:
+    """
+    Same interface as `JsonConversationStore` on the conversations table.
+
+    As with the JSON files, full saves keep their messages in the payload and
+    appended messages live in conversation_messages; the first append moves
+    the payload's messages into the table.
+    """
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    def _logged(self, conn: sqlite3.Connection, session_id: str, last: int) -> List[dict]:
+        rows = conn.execute(
+            "SELECT message FROM conversation_messages WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+            (session_id, last)
+        ).fetchall()
+        return [json.loads(message) for (message,) in reversed(rows)]
+
+    def get(self, session_id: str) -> Optional[dict]:
+        conn = self.db.connection()
+        row = conn.execute("SELECT doc FROM conversations WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        doc = json.loads(row[0])
+        if not doc.get("messages"):
+            doc["messages"] = self._logged(conn, session_id, HOT_WINDOW)
+        return doc
+
+    def save(self, conversation_data: dict):
+        with self.db.connection() as conn:
+            conn.execute("DELETE FROM conversation_messages WHERE session_id = ?", (conversation_data["sessionId"],))
+            conn.execute(CONVERSATION_UPSERT, _conversation_row(conversation_data))
+
+    def save_many(self, docs: List[dict]):
+        """Insert/replace many conversations in one transaction (migrations)."""
+        with self.db.connection() as conn:
+            conn.executemany(
+                "DELETE FROM conversation_messages WHERE session_id = ?", [(doc["sessionId"],) for doc in docs]
+            )
+            conn.executemany(CONVERSATION_UPSERT, [_conversation_row(doc) for doc in docs])
+
+    def append_log(self, session_id: str, messages: List[dict]):
+        """Insert numbered messages for the conversation."""
+        with self.db.connection() as conn:
+            conn.executemany(MESSAGE_INSERT, [(session_id, m["seq"], _dumps(m)) for m in messages])
+
+    def append(self, session_id: str, after_seq: int, messages: List[dict], fields: dict) -> dict:
+        """
+        Append the messages sent after `after_seq` (see `conversation_log.new_messages`)
+        in one write transaction: the new message rows plus the summary columns.
+
+        Returns:
+            {"messageCount": stored count, "appended": number of new messages}
+        """
+        conn = self.db.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT message_count, json_array_length(doc, '$.messages') FROM conversations WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+            current = row[0] if row else 0
+            new = new_messages(after_seq, messages, current)
+            if not new:
+                return {"messageCount": current, "appended": 0}
+            if row is None:
+                conn.execute(CONVERSATION_UPSERT, _conversation_row(new_conversation(session_id, fields)))
+            elif row[1]:
+                # Messages from a full save move into the table ahead of the new ones
+                doc = json.loads(conn.execute(
+                    "SELECT doc FROM conversations WHERE session_id = ?", (session_id,)
+                ).fetchone()[0])
+                new = with_seq(doc["messages"], current) + new
+            conn.executemany(MESSAGE_INSERT, [(session_id, m["seq"], _dumps(m)) for m in new])
+            changes = metadata(fields, new[-1]["seq"])
+            changes["messages"] = []
+            conn.execute(
+                "UPDATE conversations SET saved_at = ?, message_count = ?, "
+                "main_emotion = coalesce(?, main_emotion), risk_level = coalesce(?, risk_level), "
+                "doc = json_patch(doc, ?) WHERE session_id = ?",
+                (changes["savedAt"], changes["messageCount"], changes.get("mainEmotion"),
+                 changes.get("riskLevel"), _dumps(changes), session_id)
+            )
+        return {"messageCount": changes["messageCount"], "appended": changes["messageCount"] - current}
+
+    def messages(self, session_id: str, before_seq: Optional[int] = None, limit: int = HOT_WINDOW) -> Optional[dict]:
+        """Up to `limit` messages before `before_seq` (the newest by default), oldest first."""
+        conn = self.db.connection()
+        row = conn.execute("SELECT doc FROM conversations WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        doc = json.loads(row[0])
+        if doc.get("messages"):
+            stored = page(with_seq(doc["messages"], doc["messageCount"]), before_seq, limit)
+        else:
+            rows = conn.execute(
+                "SELECT message FROM conversation_messages WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+                (session_id, before_seq if before_seq is not None else doc["messageCount"] + 1, limit)
+            ).fetchall()
+            stored = [json.loads(message) for (message,) in reversed(rows)]
+        return {"messages": stored, "messageCount": doc["messageCount"]}
+
+    def delete(self, session_id: str) -> bool:
+        with self.db.connection() as conn:
+            conn.execute("DELETE FROM conversation_messages WHERE session_id = ?", (session_id,))
+            return conn.execute("DELETE FROM conversations WHERE session_id = ?", (session_id,)).rowcount > 0
+
+    def list_summaries(self, user_id: Optional[str] = None) -> List[dict]:
+        """Newest-first summaries straight from the indexed columns (payloads are not read)."""
+        columns = "SELECT session_id, saved_at, message_count, main_emotion, risk_level FROM conversations"
+        if user_id:
+            rows = self.db.connection().execute(
+                columns + " WHERE user_id = ? ORDER BY saved_at DESC", (user_id,)
+            )
+        else:
+            rows = self.db.connection().execute(columns + " ORDER BY saved_at DESC")
+        return [
+            {"sessionId": session_id, "savedAt": saved_at, "messageCount": message_count,
+             "mainEmotion": main_emotion, "riskLevel": risk_level}
+            for session_id, saved_at, message_count, main_emotion, risk_level in rows
+        ]
+
+    def scan(self) -> Iterator[dict]:
+        """Every conversation with its full message history."""
+        conn = self.db.connection()
+        for (payload,) in conn.execute("SELECT doc FROM conversations").fetchall():
+            doc = json.loads(payload)
+            if not doc.get("messages"):
+                doc["messages"] = self._logged(conn, doc["sessionId"], -1)
+            yield doc
@@ -0,0 +1,152 @@
+"""
+Chunked parallel transcription for long recordings.
+
+Long audio is split at pauses found with the energy VAD, each chunk is
+encoded to Ogg/Opus and transcribed concurrently (bounded by the shared
+Whisper rate limiter), and the chunk transcripts are stitched back in order.
+Where no pause is available the split is forced with a short overlap, and
+the duplicated words are removed when stitching.
+"""
+
+import asyncio
+import os
+import re
+import time
+from typing import AsyncIterator, Callable, List
+import numpy as np
+from app.core.vad import frame_energy_db, frame_length, speech_threshold_db
+from app.core.audio_transcode import encode_opus
+from app.core.groq_client import whisper_limiter
+from app.core.metrics import record_timing, increment
+
+CHUNK_SECONDS = float(os.getenv("WHISPER_CHUNK_SECONDS", "30"))
+SPLIT_SEARCH_SECONDS = 5.0     # How far before the target boundary to look for a pause
+CHUNK_OVERLAP_SECONDS = 1.0    # Overlap used when a split has to cut through speech
+SMOOTHING_FRAMES = 5           # ~150 ms, so single quiet frames inside words are ignored
+MAX_OVERLAP_WORDS = 12
+
+
+def plan_chunks(audio: np.ndarray, sr: int, chunk_seconds: float = CHUNK_SECONDS) -> List[dict]:
+    """
+    Split points for `audio`.
+
+    Returns:
+        List of {"index", "start", "end", "overlap"} in samples; `overlap` is True
+        when the chunk starts before the previous one ended (forced split).
+    """
+    total = len(audio)
+    target = int(chunk_seconds * sr)
+    # Let the last chunk run up to 25% long rather than creating a tiny tail
+    if total <= target * 1.25:
+        return [{"index": 0, "start": 0, "end": total, "overlap": False}]
+
+    size = frame_length(sr)
+    energy = frame_energy_db(audio, sr)
+    threshold = speech_threshold_db(energy)
+    smoothed = np.convolve(energy, np.ones(SMOOTHING_FRAMES) / SMOOTHING_FRAMES, mode="same")
+    search = int(SPLIT_SEARCH_SECONDS * sr / size)
+    overlap_samples = int(CHUNK_OVERLAP_SECONDS * sr)
+
+    chunks = []
+    start, overlapped = 0, False
+    while total - start > target * 1.25:
+        boundary = (start + target) // size
+        lo = max(start // size + 1, boundary - search)
+        best = lo + int(np.argmin(smoothed[lo:boundary + 1]))
+        chunks.append({"index": len(chunks), "start": start, "overlap": overlapped})
+
+        if smoothed[best] <= threshold:
+            # Cut in the middle of the quietest frame of the pause
+            split = best * size + size // 2
+            chunks[-1]["end"] = split
+            start, overlapped = split, False
+        else:
+            # No pause near the boundary: cut at the target and overlap the next chunk
+            split = start + target
+            chunks[-1]["end"] = split
+            start, overlapped = split - overlap_samples, True
+
+    chunks.append({"index": len(chunks), "start": start, "end": total, "overlap": overlapped})
+    return chunks
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def dedupe_overlap(previous: str, current: str, max_words: int = MAX_OVERLAP_WORDS) -> str:
+    """Drop the leading words of `current` that repeat the end of `previous`."""
+    prev_words = [_normalize(w) for w in previous.split()[-max_words:]]
+    cur_words = current.split()
+    cur_norm = [_normalize(w) for w in cur_words[:max_words]]
+
+    for k in range(min(len(prev_words), len(cur_norm)), 0, -1):
+        if prev_words[-k:] == cur_norm[:k]:
+            # A single short word ("the", "and") is too likely to match by chance
+            if k == 1 and len(cur_norm[0]) <= 3:
+                break
+            return " ".join(cur_words[k:])
+    return current
+
+
+def stitch_transcripts(chunks: List[dict], texts: List[str]) -> str:
+    """Join chunk transcripts in order, de-duplicating forced-split overlaps."""
+    parts = []
+    for chunk, text in zip(chunks, texts):
+        text = text.strip()
+        if chunk["overlap"] and parts:
+            text = dedupe_overlap(parts[-1], text)
+        if text:
+            parts.append(text)
+    return " ".join(parts)
+
+
+async def transcribe_chunks(
+    audio: np.ndarray,
+    sr: int,
+    request_fn: Callable[[bytes, str], str],
+) -> AsyncIterator[dict]:
+    """
+    Transcribe `audio` chunk by chunk, concurrently.
+
+    Args:
+        audio: Mono float32 samples
+        sr: Sample rate of `audio`
+        request_fn: Blocking Whisper call `(payload, filename) -> text`
+
+    Yields:
+        {"type": "partial", "index", "start", "end", "text"} as each chunk completes
+        (in completion order), then {"type": "final", "transcript", "chunks"}.
+    """
+    start_time = time.perf_counter()
+    chunks = plan_chunks(audio, sr)
+    texts = [""] * len(chunks)
+
+    async def run(chunk: dict):
+        payload = await asyncio.to_thread(encode_opus, audio[chunk["start"]:chunk["end"]], sr)
+        async with whisper_limiter:
+            text = await asyncio.to_thread(request_fn, payload, f"chunk_{chunk['index']}.ogg")
+        return chunk, text
+
+    tasks = [asyncio.create_task(run(chunk)) for chunk in chunks]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            chunk, text = await next_done
+            texts[chunk["index"]] = text
+            yield {
+                "type": "partial",
+                "index": chunk["index"],
+                "start": round(chunk["start"] / sr, 2),
+                "end": round(chunk["end"] / sr, 2),
+                "text": text.strip()
+            }
+    finally:
+        # Client went away or a chunk failed: don't leave requests running
+        for task in tasks:
+            task.cancel()
+
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    record_timing("transcribe", "chunked", elapsed_ms)
+    increment("transcribe", "chunks", len(chunks))
+    print(f"✅ Chunked transcription: {len(chunks)} chunks, {len(audio) / sr:.1f}s audio in {elapsed_ms:.0f}ms")
+    yield {"type": "final", "transcript": stitch_transcripts(chunks, texts), "chunks": len(chunks)}
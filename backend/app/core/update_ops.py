@@ -0,0 +1,54 @@
+"""
+The subset of MongoDB update operators the offline stores support.
+
+Field-level updates are written as Mongo update documents ($set, $push,
+$addToSet with dotted paths) so the same update can go to the cluster as one
+atomic operation, or be applied here by the JSON/SQLite stores inside their
+own lock/transaction.
+"""
+
+from typing import Any, Tuple
+
+
+def _parent(doc: dict, path: str) -> Tuple[dict, str]:
+    """Containing dict and final key of a dotted path (intermediate dicts are created)."""
+    *parents, key = path.split(".")
+    node = doc
+    for part in parents:
+        node = node.setdefault(part, {})
+    return node, key
+
+
+def _array(doc: dict, path: str) -> list:
+    node, key = _parent(doc, path)
+    values = node.setdefault(key, [])
+    if not isinstance(values, list):
+        raise ValueError(f"Cannot push to non-array field '{path}'")
+    return values
+
+
+def _each(value: Any) -> list:
+    if isinstance(value, dict) and "$each" in value:
+        return list(value["$each"])
+    return [value]
+
+
+def apply_update(doc: dict, update: dict) -> dict:
+    """Apply a Mongo-style update document to `doc` in place and return it."""
+    for operator, fields in update.items():
+        if operator == "$set":
+            for path, value in fields.items():
+                node, key = _parent(doc, path)
+                node[key] = value
+        elif operator == "$push":
+            for path, value in fields.items():
+                _array(doc, path).extend(_each(value))
+        elif operator == "$addToSet":
+            for path, value in fields.items():
+                values = _array(doc, path)
+                for item in _each(value):
+                    if item not in values:
+                        values.append(item)
+        else:
+            raise ValueError(f"Unsupported update operator '{operator}'")
+    return doc
@@ -0,0 +1,236 @@
+"""
+Resumable chunked uploads for voice recordings.
+
+A client opens a session with the total size, PUTs chunks at explicit byte
+offsets and finalizes once everything has arrived; processing only starts on
+finalize. After a dropped connection the client asks for the current offset
+and continues from there instead of re-sending the whole recording. Chunks
+that overlap data already received are counted as retransmitted bytes and
+only their new tail is appended.
+
+Chunks are appended to a spooled temporary file (in memory up to
+UPLOAD_SPOOL_MEMORY_BYTES, then on disk). Spool reads and writes run in a
+worker thread under a per-session lock, so a slow disk write holds up only
+that upload; the store-wide lock guards the session table alone. Sessions
+idle for longer than VOICE_UPLOAD_SESSION_TTL seconds are discarded by a
+background sweep every VOICE_UPLOAD_SWEEP_SECONDS (and whenever a session is
+created), so abandoned uploads free their spool even when no new ones arrive.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+from fastapi import HTTPException
+from app.core.metrics import increment, set_max
+from app.core.uploads import MAX_AUDIO_UPLOAD_BYTES, MAX_TRANSCRIPTION_UPLOAD_BYTES
+
+UPLOAD_SESSION_TTL = float(os.getenv("VOICE_UPLOAD_SESSION_TTL", "600"))
+UPLOAD_SWEEP_SECONDS = float(os.getenv("VOICE_UPLOAD_SWEEP_SECONDS", "60"))
+UPLOAD_SPOOL_MEMORY_BYTES = 1024 * 1024
+UPLOAD_CHUNK_BYTES = 512 * 1024          # Suggested chunk size returned to clients
+MAX_CHUNK_BYTES = 4 * 1024 * 1024
+MAX_ACTIVE_SESSIONS = int(os.getenv("VOICE_MAX_UPLOAD_SESSIONS", "200"))
+
+# Upload limits per target endpoint
+PURPOSE_LIMITS = {
+    "voice": MAX_AUDIO_UPLOAD_BYTES,
+    "transcribe": MAX_TRANSCRIPTION_UPLOAD_BYTES,
+}
+
+
+class UploadSession:
+    def __init__(self, purpose: str, size: int, filename: Optional[str], content_type: Optional[str], user_id: Optional[str]):
+        self.id = uuid.uuid4().hex
+        self.purpose = purpose
+        self.size = size
+        self.filename = filename
+        self.content_type = content_type
+        self.user_id = user_id
+        self.received = 0
+        self.retransmitted = 0
+        self.created = time.monotonic()
+        self.last_activity = self.created
+        self.spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY_BYTES)
+        # Serializes spool I/O; a session removed from the store is `closed`
+        self.lock = asyncio.Lock()
+        self.closed = False
+
+    def status(self) -> dict:
+        return {
+            "uploadId": self.id,
+            "purpose": self.purpose,
+            "size": self.size,
+            "offset": self.received,
+            "complete": self.received == self.size,
+            "expiresIn": max(0, round(self.last_activity + UPLOAD_SESSION_TTL - time.monotonic()))
+        }
+
+    def close(self):
+        self.closed = True
+        self.spool.close()
+
+    def read_all(self) -> bytes:
+        self.spool.seek(0)
+        return self.spool.read()
+
+
+class UploadSessionStore:
+    def __init__(self):
+        self._sessions: Dict[str, UploadSession] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for session_id, session in list(self._sessions.items()):
+            # A chunk being written counts as activity
+            if now - session.last_activity > UPLOAD_SESSION_TTL and not session.lock.locked():
+                del self._sessions[session_id]
+                session.close()
+                increment("upload_sessions", "expired")
+                increment("upload_sessions", "expired_bytes", session.received)
+
+    def _get(self, session_id: str, user_id: Optional[str]) -> UploadSession:
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Upload session not found or expired.")
+        if session.user_id is not None and session.user_id != user_id:
+            raise HTTPException(status_code=403, detail="Upload session belongs to another user.")
+        return session
+
+    def create(self, purpose: str, size: int, filename: Optional[str] = None,
+               content_type: Optional[str] = None, user_id: Optional[str] = None) -> UploadSession:
+        if purpose not in PURPOSE_LIMITS:
+            raise HTTPException(status_code=400, detail=f"purpose must be one of: {', '.join(PURPOSE_LIMITS)}")
+        limit = PURPOSE_LIMITS[purpose]
+        if size <= 0 or size > limit:
+            raise HTTPException(status_code=400, detail=f"File too large. Maximum size is {limit // (1024 * 1024)}MB.")
+        with self._lock:
+            self._purge_expired()
+            if len(self._sessions) >= MAX_ACTIVE_SESSIONS:
+                raise HTTPException(status_code=503, detail="Too many uploads in progress. Please retry shortly.")
+            session = UploadSession(purpose, size, filename, content_type, user_id)
+            self._sessions[session.id] = session
+            set_max("upload_sessions", "peak_active", len(self._sessions))
+        increment("upload_sessions", "created")
+        return session
+
+    def status(self, session_id: str, user_id: Optional[str] = None) -> dict:
+        with self._lock:
+            self._purge_expired()
+            return self._get(session_id, user_id).status()
+
+    def _session(self, session_id: str, user_id: Optional[str]) -> UploadSession:
+        with self._lock:
+            return self._get(session_id, user_id)
+
+    @staticmethod
+    def _check_open(session: UploadSession):
+        # Aborted or expired while waiting for the session lock
+        if session.closed:
+            raise HTTPException(status_code=404, detail="Upload session not found or expired.")
+
+    async def put_chunk(self, session_id: str, offset: int, data: bytes, user_id: Optional[str] = None) -> dict:
+        """
+        Write `data` at byte `offset`.
+
+        Offsets past the received data are rejected (409, with the current offset
+        in the detail); overlap with data already received is skipped and counted.
+        """
+        session = self._session(session_id, user_id)
+        async with session.lock:
+            self._check_open(session)
+            if offset < 0 or offset > session.received:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Chunk offset {offset} does not match the received data; resume at offset {session.received}."
+                )
+            if offset + len(data) > session.size:
+                raise HTTPException(status_code=400, detail="Chunk extends past the declared upload size.")
+
+            overlap = min(len(data), session.received - offset)
+            if overlap:
+                session.retransmitted += overlap
+                increment("upload_sessions", "retransmitted_bytes", overlap)
+            new_data = data[overlap:]
+            if new_data:
+                await asyncio.to_thread(session.spool.write, new_data)
+                session.received += len(new_data)
+            session.last_activity = time.monotonic()
+            increment("upload_sessions", "chunks")
+            increment("upload_sessions", "bytes_received", len(new_data))
+            return session.status()
+
+    async def finalize(self, session_id: str, user_id: Optional[str] = None):
+        """Remove a complete session and return (session, audio bytes)."""
+        session = self._session(session_id, user_id)
+        async with session.lock:
+            self._check_open(session)
+            if session.received != session.size:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Upload incomplete: received {session.received} of {session.size} bytes."
+                )
+            with self._lock:
+                self._sessions.pop(session_id, None)
+            try:
+                data = await asyncio.to_thread(session.read_all)
+            finally:
+                session.close()
+        increment("upload_sessions", "finalized")
+        if session.retransmitted:
+            print(f"📶 Upload {session_id[:8]} finished with {session.retransmitted} retransmitted bytes")
+        return session, data
+
+    async def abort(self, session_id: str, user_id: Optional[str] = None):
+        with self._lock:
+            session = self._get(session_id, user_id)
+            del self._sessions[session_id]
+        # Let a chunk that is being written finish before closing its spool
+        async with session.lock:
+            session.close()
+        increment("upload_sessions", "aborted")
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._purge_expired()
+            return {
+                "active": len(self._sessions),
+                "buffered_bytes": sum(s.received for s in self._sessions.values())
+            }
+
+    def purge_expired(self):
+        with self._lock:
+            self._purge_expired()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(UPLOAD_SWEEP_SECONDS)
+            self.purge_expired()
+
+    def start(self):
+        """Start the periodic sweep of expired sessions on the running event loop (app startup)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the sweep and release every session's spool (app shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+upload_sessions = UploadSessionStore()
@@ -0,0 +1,144 @@
+"""
+Bounded reads of audio uploads.
+
+Uploads are read in chunks into a single preallocated buffer and rejected as
+soon as they cross the endpoint's limit, instead of `await upload.read()`
+pulling the whole body into memory first. Requests whose Content-Length
+already exceeds the limit are rejected by middleware before the multipart
+body is parsed at all.
+
+Bytes currently held by upload buffers are tracked so the high-water mark
+shows up in `/api/voice/metrics` under "uploads".
+"""
+
+import os
+import threading
+import weakref
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse
+from app.core.metrics import increment, set_max
+
+MAX_AUDIO_UPLOAD_BYTES = 10 * 1024 * 1024
+MAX_TRANSCRIPTION_UPLOAD_BYTES = int(os.getenv("MAX_TRANSCRIPTION_BYTES", str(200 * 1024 * 1024)))
+MAX_BATCH_UPLOAD_FILES = 50
+UPLOAD_CHUNK_BYTES = 256 * 1024
+MULTIPART_OVERHEAD_BYTES = 64 * 1024  # Boundaries and part headers around the file
+
+# Largest request body accepted per path prefix (checked against Content-Length)
+REQUEST_BODY_LIMITS = [
+    ("/api/voice/transcribe", MAX_TRANSCRIPTION_UPLOAD_BYTES),
+    ("/api/voice/batch", MAX_BATCH_UPLOAD_FILES * MAX_AUDIO_UPLOAD_BYTES),
+    ("/api/voice/", MAX_AUDIO_UPLOAD_BYTES),
+]
+
+_inflight_lock = threading.Lock()
+_inflight_bytes = 0
+
+
+class _UploadBuffer(bytearray):
+    """bytearray that can be weak-referenced, so its release is tracked."""
+
+
+def _track(size: int):
+    global _inflight_bytes
+    with _inflight_lock:
+        _inflight_bytes += size
+        current = _inflight_bytes
+    set_max("uploads", "peak_inflight_bytes", current)
+
+
+def _release(size: int):
+    global _inflight_bytes
+    with _inflight_lock:
+        _inflight_bytes -= size
+
+
+def inflight_bytes() -> int:
+    """Bytes currently held by upload buffers."""
+    with _inflight_lock:
+        return _inflight_bytes
+
+
+def _too_large(label: str, max_bytes: int) -> HTTPException:
+    limit = f"{max_bytes // (1024 * 1024)}MB" if max_bytes >= 1024 * 1024 else f"{max_bytes // 1024}KB"
+    return HTTPException(
+        status_code=400,
+        detail=f"{label} too large. Maximum size is {limit}."
+    )
+
+
+async def read_upload(upload: UploadFile, max_bytes: int = MAX_AUDIO_UPLOAD_BYTES, label: str = "File") -> memoryview:
+    """
+    Read an upload incrementally, rejecting it as soon as it exceeds `max_bytes`.
+
+    Returns:
+        Read-only memoryview over the upload bytes (no copy). Decoding and
+        hashing accept it directly.
+    """
+    size = getattr(upload, "size", None)
+    if size is not None and size > max_bytes:
+        increment("uploads", "rejected_early")
+        raise _too_large(label, max_bytes)
+
+    # Preallocate when the size is known so the buffer is never regrown
+    buffer = _UploadBuffer(size) if size else _UploadBuffer()
+    capacity = len(buffer)
+    _track(capacity)
+    finalizer = weakref.finalize(buffer, _release, capacity)
+
+    received = 0
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        end = received + len(chunk)
+        if end > max_bytes:
+            increment("uploads", "rejected_streaming")
+            raise _too_large(label, max_bytes)
+        if end <= capacity:
+            buffer[received:end] = chunk
+        else:
+            # Unknown (or understated) size: grow the buffer
+            del buffer[received:]
+            buffer += chunk
+            _track(len(buffer) - capacity)
+            finalizer.detach()
+            finalizer = weakref.finalize(buffer, _release, len(buffer))
+            capacity = len(buffer)
+        received = end
+
+    if received < capacity:
+        del buffer[received:]
+
+    increment("uploads", "accepted")
+    set_max("uploads", "peak_request_bytes", received)
+    return memoryview(buffer).toreadonly()
+
+
+async def read_request_body(request: Request, max_bytes: int, label: str = "Request body") -> bytes:
+    """Read a raw (non-multipart) request body, rejecting it as soon as it exceeds `max_bytes`."""
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            increment("uploads", "rejected_streaming")
+            raise _too_large(label, max_bytes)
+    increment("uploads", "accepted")
+    set_max("uploads", "peak_request_bytes", len(body))
+    return bytes(body)
+
+
+async def reject_oversized_requests(request: Request, call_next):
+    """HTTP middleware: refuse voice uploads whose Content-Length is over the limit."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        for prefix, limit in REQUEST_BODY_LIMITS:
+            if request.url.path.startswith(prefix):
+                if int(content_length) > limit + MULTIPART_OVERHEAD_BYTES:
+                    increment("uploads", "rejected_content_length")
+                    return JSONResponse(
+                        status_code=413,
+                        content={"detail": f"Request too large. Maximum upload size is {limit // (1024 * 1024)}MB."}
+                    )
+                break
+    return await call_next(request)
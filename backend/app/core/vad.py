@@ -0,0 +1,159 @@
+"""
+Energy-based voice activity detection (vectorized NumPy).
+
+Audio is cut into short non-overlapping frames; a frame counts as speech
+when its RMS level rises clearly above the recording's noise floor.
+`compact_speech` uses the mask to drop leading/trailing silence and shorten
+long pauses before feature extraction and transcription. The kept spans
+are reported as `segments` so times in the compacted audio can be mapped
+back to the recording with `original_times`.
+"""
+
+import os
+import time
+import numpy as np
+from app.core.metrics import increment, record_timing
+
+FRAME_MS = 30
+NOISE_PERCENTILE = 10      # Quietest frames estimate the noise floor
+SPEECH_MARGIN_DB = 10.0    # Speech must be this far above the noise floor...
+DYNAMIC_RANGE_DB = 45.0    # ...and within this range of the loudest frame
+MIN_CONTRAST_DB = 15.0     # Below this loudest-to-floor spread there is no clear silence to remove
+SPEECH_PAD_MS = 200        # Kept around speech so word onsets/releases aren't clipped
+MAX_PAUSE_MS = 300         # Longer pauses inside speech are shortened to this
+
+VAD_TRIM_ENABLED = os.getenv("VOICE_VAD_TRIM", "1") != "0"
+
+
+def frame_length(sr: int, frame_ms: int = FRAME_MS) -> int:
+    return max(1, int(sr * frame_ms / 1000))
+
+
+def frame_energy_db(audio: np.ndarray, sr: int, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """RMS level in dB of each non-overlapping frame (the last partial frame is zero-padded)."""
+    size = frame_length(sr, frame_ms)
+    n_frames = -(-len(audio) // size)
+    padded = np.zeros(n_frames * size, dtype=np.float32)
+    padded[:len(audio)] = audio
+    frames = padded.reshape(n_frames, size)
+    power = np.einsum("ij,ij->i", frames, frames) / size
+    return 10.0 * np.log10(np.maximum(power, 1e-10))
+
+
+def speech_threshold_db(energy_db: np.ndarray) -> float:
+    """Adaptive speech/silence threshold for one recording."""
+    if energy_db.size == 0:
+        return 0.0
+    noise_floor = np.percentile(energy_db, NOISE_PERCENTILE)
+    return float(max(noise_floor + SPEECH_MARGIN_DB, energy_db.max() - DYNAMIC_RANGE_DB))
+
+
+def speech_mask(energy_db: np.ndarray) -> np.ndarray:
+    """Boolean speech flag per frame."""
+    return energy_db > speech_threshold_db(energy_db)
+
+
+def compact_speech(
+    audio: np.ndarray,
+    sr: int,
+    pad_ms: int = SPEECH_PAD_MS,
+    max_pause_ms: int = MAX_PAUSE_MS,
+    frame_ms: int = FRAME_MS,
+):
+    """
+    Remove leading/trailing silence and shorten pauses longer than `max_pause_ms`.
+
+    Returns:
+        compacted: Speech samples (the input itself when nothing is removed)
+        info: {"speech_ratio", "original_duration", "speech_duration", "removed_seconds",
+               "segments"}; segments is an (n, 2) array of the kept [start, end)
+               spans in seconds of the original audio, in order
+    """
+    size = frame_length(sr, frame_ms)
+    original_duration = len(audio) / sr if sr else 0.0
+    info = whole_clip(original_duration)
+    if len(audio) == 0:
+        return audio, info
+
+    energy = frame_energy_db(audio, sr, frame_ms)
+    noise_floor = np.percentile(energy, NOISE_PERCENTILE)
+    if energy.max() - noise_floor < MIN_CONTRAST_DB:
+        # Uniform level (continuous speech or continuous noise): nothing to trim safely
+        return audio, info
+
+    speech = speech_mask(energy)
+    info["speech_ratio"] = float(speech.mean())
+    if not speech.any():
+        info["speech_duration"] = 0.0
+        info["removed_seconds"] = original_duration
+        info["segments"] = np.zeros((0, 2))
+        return audio[:0], info
+
+    # Dilate speech by the padding so onsets and releases are kept
+    pad = max(1, int(round(pad_ms / frame_ms)))
+    keep = np.convolve(speech, np.ones(2 * pad + 1), mode="same") > 0
+
+    # Position of each frame inside its silent run; keep the first `max_pause` frames
+    idx = np.arange(len(keep))
+    run_start = np.maximum.accumulate(np.where(keep, idx + 1, 0))
+    keep |= (idx - run_start) < int(max_pause_ms / frame_ms)
+
+    # ...but drop everything before the first and after the last speech
+    first, last = np.flatnonzero(speech)[[0, -1]]
+    keep[:max(0, first - pad)] = False
+    keep[last + pad + 1:] = False
+
+    if keep.all():
+        return audio, info
+
+    sample_mask = np.repeat(keep, size)[:len(audio)]
+    compacted = audio[sample_mask]
+    # Kept runs of frames -> [start, end) in seconds (the last frame may be partial)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], keep.astype(np.int8), [0]))))
+    info["segments"] = np.minimum(edges.reshape(-1, 2) * size, len(audio)) / sr
+    info["speech_duration"] = len(compacted) / sr
+    info["removed_seconds"] = original_duration - info["speech_duration"]
+    return compacted, info
+
+
+def whole_clip(duration: float) -> dict:
+    """`compact_speech` info for a clip kept as it is."""
+    return {
+        "speech_ratio": 1.0,
+        "original_duration": duration,
+        "speech_duration": duration,
+        "removed_seconds": 0.0,
+        "segments": np.array([[0.0, duration]])
+    }
+
+
+def original_times(times: np.ndarray, segments: np.ndarray, end: bool = False) -> np.ndarray:
+    """
+    Map times in compacted audio back to the recording it was cut from.
+
+    A time on the boundary between two kept spans maps to the start of the
+    later span, or with `end` to the end of the earlier one (so a window
+    ending at a cut does not stretch over the removed silence).
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if len(segments) == 0:
+        return times
+    segments = np.asarray(segments, dtype=np.float64)
+    # Start of each span in the compacted audio
+    offsets = np.concatenate(([0.0], np.cumsum(segments[:, 1] - segments[:, 0])))
+    span = np.searchsorted(offsets[1:], times, side="left" if end else "right")
+    span = np.minimum(span, len(segments) - 1)
+    return segments[span, 0] + times - offsets[span]
+
+
+def trim_for_analysis(audio: np.ndarray, sr: int):
+    """`compact_speech` when VOICE_VAD_TRIM is enabled (default), with metrics."""
+    if not VAD_TRIM_ENABLED:
+        return audio, whole_clip(len(audio) / sr if sr else 0.0)
+    start = time.perf_counter()
+    compacted, info = compact_speech(audio, sr)
+    record_timing("vad", "compact", (time.perf_counter() - start) * 1000)
+    increment("vad", "clips")
+    increment("vad", "removed_seconds", round(info["removed_seconds"], 3))
+    increment("vad", "original_seconds", round(info["original_duration"], 3))
+    return compacted, info
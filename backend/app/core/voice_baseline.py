@@ -0,0 +1,106 @@
+"""
+Per-user acoustic baseline for voice analyses.
+
+Each user has one small `voice_baselines` document holding the count, sums
+and sums of squares of a few per-clip statistics (stress score, MFCC
+variance/std/temporal variance and the mean of each MFCC coefficient).
+Power sums can be merged with a plain `$inc`, so a single atomic
+`find_one_and_update` both records the new clip and returns the baseline as
+it was before it, which the clip is then normalized against. Means and
+variances are recovered with the same (n, mean, M2) merge as RunningStats.
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, Optional
+import numpy as np
+from pymongo import ReturnDocument
+from app.core.metrics import increment, timed
+from app.core.running_stats import RunningStats
+from app.core.stress_classifier import compute_mfcc_stats
+
+MIN_BASELINE_SAMPLES = int(os.getenv("VOICE_BASELINE_MIN_SAMPLES", "5"))
+STAT_FIELDS = ("score", "var", "std", "temporal_var")
+MIN_SCORE_STD = 0.05       # Floor so a very consistent user isn't flagged for tiny changes
+PERSONAL_CENTER = 0.35     # A clip at the user's usual level maps here (low/neutral)
+PERSONAL_SPREAD = 0.15     # Score change per standard deviation above/below usual
+
+
+def clip_observation(mfcc: np.ndarray, classifier) -> Dict[str, float]:
+    """Per-clip statistics tracked in the baseline."""
+    stats = compute_mfcc_stats(mfcc)
+    observation = {
+        "score": float(classifier.stress_score(stats)),
+        "var": stats["var"],
+        "std": stats["std"],
+        "temporal_var": stats["temporal_var"],
+    }
+    for i, value in enumerate(np.mean(mfcc, axis=1)):
+        observation[f"c{i}"] = float(value)
+    return observation
+
+
+async def update_baseline(db, user_id: str, observation: Dict[str, float]) -> Optional[dict]:
+    """
+    Add one clip to the user's baseline in a single atomic write.
+
+    Returns:
+        The baseline document from before this clip (None for a user's first clip)
+    """
+    inc = {"n": 1}
+    for key, value in observation.items():
+        inc[f"sum.{key}"] = value
+        inc[f"sumsq.{key}"] = value * value
+    with timed("baseline", "update"):
+        return await db.voice_baselines.find_one_and_update(
+            {"userId": user_id},
+            {"$inc": inc, "$set": {"updatedAt": datetime.now()}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+
+
+def baseline_stats(doc: dict, key: str) -> RunningStats:
+    """Running statistics of one field recovered from its power sums."""
+    stats = RunningStats()
+    n = doc.get("n", 0)
+    total = doc.get("sum", {}).get(key)
+    total_sq = doc.get("sumsq", {}).get(key)
+    if n and total is not None and total_sq is not None:
+        mean = total / n
+        stats.merge(n, mean, max(total_sq - total * mean, 0.0))
+    return stats
+
+
+def normalize(observation: Dict[str, float], doc: Optional[dict]) -> Optional[dict]:
+    """
+    Compare a clip with the user's baseline.
+
+    Returns:
+        None until the baseline has MIN_BASELINE_SAMPLES clips, otherwise
+        {"samples", "zScore", "personalScore", "spectralDeviation", "usualScore"}
+    """
+    if not doc or doc.get("n", 0) < MIN_BASELINE_SAMPLES:
+        increment("baseline", "not_established")
+        return None
+
+    score = baseline_stats(doc, "score")
+    z = (observation["score"] - float(score.mean)) / max(float(score.std), MIN_SCORE_STD)
+
+    # RMS z-score over the MFCC coefficient means: how different the voice sounds overall
+    coefficient_z = []
+    for key, value in observation.items():
+        if key.startswith("c"):
+            stats = baseline_stats(doc, key)
+            if stats.count and stats.std > 0:
+                coefficient_z.append((value - float(stats.mean)) / float(stats.std))
+    spectral_deviation = float(np.sqrt(np.mean(np.square(coefficient_z)))) if coefficient_z else 0.0
+
+    increment("baseline", "normalized")
+    return {
+        "samples": int(doc["n"]),
+        "zScore": round(z, 2),
+        "personalScore": round(float(np.clip(PERSONAL_CENTER + z * PERSONAL_SPREAD, 0.0, 1.0)), 3),
+        "spectralDeviation": round(spectral_deviation, 2),
+        "usualScore": round(float(score.mean), 3)
+    }
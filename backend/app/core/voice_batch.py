@@ -0,0 +1,123 @@
+"""
+Batch voice analysis for scoring many recordings at once.
+
+Decoding and feature extraction run in parallel (threads for the API,
+processes for the command-line tool), then all clips are classified in one
+vectorized `predict_batch` call. Results are flat rows suitable for CSV or
+NDJSON output.
+"""
+
+import csv
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+from app.core.audio_decode import decode_audio
+from app.core.audio_features import compute_features, summarize_features
+from app.core.vad import trim_for_analysis
+from app.core.voice_model import get_classifier
+
+CSV_FIELDS = [
+    "file", "duration", "stressLevel", "emotion", "confidence", "stressScore",
+    "mean_mfcc", "std_mfcc", "mean_zcr", "mean_spectral_centroid", "mean_rms", "speech_ratio", "error"
+]
+
+
+def featurize(data: bytes, sample_rate: int = 16000) -> dict:
+    """Decode one recording, trim silence and compute its frame-level features (plus "duration")."""
+    audio, sr = decode_audio(data, sample_rate)
+    audio, speech = trim_for_analysis(audio, sr)
+    features = compute_features(audio, sr)
+    features["duration"] = speech["speech_duration"]
+    features["speech_ratio"] = speech["speech_ratio"]
+    return features
+
+
+def _featurize_item(item: Tuple[str, bytes]):
+    name, data = item
+    try:
+        return name, featurize(data), None
+    except Exception as e:
+        return name, None, f"{type(e).__name__}: {e}"
+
+
+def featurize_many(items: Iterable[Tuple[str, bytes]], workers: int = 4, processes: bool = False) -> list:
+    """
+    Featurize (name, bytes) pairs in parallel, preserving input order.
+
+    Returns:
+        List of (name, features or None, error or None)
+    """
+    executor_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_cls(max_workers=workers) as executor:
+        return list(executor.map(_featurize_item, items))
+
+
+def score_featurized(featurized: list) -> List[dict]:
+    """Classify all successfully featurized clips in one batch and build output rows."""
+    ok = [(name, features) for name, features, error in featurized if features is not None]
+    predictions = iter(get_classifier().predict_batch([features["mfcc"] for _, features in ok]))
+
+    rows = []
+    for name, features, error in featurized:
+        if features is None:
+            rows.append({"file": name, "error": error})
+            continue
+        stress_level, emotion, confidence, _, stress_score = next(predictions)
+        summary = summarize_features(features, features["duration"])
+        rows.append({
+            "file": name,
+            "duration": round(summary["duration"], 3),
+            "stressLevel": stress_level,
+            "emotion": emotion,
+            "confidence": confidence,
+            "stressScore": round(stress_score, 4),
+            "mean_mfcc": round(summary["mean_mfcc"], 4),
+            "std_mfcc": round(summary["std_mfcc"], 4),
+            "mean_zcr": round(summary["mean_zcr"], 6),
+            "mean_spectral_centroid": round(summary["mean_spectral_centroid"], 2),
+            "mean_rms": round(summary["mean_rms"], 6),
+            "speech_ratio": round(summary["speech_ratio"], 3),
+            "error": None
+        })
+    return rows
+
+
+def analyze_batch(items: List[Tuple[str, bytes]], workers: int = 4, processes: bool = False) -> Tuple[List[dict], dict]:
+    """
+    Featurize and score a batch of recordings.
+
+    Returns:
+        rows: One result row per input, in input order
+        throughput: {"files", "failed", "seconds", "files_per_second", "audio_seconds"}
+    """
+    start = time.perf_counter()
+    rows = score_featurized(featurize_many(items, workers, processes))
+    elapsed = time.perf_counter() - start
+    throughput = {
+        "files": len(rows),
+        "failed": sum(1 for row in rows if row.get("error")),
+        "seconds": round(elapsed, 3),
+        "files_per_second": round(len(rows) / elapsed, 2) if elapsed > 0 else None,
+        "audio_seconds": round(sum(row.get("duration") or 0 for row in rows), 1)
+    }
+    return rows, throughput
+
+
+def to_csv(rows: List[dict], fp: Optional[io.TextIOBase] = None) -> str:
+    """Write rows as CSV to `fp` (or return the CSV text)."""
+    out = fp or io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rows)
+    return "" if fp else out.getvalue()
+
+
+def to_ndjson(rows: List[dict], fp: Optional[io.TextIOBase] = None) -> str:
+    """Write rows as newline-delimited JSON to `fp` (or return the text)."""
+    text = "".join(json.dumps(row) + "\n" for row in rows)
+    if fp:
+        fp.write(text)
+        return ""
+    return text
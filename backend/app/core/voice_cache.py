@@ -0,0 +1,126 @@
+"""
+Content-addressed cache for voice processing results.
+
+Keyed by a hash of the uploaded audio bytes, so retries that resubmit the
+same recording skip decoding, feature extraction, classification and
+Whisper. The memory tier is a size-bounded LRU (cachetools); an optional
+disk tier (VOICE_CACHE_DIR) survives restarts and is shared by workers.
+
+Namespaces:
+- "features":   frame-level feature arrays + duration
+- "prediction": feature summary and raw classifier output; nothing user-specific
+                (baseline, personalization and saving run on every request)
+- "transcript": Whisper transcript text
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+import numpy as np
+from cachetools import LRUCache
+from app.core.metrics import increment
+
+VOICE_CACHE_MAX_BYTES = int(os.getenv("VOICE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+VOICE_CACHE_DIR = os.getenv("VOICE_CACHE_DIR")
+
+
+def audio_key(data) -> str:
+    """Content hash of encoded audio (bytes or memoryview)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _sizeof(value) -> int:
+    """Approximate memory footprint used for the LRU size bound."""
+    if isinstance(value, dict):
+        return sum(_sizeof(v) for v in value.values()) + 64 * len(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return 64
+
+
+class VoiceCache:
+    def __init__(self, max_bytes: int = VOICE_CACHE_MAX_BYTES, disk_dir: Optional[str] = VOICE_CACHE_DIR):
+        self._memory = LRUCache(maxsize=max_bytes, getsizeof=_sizeof)
+        self._lock = threading.Lock()
+        self._disk_dir = Path(disk_dir) if disk_dir else None
+        if self._disk_dir is not None:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def _disk_path(self, namespace: str, key: str) -> Path:
+        suffix = ".npz" if namespace == "features" else ".json"
+        return self._disk_dir / namespace / key[:2] / f"{key}{suffix}"
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._memory.get((namespace, key))
+        if value is not None:
+            increment("cache", f"{namespace}_hit")
+            return value
+
+        if self._disk_dir is not None:
+            value = self._read_disk(namespace, key)
+            if value is not None:
+                increment("cache", f"{namespace}_disk_hit")
+                self._put_memory(namespace, key, value)
+                return value
+
+        increment("cache", f"{namespace}_miss")
+        return None
+
+    def put(self, namespace: str, key: str, value: Any):
+        self._put_memory(namespace, key, value)
+        if self._disk_dir is not None:
+            try:
+                self._write_disk(namespace, key, value)
+            except OSError as e:
+                print(f"⚠️ Voice cache disk write failed: {e}")
+
+    def _put_memory(self, namespace: str, key: str, value: Any):
+        with self._lock:
+            try:
+                self._memory[(namespace, key)] = value
+            except ValueError:
+                pass  # Larger than the whole cache
+
+    def _read_disk(self, namespace: str, key: str) -> Optional[Any]:
+        path = self._disk_path(namespace, key)
+        if not path.exists():
+            return None
+        try:
+            if namespace == "features":
+                with np.load(path, allow_pickle=False) as data:
+                    return {name: (data[name] if data[name].ndim else data[name].item()) for name in data.files}
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable voice cache entry {path.name}: {e}")
+            return None
+
+    def _write_disk(self, namespace: str, key: str, value: Any):
+        path = self._disk_path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        if namespace == "features":
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **value)
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+        os.replace(tmp_path, path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._memory),
+                "bytes": self._memory.currsize,
+                "max_bytes": self._memory.maxsize,
+                "disk_dir": str(self._disk_dir) if self._disk_dir else None
+            }
+
+
+voice_cache = VoiceCache()
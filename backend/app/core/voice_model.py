@@ -0,0 +1,236 @@
+"""
+Trained voice stress model loading and inference.
+
+Set VOICE_MODEL_PATH to a TorchScript (.pt/.ts/.torchscript) or ONNX (.onnx)
+artifact. The model receives MFCCs shaped (batch, 1, n_mfcc, frames) and
+returns logits over VOICE_MODEL_LABELS (default: calm, neutral, stressed,
+very_stressed). Inputs are zero-padded to a few fixed frame-length buckets
+(VOICE_MODEL_BUCKETS) so the graph sees static shapes, and concurrent
+requests are micro-batched per bucket. Without an artifact, or if loading
+fails, the mock classifier is used.
+
+Load time, per-bucket latency, batch sizes and memory are recorded in the
+voice metrics under "voice_model".
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+import numpy as np
+from app.core.analysis_profiles import ACCURATE
+from app.core.metrics import record_timing, increment, set_max
+from app.core.stress_classifier import MockStressClassifier
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+VOICE_MODEL_PATH = os.getenv("VOICE_MODEL_PATH")
+VOICE_MODEL_BUCKETS = [int(b) for b in os.getenv("VOICE_MODEL_BUCKETS", "256,512,1024,2048").split(",")]
+VOICE_MODEL_LABELS = os.getenv("VOICE_MODEL_LABELS", "calm,neutral,stressed,very_stressed").split(",")
+VOICE_MODEL_MAX_BATCH = int(os.getenv("VOICE_MODEL_MAX_BATCH", "8"))
+VOICE_MODEL_BATCH_WAIT_MS = float(os.getenv("VOICE_MODEL_BATCH_WAIT_MS", "5"))
+
+# Model label -> (stress_level, emotion, stress weight 0-1)
+LABEL_OUTPUTS = {
+    "calm": ("low", "calm", 0.0),
+    "neutral": ("low", "neutral", 0.25),
+    "anxious": ("medium", "anxious", 0.5),
+    "stressed": ("high", "stressed", 0.75),
+    "very_stressed": ("very_high", "overwhelmed", 1.0),
+    "overwhelmed": ("very_high", "overwhelmed", 1.0),
+}
+
+
+def _rss_mb() -> Optional[float]:
+    """Peak resident memory of this process in MB (Unix only)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+class TorchScriptBackend:
+    def __init__(self, path: str):
+        import torch
+        self._torch = torch
+        self.model = torch.jit.load(path, map_location="cpu")
+        self.model.eval()
+
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        with self._torch.inference_mode():
+            return self.model(self._torch.from_numpy(batch)).numpy()
+
+
+class OnnxBackend:
+    def __init__(self, path: str):
+        import onnxruntime
+        self.session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+def pick_bucket(n_frames: int, buckets: List[int] = VOICE_MODEL_BUCKETS) -> int:
+    """Smallest bucket that fits `n_frames` (longer inputs are truncated to the largest)."""
+    for bucket in buckets:
+        if n_frames <= bucket:
+            return bucket
+    return buckets[-1]
+
+
+def pad_to_bucket(mfcc_list: List[np.ndarray], bucket: int) -> np.ndarray:
+    """Stack MFCC matrices into a zero-padded (batch, 1, n_mfcc, bucket) float32 array."""
+    batch = np.zeros((len(mfcc_list), 1, mfcc_list[0].shape[0], bucket), dtype=np.float32)
+    for i, mfcc in enumerate(mfcc_list):
+        frames = min(mfcc.shape[1], bucket)
+        batch[i, 0, :, :frames] = mfcc[:, :frames]
+    return batch
+
+
+class CnnStressClassifier(MockStressClassifier):
+    """
+    Stress classifier backed by a trained CNN.
+
+    `predict` and `predict_batch` run the model; the statistics-based scoring
+    inherited from the mock (`predict_from_stats`, `stress_score`) is still used
+    for provisional streaming estimates and timelines, where no full MFCC matrix
+    is available.
+    """
+
+    # The trained model's output is used as is (baseline deviation is still reported)
+    personalize = False
+    # Trained on accurate-profile MFCCs (16 kHz, 128 mels); fast-profile input is out of distribution
+    trained_profile = ACCURATE
+
+    def __init__(self, path: str, n_mfcc: int = 20):
+        super().__init__()
+        self.path = path
+        self.n_mfcc = n_mfcc
+        self.labels = VOICE_MODEL_LABELS
+
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        self.backend = OnnxBackend(path) if path.endswith(".onnx") else TorchScriptBackend(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        record_timing("voice_model", "load", load_ms)
+
+        # One warm-up pass per bucket so graph compilation/allocation isn't paid by users
+        for bucket in VOICE_MODEL_BUCKETS:
+            self._run_bucket([np.zeros((n_mfcc, bucket), dtype=np.float32)], bucket)
+
+        rss_after = _rss_mb()
+        if rss_after is not None:
+            set_max("voice_model", "peak_rss_mb", round(rss_after, 1))
+            increment("voice_model", "load_rss_delta_mb", round(rss_after - rss_before, 1))
+        increment("voice_model", "artifact_mb", round(os.path.getsize(path) / (1024 * 1024), 2))
+        print(f"🧠 Loaded voice model {os.path.basename(path)} in {load_ms:.0f}ms "
+              f"(buckets {VOICE_MODEL_BUCKETS}, labels {self.labels})")
+
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._batch_loop, daemon=True)
+        self._worker.start()
+
+    def _run_bucket(self, mfcc_list: List[np.ndarray], bucket: int) -> np.ndarray:
+        start = time.perf_counter()
+        logits = self.backend.run(pad_to_bucket(mfcc_list, bucket))
+        record_timing("voice_model", f"bucket_{bucket}", (time.perf_counter() - start) * 1000)
+        increment("voice_model", f"batch_size_{len(mfcc_list)}")
+        return logits
+
+    def _batch_loop(self):
+        """Collect requests for up to VOICE_MODEL_BATCH_WAIT_MS and run them per bucket."""
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.perf_counter() + VOICE_MODEL_BATCH_WAIT_MS / 1000
+            while len(pending) < VOICE_MODEL_MAX_BATCH:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            by_bucket = {}
+            for mfcc, future in pending:
+                by_bucket.setdefault(pick_bucket(mfcc.shape[1]), []).append((mfcc, future))
+            for bucket, group in by_bucket.items():
+                try:
+                    logits = self._run_bucket([mfcc for mfcc, _ in group], bucket)
+                    for (_, future), row in zip(group, logits):
+                        future.set_result(row)
+                except Exception as e:
+                    for _, future in group:
+                        future.set_exception(e)
+
+    def _logits(self, mfcc: np.ndarray) -> np.ndarray:
+        future = Future()
+        self._queue.put((np.asarray(mfcc, dtype=np.float32), future))
+        return future.result()
+
+    def _from_logits(self, logits: np.ndarray):
+        exp = np.exp(logits - logits.max())
+        probs = exp / exp.sum()
+        top = int(np.argmax(probs))
+        stress_level, emotion, _ = LABEL_OUTPUTS.get(self.labels[top], ("medium", self.labels[top], 0.5))
+
+        emotion_scores = {name: 0.0 for name in self.emotions}
+        stress_score = 0.0
+        for label, p in zip(self.labels, probs):
+            _, label_emotion, weight = LABEL_OUTPUTS.get(label, ("medium", label, 0.5))
+            emotion_scores[label_emotion] = emotion_scores.get(label_emotion, 0.0) + float(p)
+            stress_score += weight * float(p)
+        emotion_scores = {k: round(v, 2) for k, v in emotion_scores.items()}
+        return stress_level, emotion, round(float(probs[top]), 2), emotion_scores, stress_score
+
+    def predict(self, mfcc_features):
+        """Run the CNN on one MFCC matrix (micro-batched with concurrent requests)."""
+        return self._from_logits(self._logits(mfcc_features))[:4]
+
+    def predict_batch(self, mfcc_list: List[np.ndarray]):
+        """Run the CNN over many clips, one padded batch per bucket."""
+        results = [None] * len(mfcc_list)
+        by_bucket = {}
+        for i, mfcc in enumerate(mfcc_list):
+            by_bucket.setdefault(pick_bucket(mfcc.shape[1]), []).append(i)
+        for bucket, indices in by_bucket.items():
+            for start in range(0, len(indices), VOICE_MODEL_MAX_BATCH):
+                chunk = indices[start:start + VOICE_MODEL_MAX_BATCH]
+                logits = self._run_bucket([mfcc_list[i] for i in chunk], bucket)
+                for i, row in zip(chunk, logits):
+                    results[i] = self._from_logits(row)
+        return results
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier() -> MockStressClassifier:
+    """The configured voice classifier (trained model if available, otherwise the mock)."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = _load_classifier()
+        return _classifier
+
+
+def _load_classifier() -> MockStressClassifier:
+    if not VOICE_MODEL_PATH:
+        return MockStressClassifier()
+    if not os.path.exists(VOICE_MODEL_PATH):
+        print(f"⚠️ VOICE_MODEL_PATH {VOICE_MODEL_PATH} not found, using mock stress classifier")
+        return MockStressClassifier()
+    try:
+        return CnnStressClassifier(VOICE_MODEL_PATH)
+    except Exception as e:
+        print(f"❌ Failed to load voice model {VOICE_MODEL_PATH}: {e}")
+        print("⚠️ Falling back to mock stress classifier")
+        increment("voice_model", "load_failures")
+        return MockStressClassifier()
@@ -0,0 +1,266 @@
+"""
+Incremental voice feature extraction for streaming analysis.
+
+Audio arrives in chunks while the user is still recording. Each complete
+STFT frame is featurized as soon as it is available and folded into running
+MFCC statistics, so provisional stress estimates are cheap and the final
+MFCC matrix is ready right after the last chunk (only the global top_db
+floor and the DCT projection remain, a single small matrix product).
+"""
+
+import io
+import queue
+import threading
+from typing import Optional
+import numpy as np
+import soxr
+from app.core.audio_features import (
+    N_MFCC, N_FFT, HOP_LENGTH, N_MELS, TOP_DB, ZCR_THRESHOLD,
+    power_spectrogram, log_mel_from_power, mfcc_from_log_mel, get_dct_matrix,
+    spectral_centroid_from_power, rms_from_frames,
+)
+from app.core.audio_decode import RESAMPLE_QUALITY, av
+from app.core.running_stats import RunningStats
+
+PCM_FORMATS = {"pcm_s16le": "<i2", "pcm_f32le": "<f4"}
+COMPRESSED_FORMATS = {"webm", "ogg"}
+MIN_STREAM_SAMPLE_RATE = 8000
+MAX_STREAM_SAMPLE_RATE = 48000
+
+
+class StreamingFeatureExtractor:
+    """
+    Frame-by-frame equivalent of `compute_features`.
+
+    Frames are taken at the same positions as the batch path (center=True,
+    zero padding), so `finish()` returns the same MFCC matrix, spectral
+    centroid and RMS. ZCR uses the zero-padded frames, which only differs
+    from the batch (edge-padded) value in the first and last two frames.
+    """
+
+    def __init__(self, target_sr: int = 16000, n_mfcc: int = N_MFCC,
+                 n_fft: int = N_FFT, hop_length: int = HOP_LENGTH, n_mels: int = N_MELS):
+        self.sr = target_sr
+        self.n_mfcc = n_mfcc
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.samples = 0
+        self.n_frames = 0
+        self.mfcc_stats = RunningStats()
+        self.frame_mean_diffs = RunningStats()
+        self._input_sr = None
+        self._resampler = None
+        self._buffer = np.zeros(n_fft // 2, dtype=np.float32)
+        self._log_mel, self._zcr, self._centroid, self._rms = [], [], [], []
+        self._max_db = -np.inf
+        self._last_frame_mean = None
+        self._lock = threading.Lock()
+
+    @property
+    def duration(self) -> float:
+        return self.samples / self.sr
+
+    def add_samples(self, samples: np.ndarray, input_sr: int):
+        """Append mono float32 samples recorded at `input_sr`."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if self._input_sr is None:
+            self._input_sr = input_sr
+            if input_sr != self.sr:
+                self._resampler = soxr.ResampleStream(input_sr, self.sr, 1, dtype="float32", quality=RESAMPLE_QUALITY)
+        if self._resampler is not None:
+            samples = self._resampler.resample_chunk(samples)
+        with self._lock:
+            self._append(samples)
+
+    def _append(self, samples: np.ndarray):
+        self.samples += len(samples)
+        self._buffer = np.concatenate((self._buffer, samples))
+        if len(self._buffer) < self.n_fft:
+            return
+
+        count = 1 + (len(self._buffer) - self.n_fft) // self.hop_length
+        frames = np.lib.stride_tricks.sliding_window_view(self._buffer, self.n_fft)[::self.hop_length][:count]
+        power = power_spectrogram(frames, self.n_fft)
+        log_mel = log_mel_from_power(power, self.sr, self.n_fft, self.n_mels)
+        signs = np.signbit(np.where(np.abs(frames) <= ZCR_THRESHOLD, 0, frames))
+
+        self._log_mel.append(log_mel)
+        self._zcr.append((signs[:, 1:] != signs[:, :-1]).sum(axis=1) / self.n_fft)
+        self._centroid.append(spectral_centroid_from_power(power, self.sr, self.n_fft))
+        self._rms.append(rms_from_frames(frames))
+        self._update_running_stats(log_mel)
+
+        self.n_frames += count
+        self._buffer = self._buffer[count * self.hop_length:]
+
+    def _update_running_stats(self, log_mel: np.ndarray):
+        # The top_db floor uses the loudest frame seen so far; the exact global
+        # floor is applied once in `finish()`.
+        self._max_db = max(self._max_db, float(log_mel.max()))
+        mfcc = get_dct_matrix(self.n_mfcc, self.n_mels) @ np.maximum(log_mel, self._max_db - TOP_DB)
+        self.mfcc_stats.update(mfcc)
+
+        frame_means = mfcc.mean(axis=0)
+        if self._last_frame_mean is not None:
+            frame_means = np.concatenate(([self._last_frame_mean], frame_means))
+        self.frame_mean_diffs.update(np.diff(frame_means))
+        self._last_frame_mean = frame_means[-1]
+
+    def running_stats(self) -> Optional[dict]:
+        """Current MFCC statistics in the shape of `compute_mfcc_stats`."""
+        with self._lock:
+            if not self.mfcc_stats.count:
+                return None
+            return {
+                "mean": float(self.mfcc_stats.mean),
+                "std": float(self.mfcc_stats.std),
+                "var": float(self.mfcc_stats.var),
+                "max": float(self.mfcc_stats.max),
+                "min": float(self.mfcc_stats.min),
+                "temporal_var": float(self.frame_mean_diffs.var)
+            }
+
+    def finish(self) -> dict:
+        """Flush the resampler and trailing padding; return `compute_features` output."""
+        if self._resampler is not None:
+            tail = self._resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+            self._resampler = None
+            with self._lock:
+                self._append(tail)
+        with self._lock:
+            real_samples = self.samples
+            self._append(np.zeros(self.n_fft // 2, dtype=np.float32))
+            self.samples = real_samples
+
+            log_mel = np.concatenate(self._log_mel, axis=1) if self._log_mel else np.zeros((self.n_mels, 0), np.float32)
+            stack = lambda parts: np.concatenate(parts) if parts else np.zeros(0, np.float32)
+            return {
+                "mfcc": mfcc_from_log_mel(log_mel, self.n_mfcc),
+                "zcr": stack(self._zcr),
+                "spectral_centroid": stack(self._centroid),
+                "rms": stack(self._rms),
+            }
+
+
+class _ChunkPipe(io.RawIOBase):
+    """Blocking, non-seekable file object fed with chunks from another thread."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._pending = b""
+        self._eof = False
+
+    def readable(self):
+        return True
+
+    def feed(self, data: bytes):
+        self._queue.put(bytes(data))
+
+    def end(self):
+        self._queue.put(None)
+
+    def readinto(self, buffer):
+        while not self._pending:
+            if self._eof:
+                return 0
+            chunk = self._queue.get()
+            if chunk is None:
+                self._eof = True
+                return 0
+            self._pending = chunk
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+class VoiceStreamSession:
+    """
+    One streaming analysis: converts incoming chunks to samples and feeds
+    the extractor. PCM is featurized inline; compressed containers (webm/ogg
+    opus from MediaRecorder) are demuxed and decoded by PyAV on a background
+    thread that reads from a pipe as chunks arrive.
+    """
+
+    def __init__(self, audio_format: str, sample_rate: Optional[int] = None, target_sr: int = 16000):
+        if audio_format in PCM_FORMATS:
+            if not sample_rate:
+                raise ValueError("sampleRate is required for PCM streams")
+            if not isinstance(sample_rate, int) or not MIN_STREAM_SAMPLE_RATE <= sample_rate <= MAX_STREAM_SAMPLE_RATE:
+                raise ValueError(
+                    f"sampleRate must be an integer between {MIN_STREAM_SAMPLE_RATE} and {MAX_STREAM_SAMPLE_RATE}"
+                )
+        elif audio_format in COMPRESSED_FORMATS:
+            if av is None:
+                raise ValueError(f"{audio_format} streaming requires PyAV; send PCM instead")
+        else:
+            raise ValueError(f"Unsupported stream format: {audio_format}")
+
+        self.format = audio_format
+        self.sample_rate = sample_rate
+        self.extractor = StreamingFeatureExtractor(target_sr)
+        self.bytes_received = 0
+        self._remainder = b""
+        self._pipe = None
+        self._thread = None
+        self._error = None
+
+        if audio_format in COMPRESSED_FORMATS:
+            self._pipe = _ChunkPipe()
+            self._thread = threading.Thread(target=self._decode_loop, daemon=True)
+            self._thread.start()
+
+    @property
+    def duration(self) -> float:
+        return self.extractor.duration
+
+    def feed(self, chunk: bytes):
+        """Consume one binary chunk from the client."""
+        self.bytes_received += len(chunk)
+        if self._error is not None:
+            raise ValueError(f"Failed to decode audio stream: {self._error}")
+        if self._pipe is not None:
+            self._pipe.feed(chunk)
+            return
+
+        dtype = np.dtype(PCM_FORMATS[self.format])
+        data = self._remainder + chunk
+        usable = len(data) - len(data) % dtype.itemsize
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype=dtype)
+        if dtype.kind == "i":
+            samples = samples.astype(np.float32) / 32768.0
+        self.extractor.add_samples(samples, self.sample_rate)
+
+    def _decode_loop(self):
+        try:
+            with av.open(self._pipe, mode="r", options={"analyzeduration": "100000"}) as container:
+                stream = container.streams.audio[0]
+                sr = stream.codec_context.sample_rate or stream.rate
+                resampler = av.AudioResampler(format="flt", layout="mono", rate=sr)
+                for frame in container.decode(stream):
+                    for out in resampler.resample(frame):
+                        self.extractor.add_samples(out.to_ndarray().reshape(-1), sr)
+                for out in resampler.resample(None):
+                    self.extractor.add_samples(out.to_ndarray().reshape(-1), sr)
+        except Exception as e:
+            self._error = e
+        finally:
+            # Drain anything still queued so a stuck feed() never blocks
+            while self._pipe.readinto(bytearray(65536)):
+                pass
+
+    def finish(self) -> dict:
+        """Wait for pending decoding and return the full feature set."""
+        if self._pipe is not None:
+            self._pipe.end()
+            self._thread.join()
+            if self._error is not None and self.extractor.samples == 0:
+                raise ValueError(f"Failed to decode audio stream: {self._error}")
+        return self.extractor.finish()
+
+    def close(self):
+        """Abort the session (client disconnected)."""
+        if self._pipe is not None:
+            self._pipe.end()
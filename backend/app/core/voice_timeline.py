@@ -0,0 +1,79 @@
+"""
+Sliding-window stress and energy timeline for a voice clip.
+
+Windows are strided views over the clip's existing MFCC and RMS frames, so
+the timeline costs a few extra reductions rather than another feature pass.
+When the features were computed on VAD-compacted audio, window times are
+mapped back through the kept segments so they match the uploaded recording.
+"""
+
+import time
+from typing import List
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from app.core.audio_features import HOP_LENGTH
+from app.core.metrics import record_timing
+from app.core.vad import original_times
+from app.core.stress_classifier import compute_mfcc_stats_windows
+
+TIMELINE_WINDOW_SECONDS = 2.0
+TIMELINE_HOP_SECONDS = 1.0
+
+
+def build_timeline(
+    features: dict,
+    sr: int,
+    classifier,
+    window_seconds: float = TIMELINE_WINDOW_SECONDS,
+    hop_seconds: float = TIMELINE_HOP_SECONDS,
+    hop_length: int = HOP_LENGTH,
+) -> List[dict]:
+    """
+    Stress score/level and loudness for each window of a clip.
+
+    Args:
+        features: `compute_features` output ("mfcc" and "rms" share frames), plus
+            "segments" from VAD trimming when silence was removed before extraction
+        sr: Sample rate the features were computed at
+        classifier: Stress classifier providing `stress_scores_batch`
+
+    Returns:
+        List of {"start", "end", "stressScore", "stressLevel", "rms", "energyDb"}
+        (seconds of the original recording). Clips shorter than one window give
+        a single entry.
+    """
+    start_time = time.perf_counter()
+    mfcc = features["mfcc"]
+    n_frames = mfcc.shape[1]
+    if n_frames == 0:
+        return []
+    frames_per_second = sr / hop_length
+    window = max(1, min(int(round(window_seconds * frames_per_second)), n_frames))
+    hop = max(1, int(round(hop_seconds * frames_per_second)))
+
+    stats = compute_mfcc_stats_windows(mfcc, window, hop)
+    scores = classifier.stress_scores_batch(stats)
+    levels = classifier.stress_levels_batch(scores)
+
+    rms = np.sqrt((sliding_window_view(features["rms"] ** 2, window)[::hop]).mean(axis=1))
+    energy_db = 20 * np.log10(np.maximum(rms, 1e-10))
+
+    starts = np.arange(len(scores)) * hop / frames_per_second
+    ends = np.minimum(starts + window / frames_per_second, n_frames / frames_per_second)
+    segments = features.get("segments")
+    if segments is not None:
+        starts = original_times(starts, segments)
+        ends = original_times(ends, segments, end=True)
+    timeline = [
+        {
+            "start": round(float(start), 2),
+            "end": round(float(end), 2),
+            "stressScore": round(float(score), 3),
+            "stressLevel": str(level),
+            "rms": round(float(level_rms), 5),
+            "energyDb": round(float(db), 1)
+        }
+        for start, end, score, level, level_rms, db in zip(starts, ends, scores, levels, rms, energy_db)
+    ]
+    record_timing("timeline", "build", (time.perf_counter() - start_time) * 1000)
+    return timeline
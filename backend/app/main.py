@@ -1,14 +1,32 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from pathlib import Path
+from app.core.uploads import reject_oversized_requests
+from app.core.database import mongodb_status
+from app.core.last_active import last_active
+from app.core.upload_sessions import upload_sessions
 from app.routes import checkin, analyze, insights, intake, support, conversations, users, auth, assessment, voice_analysis
 
 # Load environment variables from .env file
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
-app = FastAPI(title='Aurora Mind API')
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    last_active.start()
+    upload_sessions.start()
+    yield
+    await upload_sessions.stop()
+    # Don't lose buffered lastActive writes on shutdown
+    await last_active.stop()
+
+app = FastAPI(title='Aurora Mind API', lifespan=lifespan)
+
+# Refuse oversized voice uploads from Content-Length, before the body is read.
+# Registered before CORS so CORS stays outermost and the 413 carries its headers.
+app.middleware('http')(reject_oversized_requests)
 
 app.add_middleware(
     CORSMiddleware,
@@ -33,3 +51,8 @@ app.include_router(voice_analysis.router, prefix='/api/voice', tags=['Voice Anal
 @app.get('/')
 def root():
     return {'message': 'Aurora Mind API running with MongoDB support (file storage fallback active)'}
+
+@app.get('/health')
+def health():
+    """Service health, including MongoDB connection/circuit-breaker state."""
+    return {'status': 'ok', 'mongodb': mongodb_status()}
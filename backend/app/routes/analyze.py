@@ -2,7 +2,7 @@ from fastapi import APIRouter, UploadFile, File, Form
 from pydantic import BaseModel
 import uuid
 
-from app.core.emotion_model import get_emotion_pipe
+from app.core.emotion_model import predict_emotion
 from app.core.response_templates import build_response
 from app.core.chat_utils import combine_user_text
 
@@ -16,11 +16,7 @@ class TextAnalysisRequest(BaseModel):
 @router.post('/text')
 def analyze_text(req: TextAnalysisRequest):
     # Call Hugging Face emotion model
-    emotion_pipe = get_emotion_pipe()
-    preds = emotion_pipe(req.text)[0]  # list[dict]: {'label', 'score'}
-    top = max(preds, key=lambda x: x["score"])
-    label = top["label"].lower()
-    score = float(top["score"])
+    label, score = predict_emotion(req.text)
 
     # Generate empathetic response and suggestions
     risk_level, empathetic_message, suggestions = build_response(label, score)
@@ -75,11 +71,7 @@ async def analyze_chat(req: ChatAnalyzeRequest):
         }
     
     # Run emotion analysis on combined text
-    emotion_pipe = get_emotion_pipe()
-    preds = emotion_pipe(full_user_text)[0]
-    top = max(preds, key=lambda x: x["score"])
-    label = top["label"].lower()
-    score = float(top["score"])
+    label, score = predict_emotion(full_user_text)
     
     # Generate empathetic response
     risk, empathetic_msg, suggestions = build_response(label, score)
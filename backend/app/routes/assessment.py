@@ -7,7 +7,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
-from app.core.database import get_collection, clean_for_storage
+from app.core.repositories import assessment_repo
 from app.core.auth import get_current_user
 
 router = APIRouter()
@@ -39,34 +39,23 @@ async def save_assessment(request: AssessmentSaveRequest, user_id: str = Depends
         if request.userId != user_id:
             raise HTTPException(status_code=403, detail="Cannot save assessment for another user")
         
-        assessment_col = get_collection('assessments')
+        assessment_doc = {
+            '_id': user_id,  # One assessment per user
+            'userId': user_id,
+            'assessmentData': request.assessmentData.dict(),
+            'completedAt': request.completedAt,
+            'updatedAt': datetime.now().isoformat()
+        }
         
-        if assessment_col is not None:
-            # MongoDB storage
-            assessment_doc = {
-                '_id': user_id,  # One assessment per user
-                'userId': user_id,
-                'assessmentData': request.assessmentData.dict(),
-                'completedAt': request.completedAt,
-                'updatedAt': datetime.now().isoformat()
-            }
-            
-            cleaned_data = clean_for_storage(assessment_doc)
-            
-            # Upsert - update if exists, insert if not
-            assessment_col.update_one(
-                {'_id': user_id},
-                {'$set': cleaned_data},
-                upsert=True
-            )
-            
-            return {
-                "success": True,
-                "message": "Assessment saved successfully",
-                "userId": user_id
-            }
-        else:
+        # Upsert - update if exists, insert if not
+        if not await assessment_repo.save(assessment_doc):
             raise HTTPException(status_code=500, detail="Database not available")
+        
+        return {
+            "success": True,
+            "message": "Assessment saved successfully",
+            "userId": user_id
+        }
             
     except HTTPException:
         raise
@@ -77,25 +66,22 @@ async def save_assessment(request: AssessmentSaveRequest, user_id: str = Depends
 async def get_assessment(user_id: str = Depends(get_current_user)):
     """Get user's mental health assessment."""
     try:
-        assessment_col = get_collection('assessments')
+        if not await assessment_repo.available():
+            raise HTTPException(status_code=500, detail="Database not available")
         
-        if assessment_col is not None:
-            # MongoDB storage
-            assessment = assessment_col.find_one({'_id': user_id})
-            
-            if assessment:
-                return {
-                    "success": True,
-                    "assessmentData": assessment.get('assessmentData'),
-                    "completedAt": assessment.get('completedAt')
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": "No assessment found"
-                }
+        assessment = await assessment_repo.get(user_id)
+        
+        if assessment:
+            return {
+                "success": True,
+                "assessmentData": assessment.get('assessmentData'),
+                "completedAt": assessment.get('completedAt')
+            }
         else:
-            raise HTTPException(status_code=500, detail="Database not available")
+            return {
+                "success": False,
+                "message": "No assessment found"
+            }
             
     except HTTPException:
         raise
@@ -8,7 +8,7 @@ import os
 import uuid
 import base64
 import json
-from app.core.database import get_database
+from app.core.repositories import account_repo
 import random
 import smtplib
 from email.mime.text import MIMEText
@@ -86,10 +86,9 @@ async def google_login(auth: GoogleAuthRequest):
         
         # Create or update user profile in database
         try:
-            db = get_database()
-            if db is not None:
+            if await account_repo.available():
                 # Check if user already exists
-                existing_user = db.users.find_one({"userId": user_id})
+                existing_user = await account_repo.find_by_user_id(user_id)
                 
                 if not existing_user:
                     # Create new user profile
@@ -104,7 +103,7 @@ async def google_login(auth: GoogleAuthRequest):
                             "notifications": True
                         }
                     }
-                    db.users.insert_one(user_profile)
+                    await account_repo.create(user_profile)
                     print(f"✅ Created user profile for {email}")
                 else:
                     print(f"✅ User profile already exists for {email}")
@@ -156,10 +155,9 @@ async def email_signup(request: EmailSignupRequest):
         
         # Create user profile in database
         try:
-            db = get_database()
-            if db is not None:
+            if await account_repo.available():
                 # Check if user already exists
-                existing_user = db.users.find_one({"email": request.email})
+                existing_user = await account_repo.find_by_email(request.email)
                 
                 if existing_user:
                     raise HTTPException(status_code=400, detail="Email already registered")
@@ -178,7 +176,7 @@ async def email_signup(request: EmailSignupRequest):
                         "notifications": True
                     }
                 }
-                db.users.insert_one(user_profile)
+                await account_repo.create(user_profile)
                 print(f"✅ Created user profile for {request.email}")
         except HTTPException:
             raise
@@ -301,11 +299,9 @@ def send_verification_email(email: str, code: str, name: str):
 async def email_login(request: EmailLoginRequest):
     """Login existing user with email/password"""
     try:
-        db = get_database()
-        
-        if db is not None:
+        if await account_repo.available():
             # Find user in database
-            user = db.users.find_one({"email": request.email})
+            user = await account_repo.find_by_email(request.email)
             
             if not user:
                 raise HTTPException(status_code=401, detail="Invalid email or password")
@@ -1,24 +1,23 @@
 """
 Conversation storage and analysis endpoints.
-Stores chat conversations in MongoDB Atlas (with file fallback).
+Stores chat conversations in MongoDB Atlas (with file fallback) via `conversation_repo`.
+Clients save incrementally through /append, sending only the messages after
+the last sequence number the server acknowledged; /save replaces the whole
+conversation.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 from datetime import datetime
 import json
-import os
 from app.core.groq_client import chat_with_groq
-from app.core.database import get_collection, clean_for_storage
+from app.core.repositories import conversation_repo
+from app.core.conversation_log import HOT_WINDOW, SequenceGap
 from app.core.auth import get_current_user, get_optional_user
 
 router = APIRouter()
 
-# Fallback file-based storage
-CONVERSATIONS_DIR = "data/conversations"
-os.makedirs(CONVERSATIONS_DIR, exist_ok=True)
-
 class Message(BaseModel):
     role: str
     content: str
@@ -32,6 +31,15 @@ class ConversationSaveRequest(BaseModel):
     mainEmotion: Optional[str] = None
     riskLevel: Optional[str] = None
 
+class ConversationAppendRequest(BaseModel):
+    sessionId: str
+    userId: Optional[str] = "anonymous"
+    afterSeq: int = 0  # Last sequence number the server acknowledged (0 for a new conversation)
+    messages: List[Message]
+    intakeSummary: Optional[str] = None
+    mainEmotion: Optional[str] = None
+    riskLevel: Optional[str] = None
+
 class ConversationResponse(BaseModel):
     sessionId: str
     messages: List[Message]
@@ -57,76 +65,6 @@ class AIInsightsResponse(BaseModel):
     urgencyLevel: str
     progressIndicators: str
 
-async def save_conversation_to_db(conversation_data: dict):
-    """Save conversation to MongoDB or file."""
-    conv_col = get_collection('conversations')
-    
-    if conv_col is not None:
-        # MongoDB storage - clean data to minimize storage (M0 512MB limit)
-        cleaned_data = clean_for_storage(conversation_data)
-        conv_col.update_one(
-            {'_id': conversation_data['sessionId']},
-            {'$set': cleaned_data},
-            upsert=True
-        )
-    else:
-        # File storage fallback
-        filepath = os.path.join(CONVERSATIONS_DIR, f"{conversation_data['sessionId']}.json")
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(conversation_data, f, indent=2)
-
-async def get_conversation_from_db(session_id: str) -> Optional[dict]:
-    """Get conversation from MongoDB or file."""
-    conv_col = get_collection('conversations')
-    
-    if conv_col is not None:
-        # MongoDB storage
-        return conv_col.find_one({'_id': session_id})
-    else:
-        # File storage fallback
-        filepath = os.path.join(CONVERSATIONS_DIR, f"{session_id}.json")
-        if not os.path.exists(filepath):
-            return None
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-
-async def list_conversations_from_db(user_id: Optional[str] = None) -> List[dict]:
-    """List conversations from MongoDB or file, filtered by user_id if provided."""
-    conv_col = get_collection('conversations')
-    
-    if conv_col is not None:
-        # MongoDB storage
-        conversations = []
-        query = {'userId': user_id} if user_id else {}
-        for doc in conv_col.find(query).sort('savedAt', -1):
-            conversations.append({
-                "sessionId": doc['sessionId'],
-                "savedAt": doc['savedAt'],
-                "messageCount": doc['messageCount'],
-                "mainEmotion": doc.get('mainEmotion', 'neutral'),
-                "riskLevel": doc.get('riskLevel', 'low')
-            })
-        return conversations
-    else:
-        # File storage fallback
-        conversations = []
-        for filename in os.listdir(CONVERSATIONS_DIR):
-            if filename.endswith('.json'):
-                filepath = os.path.join(CONVERSATIONS_DIR, filename)
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Filter by userId if provided
-                    if user_id and data.get('userId') != user_id:
-                        continue
-                    conversations.append({
-                        "sessionId": data["sessionId"],
-                        "savedAt": data["savedAt"],
-                        "messageCount": data["messageCount"],
-                        "mainEmotion": data.get("mainEmotion", "neutral"),
-                        "riskLevel": data.get("riskLevel", "low")
-                    })
-        return sorted(conversations, key=lambda x: x['savedAt'], reverse=True)
-
 @router.post("/save")
 async def save_conversation(request: ConversationSaveRequest):
     """Save a conversation for later analysis."""
@@ -142,7 +80,7 @@ async def save_conversation(request: ConversationSaveRequest):
             "messageCount": len(request.messages)
         }
         
-        await save_conversation_to_db(conversation_data)
+        await conversation_repo.save(conversation_data)
         
         return {
             "success": True,
@@ -152,11 +90,44 @@ async def save_conversation(request: ConversationSaveRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save conversation: {str(e)}")
 
+@router.post("/append")
+async def append_messages(request: ConversationAppendRequest):
+    """
+    Append the messages added after `afterSeq`.
+
+    Messages the server already has (a resent batch) are skipped. If `afterSeq`
+    is past the stored messages the request is rejected (409) with the current
+    sequence number in the detail, to resend from there.
+    """
+    try:
+        result = await conversation_repo.append(
+            request.sessionId,
+            request.afterSeq,
+            [msg.dict() for msg in request.messages],
+            {
+                "userId": request.userId,
+                "intakeSummary": request.intakeSummary,
+                "mainEmotion": request.mainEmotion,
+                "riskLevel": request.riskLevel
+            }
+        )
+        
+        return {
+            "success": True,
+            "sessionId": request.sessionId,
+            "seq": result["messageCount"],
+            "appended": result["appended"]
+        }
+    except SequenceGap as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "seq": e.current})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to append messages: {str(e)}")
+
 @router.get("/list")
 async def list_conversations(user_id: str = Depends(get_current_user)):
     """List all saved conversations for the authenticated user."""
     try:
-        conversations = await list_conversations_from_db(user_id)
+        conversations = await conversation_repo.list_summaries(user_id)
         return {"conversations": conversations, "total": len(conversations)}
     except HTTPException:
         raise
@@ -167,7 +138,7 @@ async def list_conversations(user_id: str = Depends(get_current_user)):
 async def get_conversation(session_id: str, user_id: str = Depends(get_current_user)):
     """Retrieve a specific conversation (user must own it)."""
     try:
-        data = await get_conversation_from_db(session_id)
+        data = await conversation_repo.get(session_id)
         if not data:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
@@ -181,12 +152,38 @@ async def get_conversation(session_id: str, user_id: str = Depends(get_current_u
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve conversation: {str(e)}")
 
+@router.get("/{session_id}/messages")
+async def get_conversation_messages(
+    session_id: str,
+    before: Optional[int] = Query(None, ge=1, description="Only messages with a lower sequence number"),
+    limit: int = Query(HOT_WINDOW, ge=1, le=500),
+    user_id: str = Depends(get_current_user)
+):
+    """Page through a conversation's full history, including archived messages (user must own it)."""
+    try:
+        data = await conversation_repo.get(session_id)
+        if not data:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        
+        if data.get('userId') != user_id:
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        page = await conversation_repo.messages(session_id, before, limit)
+        if page is None:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        
+        return {"sessionId": session_id, **page}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve messages: {str(e)}")
+
 @router.delete("/{session_id}")
 async def delete_conversation(session_id: str, user_id: str = Depends(get_current_user)):
     """Delete a specific conversation (user must own it)."""
     try:
         # First verify the conversation exists and user owns it
-        data = await get_conversation_from_db(session_id)
+        data = await conversation_repo.get(session_id)
         if not data:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
@@ -194,20 +191,8 @@ async def delete_conversation(session_id: str, user_id: str = Depends(get_curren
             raise HTTPException(status_code=403, detail="Access denied")
         
         # Delete from MongoDB or file
-        conv_col = get_collection('conversations')
-        
-        if conv_col is not None:
-            # MongoDB storage
-            result = conv_col.delete_one({'_id': session_id})
-            if result.deleted_count == 0:
-                raise HTTPException(status_code=404, detail="Conversation not found")
-        else:
-            # File storage fallback
-            filepath = os.path.join(CONVERSATIONS_DIR, f"{session_id}.json")
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            else:
-                raise HTTPException(status_code=404, detail="Conversation not found")
+        if not await conversation_repo.delete(session_id):
+            raise HTTPException(status_code=404, detail="Conversation not found")
         
         return {"success": True, "message": "Conversation deleted successfully"}
     except HTTPException:
@@ -220,7 +205,7 @@ async def analyze_conversation(session_id: str, user_id: str = Depends(get_curre
     """Analyze a conversation for stress patterns and insights (user must own it)."""
     try:
         # Get conversation
-        data = await get_conversation_from_db(session_id)
+        data = await conversation_repo.get(session_id)
         if not data:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
@@ -228,7 +213,8 @@ async def analyze_conversation(session_id: str, user_id: str = Depends(get_curre
         if data.get('userId') != user_id:
             raise HTTPException(status_code=403, detail="Access denied")
         
-        messages = data["messages"]
+        # The stored document only holds the newest messages; analyze the whole conversation
+        messages = await conversation_repo.history(session_id)
         user_messages = [msg for msg in messages if msg["role"] == "user"]
         
         # Analyze patterns
@@ -334,7 +320,7 @@ async def get_ai_insights(session_id: str, user_id: str = Depends(get_current_us
     """Get deep AI-powered insights from a conversation using Groq (user must own it)."""
     try:
         # Load conversation
-        conversation = await get_conversation_from_db(session_id)
+        conversation = await conversation_repo.get(session_id)
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
@@ -342,8 +328,9 @@ async def get_ai_insights(session_id: str, user_id: str = Depends(get_current_us
         if conversation.get('userId') != user_id:
             raise HTTPException(status_code=403, detail="Access denied")
         
-        # Extract user messages only
-        user_messages = [msg["content"] for msg in conversation["messages"] if msg["role"] == "user"]
+        # Extract user messages only, from the whole conversation (not just the hot window)
+        messages = await conversation_repo.history(session_id)
+        user_messages = [msg["content"] for msg in messages if msg["role"] == "user"]
         
         if not user_messages:
             # Return default insights if no user messages
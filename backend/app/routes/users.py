@@ -1,23 +1,19 @@
 """
 User profile and data management endpoints.
-Stores user information in MongoDB Atlas (with file fallback).
+Stores user information in MongoDB Atlas (with file fallback) via `user_repo`.
+lastActive is buffered and written in batches by `app.core.last_active`.
 """
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional, Dict
 from datetime import datetime
-import json
-import os
 import hashlib
-from app.core.database import get_collection, clean_for_storage
+from app.core.repositories import user_repo
+from app.core.last_active import last_active
 
 router = APIRouter()
 
-# Fallback file-based storage
-USERS_DIR = "data/users"
-os.makedirs(USERS_DIR, exist_ok=True)
-
 class AssessmentScore(BaseModel):
     date: str
     depressionScore: int
@@ -78,61 +74,6 @@ def generate_user_id(email: Optional[str] = None) -> str:
         import uuid
         return str(uuid.uuid4())[:16]
 
-def get_user_file_path(user_id: str) -> str:
-    """Get the file path for a user's data."""
-    return os.path.join(USERS_DIR, f"{user_id}.json")
-
-def use_mongodb() -> bool:
-    """Check if MongoDB is available."""
-    return get_collection('users') is not None
-
-async def save_user_to_db(user_data: dict):
-    """Save user to MongoDB or file."""
-    users_col = get_collection('users')
-    
-    if users_col is not None:
-        # MongoDB storage - clean data to minimize storage
-        cleaned_data = clean_for_storage(user_data)
-        users_col.update_one(
-            {'_id': user_data['profile']['userId']},
-            {'$set': cleaned_data},
-            upsert=True
-        )
-    else:
-        # File storage fallback
-        file_path = get_user_file_path(user_data['profile']['userId'])
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(user_data, f, indent=2)
-
-async def get_user_from_db(user_id: str) -> Optional[dict]:
-    """Get user from MongoDB or file."""
-    users_col = get_collection('users')
-    
-    if users_col is not None:
-        # MongoDB storage
-        user_data = users_col.find_one({'_id': user_id})
-        return user_data
-    else:
-        # File storage fallback
-        file_path = get_user_file_path(user_id)
-        if not os.path.exists(file_path):
-            return None
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-
-async def delete_user_from_db(user_id: str):
-    """Delete user from MongoDB or file."""
-    users_col = get_collection('users')
-    
-    if users_col is not None:
-        # MongoDB storage
-        users_col.delete_one({'_id': user_id})
-    else:
-        # File storage fallback
-        file_path = get_user_file_path(user_id)
-        if os.path.exists(file_path):
-            os.remove(file_path)
-
 @router.post("/create")
 async def create_user(request: CreateUserRequest):
     """Create a new user profile."""
@@ -140,7 +81,7 @@ async def create_user(request: CreateUserRequest):
         user_id = generate_user_id(request.email)
         
         # Check if user already exists
-        existing_user = await get_user_from_db(user_id)
+        existing_user = await user_repo.get(user_id)
         if existing_user:
             return {"userId": user_id, "message": "User already exists", "existing": True}
         
@@ -168,7 +109,7 @@ async def create_user(request: CreateUserRequest):
             "therapistInfo": None
         }
         
-        await save_user_to_db(user_data)
+        await user_repo.save(user_data)
         
         return {"userId": user_id, "message": "User created successfully", "existing": False}
         
@@ -195,16 +136,14 @@ async def get_user_profile(user_id: str):
                 "emergencyContacts": []
             }
         
-        user_data = await get_user_from_db(user_id)
+        user_data = await user_repo.get(user_id)
         
         if not user_data:
             raise HTTPException(status_code=404, detail="User not found")
         
-        # Update last active
-        user_data["profile"]["lastActive"] = datetime.now().isoformat()
-        await save_user_to_db(user_data)
-        
-        return user_data
+        # Reading is activity too, but the write is batched
+        last_active.touch(user_id)
+        return last_active.overlay(user_data)
         
     except HTTPException:
         raise
@@ -216,26 +155,18 @@ async def get_user_profile(user_id: str):
 async def update_user_profile(user_id: str, request: UpdateProfileRequest):
     """Update user profile information."""
     try:
-        user_data = await get_user_from_db(user_id)
+        # Update only the fields that were sent
+        changes = {f"profile.{field}": value for field, value in request.dict(exclude_none=True).items()}
+        if changes:
+            user_data = await user_repo.update(user_id, {"$set": changes}, projection={"profile": 1})
+        else:
+            user_data = await user_repo.get(user_id)
         
         if not user_data:
             raise HTTPException(status_code=404, detail="User not found")
         
-        # Update fields
-        if request.firstName is not None:
-            user_data["profile"]["firstName"] = request.firstName
-        if request.lastName is not None:
-            user_data["profile"]["lastName"] = request.lastName
-        if request.age is not None:
-            user_data["profile"]["age"] = request.age
-        if request.email is not None:
-            user_data["profile"]["email"] = request.email
-        
-        user_data["profile"]["lastActive"] = datetime.now().isoformat()
-        
-        await save_user_to_db(user_data)
-        
-        return {"message": "Profile updated successfully", "profile": user_data["profile"]}
+        last_active.touch(user_id)
+        return {"message": "Profile updated successfully", "profile": last_active.overlay(user_data)["profile"]}
         
     except HTTPException:
         raise
@@ -246,11 +177,6 @@ async def update_user_profile(user_id: str, request: UpdateProfileRequest):
 async def add_assessment_result(user_id: str, request: AddAssessmentRequest):
     """Add an assessment result to user's history."""
     try:
-        user_data = await get_user_from_db(user_id)
-        
-        if not user_data:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         # Add assessment
         assessment = {
             "date": datetime.now().isoformat(),
@@ -261,11 +187,12 @@ async def add_assessment_result(user_id: str, request: AddAssessmentRequest):
             "severity": request.severity
         }
         
-        user_data["assessmentHistory"].append(assessment)
-        user_data["profile"]["lastActive"] = datetime.now().isoformat()
+        updated = await user_repo.update(user_id, {"$push": {"assessmentHistory": assessment}}, projection={"_id": 1})
         
-        await save_user_to_db(user_data)
+        if not updated:
+            raise HTTPException(status_code=404, detail="User not found")
         
+        last_active.touch(user_id)
         return {"message": "Assessment added successfully", "assessment": assessment}
         
     except HTTPException:
@@ -277,7 +204,7 @@ async def add_assessment_result(user_id: str, request: AddAssessmentRequest):
 async def get_assessment_history(user_id: str):
     """Get user's assessment history."""
     try:
-        user_data = await get_user_from_db(user_id)
+        user_data = await user_repo.get(user_id)
         
         if not user_data:
             raise HTTPException(status_code=404, detail="User not found")
@@ -293,19 +220,13 @@ async def get_assessment_history(user_id: str):
 async def link_conversation(user_id: str, session_id: str):
     """Link a conversation to a user's profile."""
     try:
-        user_data = await get_user_from_db(user_id)
-        
-        if not user_data:
-            raise HTTPException(status_code=404, detail="User not found")
-        
         # Add conversation ID if not already present
-        if session_id not in user_data["conversationIds"]:
-            user_data["conversationIds"].append(session_id)
+        updated = await user_repo.update(user_id, {"$addToSet": {"conversationIds": session_id}}, projection={"_id": 1})
         
-        user_data["profile"]["lastActive"] = datetime.now().isoformat()
-        
-        await save_user_to_db(user_data)
+        if not updated:
+            raise HTTPException(status_code=404, detail="User not found")
         
+        last_active.touch(user_id)
         return {"message": "Conversation linked successfully"}
         
     except HTTPException:
@@ -317,26 +238,18 @@ async def link_conversation(user_id: str, session_id: str):
 async def update_preferences(user_id: str, request: PreferencesRequest):
     """Update user preferences."""
     try:
-        user_data = await get_user_from_db(user_id)
+        # Update only the preferences that were sent
+        changes = {f"preferences.{field}": value for field, value in request.dict(exclude_none=True).items()}
+        if changes:
+            user_data = await user_repo.update(user_id, {"$set": changes}, projection={"preferences": 1})
+        else:
+            user_data = await user_repo.get(user_id)
         
         if not user_data:
             raise HTTPException(status_code=404, detail="User not found")
         
-        # Update preferences
-        if request.theme is not None:
-            user_data["preferences"]["theme"] = request.theme
-        if request.notifications is not None:
-            user_data["preferences"]["notifications"] = request.notifications
-        if request.reminderTime is not None:
-            user_data["preferences"]["reminderTime"] = request.reminderTime
-        if request.language is not None:
-            user_data["preferences"]["language"] = request.language
-        
-        user_data["profile"]["lastActive"] = datetime.now().isoformat()
-        
-        await save_user_to_db(user_data)
-        
-        return {"message": "Preferences updated successfully", "preferences": user_data["preferences"]}
+        last_active.touch(user_id)
+        return {"message": "Preferences updated successfully", "preferences": user_data.get("preferences", {})}
         
     except HTTPException:
         raise
@@ -347,12 +260,13 @@ async def update_preferences(user_id: str, request: PreferencesRequest):
 async def delete_user(user_id: str):
     """Delete a user and all their data."""
     try:
-        user_data = await get_user_from_db(user_id)
+        user_data = await user_repo.get(user_id)
         
         if not user_data:
             raise HTTPException(status_code=404, detail="User not found")
         
-        await delete_user_from_db(user_id)
+        await user_repo.delete(user_id)
+        last_active.discard(user_id)
         
         return {"message": "User data deleted successfully"}
         
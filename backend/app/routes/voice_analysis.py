@@ -3,22 +3,45 @@ Voice stress analysis using MFCC + Librosa + CNN.
 Analyzes user's voice to detect stress levels and emotional state.
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
 from typing import Optional, List
-import librosa
-import numpy as np
 from datetime import datetime
-import io
-import tempfile
+import asyncio
+import json
 import os
+import time
+import uuid
 from groq import Groq
 from app.core.auth import get_optional_user, get_current_user
-from app.core.database import get_database
-import soundfile as sf
+from app.core.database import get_async_database, report_failure
+from app.core.audio_features import compute_features, summarize_features
+from app.core.audio_decode import decode_audio
+from app.core.metrics import get_metrics, record_timing, increment, timed
+from app.core.audio_transcode import prepare_for_transcription, MIN_TRANSCODE_BYTES, WHISPER_SAMPLE_RATE
+from app.core.transcription import transcribe_chunks, CHUNK_SECONDS
+from app.core.groq_client import whisper_limiter
+from app.core.voice_cache import voice_cache, audio_key
+from app.core.emotion_model import predict_emotion
+from app.core.response_templates import build_response
+from app.core.voice_stream import VoiceStreamSession
+from app.core.vad import trim_for_analysis
+from app.core.voice_timeline import build_timeline
+from app.core.feature_store import encode_mfcc, save_features, FEATURE_STORE_ENABLED
+from app.core.voice_baseline import clip_observation, update_baseline, normalize
+from app.core.feature_payload import decode_payload, MAX_PAYLOAD_BYTES
+from app.core.analysis_profiles import PROFILES, ACCURATE, choose_profile, validate_profile, analysis_slot
+from app.core.upload_sessions import upload_sessions, UPLOAD_CHUNK_BYTES, MAX_CHUNK_BYTES, UPLOAD_SESSION_TTL
+from app.core.voice_model import get_classifier
+from app.core.voice_batch import analyze_batch, to_csv, to_ndjson
+from app.core.uploads import read_upload, read_request_body, inflight_bytes, MAX_AUDIO_UPLOAD_BYTES, MAX_TRANSCRIPTION_UPLOAD_BYTES, MAX_BATCH_UPLOAD_FILES
 
 router = APIRouter()
 
+# Trained CNN when VOICE_MODEL_PATH is set, otherwise the mock classifier
+classifier = get_classifier()
+
 class VoiceAnalysisResult(BaseModel):
     stressLevel: str  # "low", "medium", "high", "very_high"
     confidence: float
@@ -27,6 +50,9 @@ class VoiceAnalysisResult(BaseModel):
     timestamp: str
     suggestions: List[str]
     mfccFeatures: Optional[dict] = None
+    timeline: Optional[List[dict]] = None
+    baseline: Optional[dict] = None  # Deviation from the user's usual voice
+    profile: Optional[str] = None    # Analysis profile used ("accurate" or "fast")
 
 class TranscriptionResult(BaseModel):
     success: bool
@@ -34,82 +60,21 @@ class TranscriptionResult(BaseModel):
     language: Optional[str] = None
     duration: Optional[float] = None
 
-# CNN model placeholder - you'll need to train and load your actual model
-# For now, we'll use a mock analysis based on MFCC features
-class MockStressClassifier:
-    """
-    Mock classifier for demonstration.
-    Replace this with your actual trained CNN model.
-    """
-    
-    def __init__(self):
-        self.classes = ["calm", "neutral", "stressed", "very_stressed"]
-        self.emotions = ["calm", "neutral", "anxious", "stressed", "overwhelmed"]
-    
-    def predict(self, mfcc_features):
-        """
-        Mock prediction based on MFCC features.
-        In production, this should load and run your trained CNN model.
-        """
-        # Calculate statistics from MFCCs
-        mfcc_mean = np.mean(mfcc_features)
-        mfcc_std = np.std(mfcc_features)
-        mfcc_var = np.var(mfcc_features)
-        mfcc_max = np.max(mfcc_features)
-        mfcc_min = np.min(mfcc_features)
-        mfcc_range = mfcc_max - mfcc_min
-        
-        # Calculate dynamic features for more variability
-        # Energy (higher energy can indicate stress/excitement)
-        energy_score = mfcc_var / 100.0
-        
-        # Spectral variability (rapid changes suggest stress)
-        temporal_var = np.var(np.diff(np.mean(mfcc_features, axis=0)))
-        variability_score = min(temporal_var / 50.0, 1.0)
-        
-        # Combined stress score (0-1)
-        stress_score = (energy_score * 0.4 + variability_score * 0.3 + (mfcc_std / 30.0) * 0.3)
-        stress_score = min(max(stress_score, 0), 1)  # Clamp to 0-1
-        
-        # Determine stress level based on score
-        if stress_score > 0.7:
-            stress_level = "high"
-            emotion = "stressed"
-            confidence = 0.75 + (stress_score * 0.15)
-        elif stress_score > 0.45:
-            stress_level = "medium"
-            emotion = "anxious"
-            confidence = 0.70 + (stress_score * 0.15)
-        elif stress_score > 0.25:
-            stress_level = "low"
-            emotion = "neutral"
-            confidence = 0.72 + (stress_score * 0.10)
-        else:
-            stress_level = "low"
-            emotion = "calm"
-            confidence = 0.80 + ((1 - stress_score) * 0.15)
-        
-        # Generate realistic emotion scores based on stress
-        base_calm = max(0.1, 1 - stress_score)
-        base_stress = stress_score
-        
-        emotion_scores = {
-            "calm": round(base_calm * 0.7, 2),
-            "neutral": round(0.2 + (0.3 if 0.3 < stress_score < 0.6 else 0.1), 2),
-            "anxious": round(base_stress * 0.5 if stress_score > 0.4 else 0.15, 2),
-            "stressed": round(base_stress * 0.7 if stress_score > 0.5 else 0.10, 2),
-            "overwhelmed": round(base_stress * 0.9 if stress_score > 0.7 else 0.05, 2)
-        }
-        
-        # Normalize emotion scores
-        total = sum(emotion_scores.values())
-        if total > 0:
-            emotion_scores = {k: round(v/total, 2) for k, v in emotion_scores.items()}
-        
-        return stress_level, emotion, round(confidence, 2), emotion_scores
+class VoiceCheckinResult(BaseModel):
+    sessionId: str
+    transcript: str
+    voice: VoiceAnalysisResult
+    textEmotion: Optional[dict] = None
+    riskLevel: str
+    empatheticMessage: Optional[str] = None
+    suggestions: List[str]
+    timings: dict
 
-# Initialize mock classifier
-classifier = MockStressClassifier()
+class UploadSessionInit(BaseModel):
+    purpose: str  # "voice" or "transcribe"
+    size: int
+    filename: Optional[str] = None
+    contentType: Optional[str] = None
 
 def get_groq_client():
     """Get Groq client for Whisper transcription."""
@@ -131,57 +96,52 @@ def get_groq_client():
     print(f"✅ GROQ_API_KEY loaded: {api_key[:20]}...")
     return Groq(api_key=api_key)
 
-def extract_mfcc_features(audio_file_bytes: bytes, sample_rate: int = 16000):
+def load_features(audio_file_bytes: bytes, profile: str = ACCURATE, cache_key: Optional[str] = None) -> dict:
     """
-    Extract MFCC features from audio using Librosa.
+    Extract MFCC and other frame-level features from audio.
     
     Args:
-        audio_file_bytes: Raw audio file bytes (WAV format)
-        sample_rate: Target sample rate (16kHz recommended)
+        audio_file_bytes: Raw audio file bytes (WAV, FLAC, WebM/Opus, ...)
+        profile: Analysis profile ("accurate" = 16 kHz / n_fft 2048, "fast" = 8 kHz / n_fft 512)
+        cache_key: Content hash of the audio; reuses cached features when given
     
     Returns:
-        mfcc_features: 2D numpy array of shape (n_mfcc, time_steps)
-        audio_duration: Duration in seconds
-        features_dict: Additional audio features for analysis
+        `compute_features` output plus "duration" (seconds of speech), "speech_ratio"
+        and "segments" (the spans of the upload kept by VAD)
     """
-    try:
-        # Load audio from bytes (WAV format works directly with librosa/soundfile)
-        audio_data, sr = librosa.load(io.BytesIO(audio_file_bytes), sr=sample_rate, mono=True)
-        
-        # Get duration
-        duration = librosa.get_duration(y=audio_data, sr=sr)
-        
-        # Extract MFCC features (optimized settings)
-        # Reduced n_mfcc from 40 to 20 for faster processing
-        mfcc = librosa.feature.mfcc(
-            y=audio_data,
-            sr=sr,
-            n_mfcc=20,
-            n_fft=2048,
-            hop_length=512
+    settings = PROFILES[profile]
+    sample_rate = settings["sample_rate"]
+    features = get_cached_features(cache_key, sample_rate)
+    if features is None:
+        # Decode in-process (soundfile for WAV/FLAC, PyAV for webm/opus) and resample with soxr
+        audio_data, sr = decode_audio(audio_file_bytes, sample_rate)
+        
+        # Drop leading/trailing silence and shorten long pauses (energy VAD)
+        audio_data, speech = trim_for_analysis(audio_data, sr)
+        
+        # MFCC (n_mfcc=20), ZCR, spectral centroid and RMS all come from one
+        # shared framing/power spectrogram at the profile's resolution
+        features = compute_features(
+            audio_data, sr, n_fft=settings["n_fft"], hop_length=settings["hop_length"], n_mels=settings["n_mels"]
         )
         
-        # Additional features for better stress detection
-        zcr = librosa.feature.zero_crossing_rate(audio_data)
-        spectral_centroid = librosa.feature.spectral_centroid(y=audio_data, sr=sr)
-        rms = librosa.feature.rms(y=audio_data)
-        
-        # Package features (removed slow pitch detection)
-        features_dict = {
-            "duration": float(duration),
-            "mean_mfcc": float(np.mean(mfcc)),
-            "std_mfcc": float(np.std(mfcc)),
-            "var_mfcc": float(np.var(mfcc)),
-            "mean_zcr": float(np.mean(zcr)),
-            "mean_spectral_centroid": float(np.mean(spectral_centroid)),
-            "mean_rms": float(np.mean(rms)),
-            "mfcc_shape": list(mfcc.shape)
-        }
-        
-        return mfcc, duration, features_dict
-        
-    except Exception as e:
-        raise ValueError(f"Failed to extract MFCC features: {str(e)}")
+        # Duration of speech (what the 3-60 second check applies to)
+        features["duration"] = speech["speech_duration"]
+        features["speech_ratio"] = speech["speech_ratio"]
+        # Kept spans of the upload, so timeline times refer to the original recording
+        features["segments"] = speech["segments"]
+        cache_features(cache_key, sample_rate, features)
+    return features
+
+def get_cached_features(cache_key: Optional[str], sample_rate: int) -> Optional[dict]:
+    """Frame-level features (plus "duration") previously computed for the same audio."""
+    if cache_key is None:
+        return None
+    return voice_cache.get("features", f"{cache_key}:{sample_rate}")
+
+def cache_features(cache_key: Optional[str], sample_rate: int, features: dict):
+    if cache_key is not None:
+        voice_cache.put("features", f"{cache_key}:{sample_rate}", features)
 
 def get_suggestions_for_stress_level(stress_level: str, emotion: str) -> List[str]:
     """Generate personalized suggestions based on stress level."""
@@ -216,9 +176,177 @@ def get_suggestions_for_stress_level(stress_level: str, emotion: str) -> List[st
     
     return suggestions_map.get(stress_level, suggestions_map["medium"])
 
+def validate_duration(duration: float):
+    """Reject recordings outside the supported 3-60 second range."""
+    if duration < 3:
+        raise HTTPException(
+            status_code=400,
+            detail="Recording too short. Please provide at least 3 seconds of speech."
+        )
+    elif duration > 60:
+        raise HTTPException(
+            status_code=400,
+            detail="Recording too long. Please limit to 60 seconds."
+        )
+
+async def save_voice_analysis(current_user: Optional[str], result: VoiceAnalysisResult, duration: float, mfcc=None,
+                              profile: str = ACCURATE):
+    """
+    Save an analysis for a logged-in user (never fails the request).
+    The MFCC matrix, if given, goes to the compact feature store for later re-scoring.
+    """
+    print(f"🔐 Current user: {current_user}")
+    if not current_user:
+        print(f"⚠️ No user logged in, voice analysis NOT saved to database")
+        return
+    try:
+        db = await get_async_database()
+        if db is not None:
+            voice_analysis_doc = {
+                "userId": current_user,
+                "stressLevel": result.stressLevel,
+                "confidence": result.confidence,
+                "emotion": result.emotion,
+                "emotionScores": result.emotionScores,
+                "duration": duration,
+                "analyzedAt": datetime.now(),
+                "suggestions": result.suggestions,
+                "profile": profile
+            }
+            if result.baseline is not None:
+                voice_analysis_doc["baseline"] = result.baseline
+            packed = None
+            if mfcc is not None and FEATURE_STORE_ENABLED:
+                settings = PROFILES[profile]
+                packed = encode_mfcc(
+                    mfcc, sample_rate=settings["sample_rate"], hop_length=settings["hop_length"], profile=profile
+                )
+            if packed is not None:
+                voice_analysis_doc["featureBytes"] = packed["bytes"]
+            inserted = await db.voice_analyses.insert_one(voice_analysis_doc)
+            print(f"✅ Voice analysis saved for user {current_user}")
+            if packed is not None:
+                try:
+                    await save_features(db, inserted.inserted_id, current_user, packed)
+                    print(f"   Stored features: {packed['bytes'] / 1024:.1f}KB ({packed['rawBytes'] / 1024:.1f}KB as float32)")
+                except Exception as e:
+                    print(f"⚠️ Failed to store voice features: {str(e)}")
+        else:
+            print(f"⚠️ Database not available, skipping save")
+    except Exception as e:
+        report_failure(e)
+        print(f"⚠️ Failed to save voice analysis: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        # Don't fail the request if saving fails
+
+async def get_user_baseline(current_user: Optional[str], mfcc_features) -> Optional[dict]:
+    """Record this clip in the user's baseline and normalize against it (None if unavailable)."""
+    if not current_user:
+        return None
+    try:
+        db = await get_async_database()
+        if db is None:
+            return None
+        observation = clip_observation(mfcc_features, classifier)
+        return normalize(observation, await update_baseline(db, current_user, observation))
+    except Exception as e:
+        report_failure(e)
+        print(f"⚠️ Voice baseline unavailable: {str(e)}")
+        return None
+
+async def run_voice_analysis(mfcc_features, duration: float, features_dict: dict, current_user: Optional[str],
+                             profile: str = ACCURATE, prediction: Optional[tuple] = None) -> VoiceAnalysisResult:
+    """
+    Validate duration, classify MFCC features, attach suggestions and save.
+    Shared by the upload and streaming endpoints. `prediction` is a cached
+    `classifier.predict` result for the same audio; the per-user steps
+    (baseline, personalization, save) always run.
+    """
+    validate_duration(duration)
+    
+    # Run through classifier (CNN model), off the event loop so concurrent requests can be micro-batched
+    if prediction is None:
+        prediction = await asyncio.to_thread(classifier.predict, mfcc_features)
+    stress_level, emotion, confidence, emotion_scores = prediction
+    
+    # Compare with the user's own baseline (one atomic update also returns it);
+    # fast-profile MFCCs are on a different scale, so they don't feed the baseline
+    baseline = await get_user_baseline(current_user, mfcc_features) if profile == ACCURATE else None
+    if baseline is not None and classifier.personalize:
+        stress_level, emotion, confidence, emotion_scores = classifier.predict_from_score(baseline["personalScore"])
+    
+    # Generate suggestions
+    suggestions = get_suggestions_for_stress_level(stress_level, emotion)
+    
+    # Prepare result
+    result = VoiceAnalysisResult(
+        stressLevel=stress_level,
+        confidence=confidence,
+        emotion=emotion,
+        emotionScores=emotion_scores,
+        timestamp=datetime.now().isoformat(),
+        suggestions=suggestions,
+        mfccFeatures=features_dict,
+        baseline=baseline,
+        profile=profile
+    )
+    
+    print(f"📊 Analysis complete: {stress_level} stress, {emotion} emotion, {confidence:.0%} confidence")
+    
+    # Save to database if user is logged in
+    await save_voice_analysis(current_user, result, duration, mfcc_features, profile)
+    
+    return result
+
+async def analyze_audio_bytes(audio_bytes, filename: Optional[str], timeline: bool, current_user: Optional[str],
+                              profile: str = ACCURATE) -> VoiceAnalysisResult:
+    """Stress analysis of an uploaded recording (shared by `/voice` and resumable uploads)."""
+    profile = choose_profile(profile, classifier)
+    
+    # The same recording reuses its features and raw classifier output; everything
+    # user-specific (baseline, personalization, history) is computed per request
+    cache_key = audio_key(audio_bytes)
+    prediction_key = f"{cache_key}:{profile}"
+    
+    with analysis_slot(profile):
+        # Extract MFCC features using Librosa
+        print(f"🎤 Processing audio file: {filename} ({profile} profile)")
+        try:
+            features = await asyncio.to_thread(load_features, audio_bytes, profile, cache_key)
+        except Exception as e:
+            raise ValueError(f"Failed to extract MFCC features: {str(e)}")
+        mfcc_features, duration = features["mfcc"], features["duration"]
+        
+        print(f"✅ MFCC features extracted: shape {mfcc_features.shape}, duration {duration:.2f}s")
+        
+        validate_duration(duration)
+        cached = voice_cache.get("prediction", prediction_key)
+        if cached is not None:
+            print(f"⚡ Voice prediction cache hit for {filename}")
+            features_dict, prediction = cached["mfccFeatures"], tuple(cached["prediction"])
+        else:
+            features_dict = summarize_features(features, duration)
+            prediction = await asyncio.to_thread(classifier.predict, mfcc_features)
+            stress_level, emotion, confidence, emotion_scores = prediction
+            voice_cache.put("prediction", prediction_key, {
+                "mfccFeatures": features_dict,
+                "prediction": [stress_level, emotion, float(confidence), {k: float(v) for k, v in emotion_scores.items()}]
+            })
+        result = await run_voice_analysis(mfcc_features, duration, features_dict, current_user, profile, prediction)
+    
+    if timeline:
+        # Reuses the clip's MFCC/RMS frames; not cached
+        settings = PROFILES[profile]
+        result.timeline = build_timeline(features, settings["sample_rate"], classifier, hop_length=settings["hop_length"])
+    
+    return result
+
 @router.post("/voice", response_model=VoiceAnalysisResult)
 async def analyze_voice(
     audio: UploadFile = File(...),
+    timeline: bool = False,
+    profile: str = ACCURATE,
     current_user: Optional[str] = Depends(get_optional_user)
 ):
     """
@@ -229,7 +357,10 @@ async def analyze_voice(
     - Emotional state
     - Confidence score
     
-    Returns analysis results with personalized suggestions.
+    Returns analysis results with personalized suggestions. With `?timeline=true`
+    the result also has a per-window (2 s window, 1 s hop) stress and energy timeline.
+    `?profile=fast|accurate|auto` selects the analysis resolution (default accurate; fast and
+    auto, which switches to fast under load, are opt-in).
     """
     try:
         # Validate file type
@@ -239,82 +370,10 @@ async def analyze_voice(
                 detail="Invalid file type. Please upload a WAV or MP3 audio file."
             )
         
-        # Read audio file
-        audio_bytes = await audio.read()
-        
-        # Validate file size (max 10MB)
-        if len(audio_bytes) > 10 * 1024 * 1024:
-            raise HTTPException(
-                status_code=400,
-                detail="File too large. Maximum size is 10MB."
-            )
+        # Read audio file in chunks, rejecting it as soon as it passes 10MB
+        audio_bytes = await read_upload(audio, MAX_AUDIO_UPLOAD_BYTES)
         
-        # Extract MFCC features using Librosa
-        print(f"🎤 Processing audio file: {audio.filename}")
-        mfcc_features, duration, features_dict = extract_mfcc_features(audio_bytes)
-        
-        # Validate duration
-        if duration < 3:
-            raise HTTPException(
-                status_code=400,
-                detail="Recording too short. Please provide at least 3 seconds of speech."
-            )
-        elif duration > 60:
-            raise HTTPException(
-                status_code=400,
-                detail="Recording too long. Please limit to 60 seconds."
-            )
-        
-        print(f"✅ MFCC features extracted: shape {mfcc_features.shape}, duration {duration:.2f}s")
-        
-        # Run through classifier (CNN model)
-        stress_level, emotion, confidence, emotion_scores = classifier.predict(mfcc_features)
-        
-        # Generate suggestions
-        suggestions = get_suggestions_for_stress_level(stress_level, emotion)
-        
-        # Prepare result
-        result = VoiceAnalysisResult(
-            stressLevel=stress_level,
-            confidence=confidence,
-            emotion=emotion,
-            emotionScores=emotion_scores,
-            timestamp=datetime.now().isoformat(),
-            suggestions=suggestions,
-            mfccFeatures=features_dict
-        )
-        
-        print(f"📊 Analysis complete: {stress_level} stress, {emotion} emotion, {confidence:.0%} confidence")
-        
-        # Save to database if user is logged in
-        print(f"🔐 Current user: {current_user}")
-        if current_user:
-            try:
-                db = get_database()
-                if db is not None:
-                    voice_analysis_doc = {
-                        "userId": current_user,
-                        "stressLevel": stress_level,
-                        "confidence": confidence,
-                        "emotion": emotion,
-                        "emotionScores": emotion_scores,
-                        "duration": duration,
-                        "analyzedAt": datetime.now(),
-                        "suggestions": suggestions
-                    }
-                    db.voice_analyses.insert_one(voice_analysis_doc)
-                    print(f"✅ Voice analysis saved for user {current_user}")
-                else:
-                    print(f"⚠️ Database not available, skipping save")
-            except Exception as e:
-                print(f"⚠️ Failed to save voice analysis: {str(e)}")
-                import traceback
-                traceback.print_exc()
-                # Don't fail the request if saving fails
-        else:
-            print(f"⚠️ No user logged in, voice analysis NOT saved to database")
-        
-        return result
+        return await analyze_audio_bytes(audio_bytes, audio.filename, timeline, current_user, profile)
         
     except HTTPException:
         raise
@@ -327,6 +386,210 @@ async def analyze_voice(
             detail=f"Failed to analyze voice recording: {str(e)}"
         )
 
+STREAM_PROVISIONAL_INTERVAL = 1.0  # Seconds of audio between provisional estimates
+STREAM_MAX_DURATION = 60
+# 60 s of 48 kHz float32 PCM plus headroom; compressed streams are far smaller
+STREAM_MAX_BYTES = int(os.getenv("VOICE_STREAM_MAX_BYTES", str(12 * 1024 * 1024)))
+WS_MESSAGE_TOO_BIG = 1009
+
+async def close_too_big(websocket: WebSocket, session: VoiceStreamSession, detail: str):
+    session.close()
+    increment("stream", "rejected_too_big")
+    await websocket.send_json({"type": "error", "detail": detail})
+    await websocket.close(code=WS_MESSAGE_TOO_BIG)
+
+@router.websocket("/stream")
+async def stream_voice_analysis(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Streaming voice stress analysis while the user is still recording.
+    
+    Protocol:
+    1. Client sends a JSON config: {"format": "pcm_s16le" | "pcm_f32le" | "webm" | "ogg",
+       "sampleRate": 48000} (sampleRate is required for PCM, ignored for webm/ogg opus).
+       Authenticate with the `token` query parameter (same value as the Bearer token).
+    2. Client sends binary audio chunks. About once per second of audio the server pushes
+       {"type": "provisional", "stressLevel", "emotion", "stressScore", "duration"}.
+    3. Client sends {"type": "end"}; the server replies with {"type": "result", ...}
+       (same fields as POST /voice) and closes. Errors arrive as {"type": "error", "detail"}.
+    
+    PCM sample rates must be 8-48 kHz. Streams past 60 seconds of audio or
+    VOICE_STREAM_MAX_BYTES are closed with code 1009.
+    """
+    await websocket.accept()
+    current_user = get_optional_user(f"Bearer {token}" if token else None)
+    session = None
+    
+    try:
+        config = await websocket.receive_json()
+        session = VoiceStreamSession(config.get("format", "pcm_s16le"), config.get("sampleRate"))
+        next_provisional = STREAM_PROVISIONAL_INTERVAL
+        
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                session.close()
+                return
+            
+            if message.get("bytes") is not None:
+                if session.bytes_received + len(message["bytes"]) > STREAM_MAX_BYTES:
+                    await close_too_big(websocket, session, "Stream too large.")
+                    return
+                # Resampling/STFT work stays off the event loop
+                await asyncio.to_thread(session.feed, message["bytes"])
+                if session.duration > STREAM_MAX_DURATION:
+                    await close_too_big(websocket, session, "Recording too long. Please limit to 60 seconds.")
+                    return
+                
+                if session.duration >= next_provisional:
+                    stats = session.extractor.running_stats()
+                    if stats is not None:
+                        stress_level, emotion, _, _ = classifier.predict_from_stats(stats)
+                        await websocket.send_json({
+                            "type": "provisional",
+                            "stressLevel": stress_level,
+                            "emotion": emotion,
+                            "stressScore": round(classifier.stress_score(stats), 3),
+                            "duration": round(session.duration, 2)
+                        })
+                    next_provisional = session.duration + STREAM_PROVISIONAL_INTERVAL
+            elif message.get("text") and json.loads(message["text"]).get("type") == "end":
+                break
+        
+        with timed("stream", session.format):
+            features = await asyncio.to_thread(session.finish)
+            duration = session.duration
+            features_dict = summarize_features(features, duration)
+            result = await run_voice_analysis(features["mfcc"], duration, features_dict, current_user)
+        
+        print(f"🎙️ Streamed {session.bytes_received} bytes ({session.format}), {duration:.2f}s analyzed")
+        await websocket.send_json({"type": "result", **result.dict()})
+        await websocket.close()
+        
+    except WebSocketDisconnect:
+        if session is not None:
+            session.close()
+    except (HTTPException, ValueError) as e:
+        # Invalid config/audio or a recording outside the duration limits
+        if session is not None:
+            session.close()
+        await websocket.send_json({"type": "error", "detail": e.detail if isinstance(e, HTTPException) else str(e)})
+        await websocket.close(code=1008)
+    except Exception as e:
+        print(f"❌ Error in streaming voice analysis: {str(e)}")
+        if session is not None:
+            session.close()
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1011)
+
+def whisper_request(payload: bytes, filename: str):
+    """Send one audio payload to Groq Whisper."""
+    # Get Groq client
+    groq_client = get_groq_client()
+    
+    # Transcribe using Groq Whisper
+    return groq_client.audio.transcriptions.create(
+        file=(filename, payload),
+        model="whisper-large-v3-turbo",  # OPTIMIZED: 2-3x faster than whisper-large-v3
+        response_format="json",
+        language="en",  # Can be made dynamic
+        temperature=0.0
+    )
+
+async def transcribe_with_whisper(audio_bytes, filename: Optional[str] = None, audio=None, trimmed: bool = False):
+    """
+    Transcode the recording in memory (16 kHz mono Ogg/Opus) and send it to Groq Whisper.
+    Both steps run in worker threads; the request goes through the shared `whisper_limiter`.
+    
+    Args:
+        audio_bytes: Original upload
+        filename: Original filename (kept when the upload is passed through)
+        audio: Already-decoded 16 kHz samples, to avoid decoding twice
+        trimmed: `audio` had silence removed, so it is always re-encoded
+    
+    Returns:
+        (transcription, transcode_info)
+    """
+    start = time.perf_counter()
+    payload, upload_name, info = await asyncio.to_thread(prepare_for_transcription, audio_bytes, filename, audio, trimmed)
+    
+    print(f"🎤 Transcribing audio with Groq Whisper: {filename}")
+    print(f"   Audio size: {info['original_bytes']} bytes, uploading {info['upload_bytes']} bytes")
+    async with whisper_limiter:
+        transcription = await asyncio.to_thread(whisper_request, payload, upload_name)
+    
+    # Compare end-to-end latency of transcoded vs. passthrough uploads
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    path = "transcoded" if info["transcoded"] else "passthrough"
+    record_timing("transcribe", path, elapsed_ms)
+    other = get_metrics()["timings"]["transcribe"].get("passthrough" if info["transcoded"] else "transcoded")
+    comparison = f", {elapsed_ms - other['avg_ms']:+.0f}ms vs {other['avg_ms']:.0f}ms avg for other path" if other else ""
+    print(f"✅ Transcription complete: {len(transcription.text)} characters in {elapsed_ms:.0f}ms ({path}{comparison})")
+    
+    return transcription, info
+
+MAX_WHISPER_BYTES = 25 * 1024 * 1024  # Groq Whisper single-request limit
+MAX_LONG_TRANSCRIPTION_BYTES = MAX_TRANSCRIPTION_UPLOAD_BYTES
+
+def whisper_text(payload: bytes, filename: str) -> str:
+    """Transcript text only (used for chunked transcription)."""
+    return whisper_request(payload, filename).text
+
+def decode_for_transcription(audio_bytes):
+    """
+    Decode to 16 kHz mono with silence removed, for transcoding/chunking.
+    
+    Returns:
+        (audio, trimmed); audio is None if the upload can't be decoded here
+    """
+    if len(audio_bytes) < MIN_TRANSCODE_BYTES:
+        return None, False
+    try:
+        audio_data, _ = decode_audio(audio_bytes, WHISPER_SAMPLE_RATE)
+    except Exception as e:
+        print(f"⚠️ Could not decode audio before transcription: {e}")
+        return None, False
+    audio_data, speech = trim_for_analysis(audio_data, WHISPER_SAMPLE_RATE)
+    return audio_data, speech["removed_seconds"] > 0
+
+def is_long_recording(audio_bytes, audio_data) -> bool:
+    """Recordings that should be split and transcribed in parallel chunks."""
+    if len(audio_bytes) > MAX_WHISPER_BYTES:
+        return True
+    return audio_data is not None and len(audio_data) > CHUNK_SECONDS * 1.25 * WHISPER_SAMPLE_RATE
+
+async def transcribe_audio_bytes(audio_bytes, filename: Optional[str]) -> TranscriptionResult:
+    """Whisper transcription of an uploaded recording (shared by `/transcribe` and resumable uploads)."""
+    cache_key = audio_key(audio_bytes)
+    cached = voice_cache.get("transcript", cache_key)
+    if cached is not None:
+        return TranscriptionResult(**cached)
+    
+    audio_data, trimmed = await asyncio.to_thread(decode_for_transcription, audio_bytes)
+    if is_long_recording(audio_bytes, audio_data):
+        if audio_data is None:
+            raise HTTPException(status_code=400, detail="Could not decode audio for chunked transcription.")
+        final = None
+        async for event in transcribe_chunks(audio_data, WHISPER_SAMPLE_RATE, whisper_text):
+            final = event
+        result = TranscriptionResult(
+            success=True,
+            transcript=final["transcript"],
+            language="en",
+            duration=len(audio_data) / WHISPER_SAMPLE_RATE
+        )
+    else:
+        transcription, _ = await transcribe_with_whisper(audio_bytes, filename, audio_data, trimmed)
+        
+        result = TranscriptionResult(
+            success=True,
+            transcript=transcription.text,
+            language=getattr(transcription, 'language', 'en'),
+            duration=getattr(transcription, 'duration', None)
+        )
+    
+    voice_cache.put("transcript", cache_key, result.dict())
+    return result
+
 @router.post("/transcribe", response_model=TranscriptionResult)
 async def transcribe_audio(
     file: UploadFile = File(...),
@@ -337,56 +600,11 @@ async def transcribe_audio(
     Fallback for browsers without Web Speech API (Brave, Firefox).
     """
     try:
-        # Read audio file
-        audio_bytes = await file.read()
-        
-        # Validate file size (max 25MB for Whisper)
-        if len(audio_bytes) > 25 * 1024 * 1024:
-            raise HTTPException(
-                status_code=400,
-                detail="File too large. Maximum size is 25MB for transcription."
-            )
+        # Read audio file (long recordings above Whisper's 25MB limit are chunked)
+        audio_bytes = await read_upload(file, MAX_LONG_TRANSCRIPTION_BYTES)
         
-        # Save to temporary file (Groq API requires file path)
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_path = tmp_file.name
+        return await transcribe_audio_bytes(audio_bytes, file.filename)
         
-        try:
-            # Get Groq client
-            print(f"🔑 Checking GROQ_API_KEY: {os.getenv('GROQ_API_KEY')[:20]}..." if os.getenv('GROQ_API_KEY') else "❌ GROQ_API_KEY not found!")
-            groq_client = get_groq_client()
-            
-            # Transcribe using Groq Whisper
-            print(f"🎤 Transcribing audio with Groq Whisper: {file.filename}")
-            print(f"   Audio size: {len(audio_bytes)} bytes")
-            
-            with open(tmp_path, "rb") as audio_file:
-                audio_data = audio_file.read()
-                print(f"   File read: {len(audio_data)} bytes")
-                
-                transcription = groq_client.audio.transcriptions.create(
-                    file=(file.filename, audio_data),
-                    model="whisper-large-v3-turbo",  # OPTIMIZED: 2-3x faster than whisper-large-v3
-                    response_format="json",
-                    language="en",  # Can be made dynamic
-                    temperature=0.0
-                )
-            
-            print(f"✅ Transcription complete: {len(transcription.text)} characters")
-            
-            return TranscriptionResult(
-                success=True,
-                transcript=transcription.text,
-                language=getattr(transcription, 'language', 'en'),
-                duration=getattr(transcription, 'duration', None)
-            )
-            
-        finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-                
     except HTTPException:
         raise
     except Exception as e:
@@ -398,15 +616,331 @@ async def transcribe_audio(
             detail=f"Transcription failed: {type(e).__name__}: {str(e)}"
         )
 
+@router.post("/transcribe/stream")
+async def transcribe_audio_stream(
+    file: UploadFile = File(...),
+    current_user: Optional[str] = Depends(get_optional_user)
+):
+    """
+    Chunked transcription with partial results streamed as NDJSON.
+    
+    Each line is {"type": "partial", "index", "start", "end", "text"} as soon as a chunk
+    finishes (chunks may complete out of order), followed by
+    {"type": "final", "transcript", "chunks"} with the stitched transcript in order.
+    """
+    audio_bytes = await read_upload(file, MAX_LONG_TRANSCRIPTION_BYTES)
+    
+    cache_key = audio_key(audio_bytes)
+    cached = voice_cache.get("transcript", cache_key)
+    if cached is not None:
+        final = {"type": "final", "transcript": cached["transcript"], "chunks": 0, "cached": True}
+        return StreamingResponse(iter([json.dumps(final) + "\n"]), media_type="application/x-ndjson")
+    
+    try:
+        audio_data, _ = await asyncio.to_thread(decode_audio, audio_bytes, WHISPER_SAMPLE_RATE)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not decode audio: {str(e)}")
+    audio_data, _ = await asyncio.to_thread(trim_for_analysis, audio_data, WHISPER_SAMPLE_RATE)
+    
+    async def events():
+        try:
+            async for event in transcribe_chunks(audio_data, WHISPER_SAMPLE_RATE, whisper_text):
+                if event["type"] == "final":
+                    voice_cache.put("transcript", cache_key, TranscriptionResult(
+                        success=True,
+                        transcript=event["transcript"],
+                        language="en",
+                        duration=len(audio_data) / WHISPER_SAMPLE_RATE
+                    ).dict())
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            print(f"❌ Streaming transcription error: {type(e).__name__}: {str(e)}")
+            yield json.dumps({"type": "error", "detail": f"Transcription failed: {str(e)}"}) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@router.post("/features", response_model=VoiceAnalysisResult)
+async def analyze_voice_features(
+    request: Request,
+    timeline: bool = False,
+    current_user: Optional[str] = Depends(get_optional_user)
+):
+    """
+    Analyze features computed on the client instead of an audio upload.
+    
+    The body is a binary SVF1 payload (Content-Type: application/octet-stream; format in
+    app/core/feature_payload.py). Decoding and feature extraction are skipped; the same
+    classifier, baseline and suggestions are applied as for `/voice`.
+    """
+    try:
+        body = await read_request_body(request, MAX_PAYLOAD_BYTES, label="Feature payload")
+        features, meta = decode_payload(body)
+        duration = meta["duration"]
+        increment("features_payload", meta["dtype"])
+        increment("features_payload", "bytes", len(body))
+        print(f"📦 Client features: {meta['n_frames']} frames ({duration:.1f}s), {len(body)} bytes {meta['dtype']}"
+              f"{' zlib' if meta['compressed'] else ''}")
+        
+        features_dict = summarize_features(features, duration)
+        result = await run_voice_analysis(features["mfcc"], duration, features_dict, current_user)
+        if timeline:
+            result.timeline = build_timeline(features, meta["sample_rate"], classifier, hop_length=meta["hop_length"])
+        return result
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Error analyzing voice features: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to analyze voice features: {str(e)}"
+        )
+
+@router.post("/uploads")
+async def create_upload_session(
+    init: UploadSessionInit,
+    current_user: Optional[str] = Depends(get_optional_user)
+):
+    """
+    Start a resumable upload for `/voice` or `/transcribe`.
+    
+    Send the recording with `PUT /uploads/{uploadId}?offset=N` (raw bytes), check progress
+    with `GET /uploads/{uploadId}` after a dropped connection, then
+    `POST /uploads/{uploadId}/finalize` to process it.
+    """
+    if init.purpose == "voice" and init.contentType and not init.contentType.startswith('audio/'):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Please upload a WAV or MP3 audio file."
+        )
+    session = upload_sessions.create(init.purpose, init.size, init.filename, init.contentType, current_user)
+    print(f"📤 Upload session {session.id[:8]} started: {init.purpose}, {init.size} bytes")
+    return {**session.status(), "chunkSize": UPLOAD_CHUNK_BYTES, "ttl": UPLOAD_SESSION_TTL}
+
+@router.get("/uploads/{upload_id}")
+async def get_upload_session(upload_id: str, current_user: Optional[str] = Depends(get_optional_user)):
+    """Current offset of an upload (where to resume)."""
+    return upload_sessions.status(upload_id, current_user)
+
+@router.put("/uploads/{upload_id}")
+async def put_upload_chunk(
+    upload_id: str,
+    offset: int,
+    request: Request,
+    current_user: Optional[str] = Depends(get_optional_user)
+):
+    """Append a chunk of raw bytes at `offset`."""
+    data = await read_request_body(request, MAX_CHUNK_BYTES, label="Chunk")
+    return await upload_sessions.put_chunk(upload_id, offset, data, current_user)
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload_session(upload_id: str, current_user: Optional[str] = Depends(get_optional_user)):
+    await upload_sessions.abort(upload_id, current_user)
+    return {"success": True}
+
+@router.post("/uploads/{upload_id}/finalize")
+async def finalize_upload_session(
+    upload_id: str,
+    timeline: bool = False,
+    profile: str = ACCURATE,
+    current_user: Optional[str] = Depends(get_optional_user)
+):
+    """Process a completed upload; returns the `/voice` or `/transcribe` result."""
+    try:
+        # Reject a profile the classifier can't take before the upload is consumed
+        validate_profile(profile, classifier)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    session, audio_bytes = await upload_sessions.finalize(upload_id, current_user)
+    try:
+        if session.purpose == "transcribe":
+            return await transcribe_audio_bytes(audio_bytes, session.filename)
+        return await analyze_audio_bytes(audio_bytes, session.filename, timeline, current_user, profile)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Error processing upload {upload_id[:8]}: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to process upload: {str(e)}"
+        )
+
+MAX_BATCH_FILES = MAX_BATCH_UPLOAD_FILES
+BATCH_WORKERS = int(os.getenv("VOICE_BATCH_WORKERS", str(os.cpu_count() or 4)))
+
+@router.post("/batch")
+async def analyze_voice_batch(
+    files: List[UploadFile] = File(...),
+    format: str = "ndjson",
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Score many recordings in one request (research use).
+    
+    Files are decoded and featurized in parallel and classified together with the
+    vectorized `predict_batch`. Returns CSV (`?format=csv`) or NDJSON, one row per file;
+    throughput is reported in the X-Files-Per-Second header. Results are not saved.
+    """
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many files. Maximum is {MAX_BATCH_FILES} per batch.")
+    
+    items = []
+    for upload in files:
+        data = await read_upload(upload, MAX_AUDIO_UPLOAD_BYTES, label=upload.filename)
+        items.append((upload.filename, data))
+    
+    rows, throughput = await asyncio.to_thread(analyze_batch, items, BATCH_WORKERS)
+    print(f"📦 Batch analysis: {throughput['files']} files ({throughput['failed']} failed) "
+          f"in {throughput['seconds']}s, {throughput['files_per_second']} files/s")
+    record_timing("batch", "request", throughput["seconds"] * 1000)
+    
+    headers = {
+        "X-Files-Per-Second": str(throughput["files_per_second"]),
+        "X-Files-Failed": str(throughput["failed"])
+    }
+    if format == "csv":
+        return Response(to_csv(rows), media_type="text/csv", headers=headers)
+    return Response(to_ndjson(rows), media_type="application/x-ndjson", headers=headers)
+
+# Voice stress levels mapped onto the text risk scale used by build_response
+VOICE_RISK_LEVELS = {"low": "low", "medium": "medium", "high": "high", "very_high": "high"}
+RISK_ORDER = ["low", "medium", "high"]
+
+@router.post("/checkin", response_model=VoiceCheckinResult)
+async def voice_checkin(
+    audio: UploadFile = File(...),
+    current_user: Optional[str] = Depends(get_optional_user)
+):
+    """
+    Complete voice check-in from a single upload.
+    
+    Replaces calling /transcribe, /voice and /api/analyze/text separately. The audio is
+    decoded once; Whisper transcription (followed by DistilBERT emotion on the transcript)
+    runs concurrently with acoustic feature extraction and stress classification.
+    The higher of the voice and text risk levels is returned as `riskLevel`.
+    """
+    try:
+        start = time.perf_counter()
+        timings = {}
+        
+        # Read audio file in chunks, rejecting it as soon as it passes 10MB
+        audio_bytes = await read_upload(audio, MAX_AUDIO_UPLOAD_BYTES)
+        
+        # Cached features/transcript from an earlier attempt with the same audio
+        cache_key = audio_key(audio_bytes)
+        features = get_cached_features(cache_key, WHISPER_SAMPLE_RATE)
+        cached_transcript = voice_cache.get("transcript", cache_key)
+        
+        # Decode once for both branches
+        audio_data, sr = None, WHISPER_SAMPLE_RATE
+        trimmed = False
+        if features is None or cached_transcript is None:
+            audio_data, sr = await asyncio.to_thread(decode_audio, audio_bytes, WHISPER_SAMPLE_RATE)
+            # Silence is removed before both feature extraction and the Whisper upload
+            audio_data, speech = await asyncio.to_thread(trim_for_analysis, audio_data, sr)
+            duration = speech["speech_duration"]
+            trimmed = speech["removed_seconds"] > 0
+        else:
+            duration = features["duration"]
+        validate_duration(duration)
+        timings["decode_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        
+        async def transcribe_and_classify():
+            branch_start = time.perf_counter()
+            try:
+                if cached_transcript is not None:
+                    text = cached_transcript["transcript"].strip()
+                else:
+                    transcription, _ = await transcribe_with_whisper(audio_bytes, audio.filename, audio_data, trimmed)
+                    text = transcription.text.strip()
+                    voice_cache.put("transcript", cache_key, TranscriptionResult(
+                        success=True,
+                        transcript=transcription.text,
+                        language=getattr(transcription, 'language', 'en'),
+                        duration=getattr(transcription, 'duration', None)
+                    ).dict())
+            except Exception as e:
+                # The acoustic analysis is still useful without a transcript
+                print(f"⚠️ Check-in transcription failed: {type(e).__name__}: {str(e)}")
+                text = ""
+            timings["transcription_ms"] = round((time.perf_counter() - branch_start) * 1000, 1)
+            
+            if not text:
+                return text, None
+            emotion_start = time.perf_counter()
+            emotion = await asyncio.to_thread(predict_emotion, text)
+            timings["emotion_ms"] = round((time.perf_counter() - emotion_start) * 1000, 1)
+            return text, emotion
+        
+        async def analyze_acoustics():
+            nonlocal features
+            branch_start = time.perf_counter()
+            if features is None:
+                features = await asyncio.to_thread(compute_features, audio_data, sr)
+                features["duration"] = duration
+                features["speech_ratio"] = speech["speech_ratio"]
+                features["segments"] = speech["segments"]
+                cache_features(cache_key, sr, features)
+            result = await run_voice_analysis(features["mfcc"], duration, summarize_features(features, duration), current_user)
+            timings["acoustic_ms"] = round((time.perf_counter() - branch_start) * 1000, 1)
+            return result
+        
+        (transcript, text_emotion), voice_result = await asyncio.gather(transcribe_and_classify(), analyze_acoustics())
+        
+        # Fuse voice stress with text emotion
+        risk_level = VOICE_RISK_LEVELS.get(voice_result.stressLevel, "medium")
+        empathetic_message = None
+        suggestions = list(voice_result.suggestions)
+        if text_emotion is not None:
+            label, score = text_emotion
+            text_risk, empathetic_message, text_suggestions = build_response(label, score)
+            risk_level = max(risk_level, text_risk, key=RISK_ORDER.index)
+            suggestions = text_suggestions + [s for s in suggestions if s not in text_suggestions]
+        
+        timings["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        record_timing("checkin", "total", timings["total_ms"])
+        print(f"🧭 Voice check-in complete in {timings['total_ms']:.0f}ms: {timings}")
+        
+        return VoiceCheckinResult(
+            sessionId=str(uuid.uuid4()),
+            transcript=transcript,
+            voice=voice_result,
+            textEmotion={"label": text_emotion[0], "score": text_emotion[1]} if text_emotion else None,
+            riskLevel=risk_level,
+            empatheticMessage=empathetic_message,
+            suggestions=suggestions,
+            timings=timings
+        )
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Error in voice check-in: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to process voice check-in: {str(e)}"
+        )
+
 @router.get("/health")
 async def voice_analysis_health():
     """Check if voice analysis service is available."""
     try:
         # Check if librosa is available
         import librosa
+        from app.core import audio_decode
         return {
             "status": "healthy",
             "librosa_version": librosa.__version__,
+            "inprocess_decoder": audio_decode.av is not None,
+            "voice_model": getattr(classifier, "path", None) or "mock",
             "message": "Voice stress analysis service is ready"
         }
     except ImportError:
@@ -415,11 +949,21 @@ async def voice_analysis_health():
             "message": "Librosa not installed. Run: pip install librosa"
         }
 
+@router.get("/metrics")
+async def voice_metrics():
+    """Per-stage voice pipeline metrics (decode time per format, resampling, cache hits, ...)."""
+    return {
+        **get_metrics(),
+        "cache": voice_cache.stats(),
+        "uploads_inflight_bytes": inflight_bytes(),
+        "upload_sessions": upload_sessions.stats()
+    }
+
 @router.get("/history")
-def get_voice_analysis_history(current_user: str = Depends(get_current_user)):
+async def get_voice_analysis_history(current_user: str = Depends(get_current_user)):
     """Get voice analysis history for the current user."""
     try:
-        db = get_database()
+        db = await get_async_database()
         
         if db is None:
             return {
@@ -430,9 +974,9 @@ def get_voice_analysis_history(current_user: str = Depends(get_current_user)):
             }
         
         # Get all voice analyses for this user, sorted by date (newest first)
-        analyses = list(db.voice_analyses.find(
+        analyses = await db.voice_analyses.find(
             {"userId": current_user}
-        ).sort("analyzedAt", -1).limit(50))
+        ).sort("analyzedAt", -1).limit(50).to_list(length=50)
         
         # Convert MongoDB ObjectId to string and format dates
         for analysis in analyses:
@@ -446,6 +990,7 @@ def get_voice_analysis_history(current_user: str = Depends(get_current_user)):
             "analyses": analyses
         }
     except Exception as e:
+        report_failure(e)
         print(f"❌ Error fetching voice analysis history: {str(e)}")
         import traceback
         traceback.print_exc()
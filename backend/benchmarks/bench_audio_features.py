@@ -0,0 +1,66 @@
+"""
+Benchmark: fused single-STFT feature engine vs. separate librosa calls.
+
+Run from the backend directory:
+    python -m benchmarks.bench_audio_features
+"""
+
+import time
+import numpy as np
+import librosa
+from app.core.audio_features import compute_features
+from benchmarks.synthetic_audio import make_signal, SAMPLE_RATE
+
+DURATIONS = [3, 30, 60]
+REPEATS = 5
+
+
+def librosa_features(audio: np.ndarray, sr: int) -> dict:
+    """The previous implementation: each feature computes its own STFT/framing."""
+    return {
+        "mfcc": librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=20, n_fft=2048, hop_length=512),
+        "zcr": librosa.feature.zero_crossing_rate(audio)[0],
+        "spectral_centroid": librosa.feature.spectral_centroid(y=audio, sr=sr)[0],
+        "rms": librosa.feature.rms(y=audio)[0],
+    }
+
+
+def best_time(fn, *args) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def max_relative_error(reference: np.ndarray, candidate: np.ndarray) -> float:
+    scale = max(float(np.max(np.abs(reference))), 1e-12)
+    return float(np.max(np.abs(reference - candidate)) / scale)
+
+
+def main():
+    # Warm up caches (mel filterbank, DCT matrix, window, numba JIT in librosa)
+    warmup = make_signal(1)
+    librosa_features(warmup, SAMPLE_RATE)
+    compute_features(warmup, SAMPLE_RATE)
+
+    print(f"{'clip':>6} | {'librosa ms':>10} | {'fused ms':>9} | {'speedup':>7} | max rel. error")
+    print("-" * 70)
+    for duration in DURATIONS:
+        audio = make_signal(duration)
+        reference = librosa_features(audio, SAMPLE_RATE)
+        fused = compute_features(audio, SAMPLE_RATE)
+        errors = {name: max_relative_error(reference[name], fused[name]) for name in reference}
+
+        t_ref = best_time(librosa_features, audio, SAMPLE_RATE)
+        t_fused = best_time(compute_features, audio, SAMPLE_RATE)
+        worst = max(errors, key=errors.get)
+        print(
+            f"{duration:>5}s | {t_ref * 1000:>10.2f} | {t_fused * 1000:>9.2f} | "
+            f"{t_ref / t_fused:>6.2f}x | {errors[worst]:.2e} ({worst})"
+        )
+
+
+if __name__ == "__main__":
+    main()
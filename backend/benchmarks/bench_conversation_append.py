@@ -0,0 +1,119 @@
+"""
+Benchmark: full conversation saves vs. appends on the offline backends.
+
+Grows --conversations conversations to each length in --lengths, --batch
+messages at a time (one user message and one reply per turn), and times the
+save that adds the next batch: a full save rewrites every message so far,
+an append writes only the new ones. Bytes written are the sizes of the JSON
+files rewritten plus the growth of the logs; for SQLite, the growth of the
+write-ahead log (checkpointing is switched off while measuring).
+
+Run from the backend directory:
+    python -m benchmarks.bench_conversation_append
+    python -m benchmarks.bench_conversation_append --lengths 100 1000 5000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from app.core.json_store import JsonConversationStore
+from app.core.sqlite_store import SqliteConversationStore, SqliteDatabase
+
+
+def make_messages(start: int, count: int) -> list:
+    base = datetime(2024, 1, 1)
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant",
+         "content": "I have been feeling stressed about work lately. " * 2,
+         "timestamp": (base + timedelta(seconds=i)).isoformat()}
+        for i in range(start, start + count)
+    ]
+
+
+def conversation(session_id: str, messages: list) -> dict:
+    return {
+        "sessionId": session_id,
+        "userId": "bench_user",
+        "messages": messages,
+        "mainEmotion": "anxious",
+        "riskLevel": "low",
+        "savedAt": datetime.now().isoformat(),
+        "messageCount": len(messages)
+    }
+
+
+def snapshot(directory: str) -> dict:
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            files[path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def bytes_written(before: dict, after: dict) -> int:
+    """Rewritten files count in full; appended logs (NDJSON, SQLite WAL) by their growth."""
+    total = 0
+    for path, (size, mtime) in after.items():
+        old_size, old_mtime = before.get(path, (0, None))
+        if (size, mtime) == (old_size, old_mtime):
+            continue
+        total += size - old_size if path.endswith((".log", "-wal")) else size
+    return total
+
+
+def measure(store, directory: str, session_ids: list, length: int, batch: int, append: bool) -> tuple:
+    """(ms per save, KB per save) for adding `batch` messages at `length`."""
+    history = make_messages(0, length)
+    for session_id in session_ids:
+        if append:
+            store.append(session_id, 0, history, {"userId": "bench_user"})
+        else:
+            store.save(conversation(session_id, history))
+    new = make_messages(length, batch)
+    if isinstance(store, SqliteConversationStore):
+        conn = store.db.connection()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA wal_autocheckpoint=0")
+    before = snapshot(directory)
+    start = time.perf_counter()
+    for session_id in session_ids:
+        if append:
+            store.append(session_id, length, new, {"userId": "bench_user", "mainEmotion": "calm"})
+        else:
+            store.save(conversation(session_id, history + new))
+    elapsed = time.perf_counter() - start
+    written = bytes_written(before, snapshot(directory))
+    return elapsed / len(session_ids) * 1000, written / len(session_ids) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full conversation saves vs. appends (offline backends).")
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--batch", type=int, default=2, help="Messages added per save")
+    args = parser.parse_args()
+
+    print(f"{args.conversations} conversations, {args.batch} messages added per save (ms / KB written per save)")
+    print(f"{'backend':>7} | {'length':>6} | {'full ms':>8} | {'append ms':>9} | {'full KB':>8} | {'append KB':>9}")
+    print("-" * 64)
+    for backend in ("json", "sqlite"):
+        for length in args.lengths:
+            row = []
+            for append in (False, True):
+                with tempfile.TemporaryDirectory() as tmp:
+                    if backend == "json":
+                        store = JsonConversationStore(os.path.join(tmp, "conversations"))
+                    else:
+                        store = SqliteConversationStore(SqliteDatabase(os.path.join(tmp, "serenova.db")))
+                    session_ids = [f"session_{i:04d}" for i in range(args.conversations)]
+                    row.append(measure(store, tmp, session_ids, length, args.batch, append))
+            (full_ms, full_kb), (append_ms, append_kb) = row
+            print(f"{backend:>7} | {length:>6} | {full_ms:>8.2f} | {append_ms:>9.2f} | {full_kb:>8.1f} | {append_kb:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
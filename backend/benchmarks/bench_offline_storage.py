@@ -0,0 +1,88 @@
+"""
+Benchmark: offline storage backends (JSON files vs. SQLite in WAL mode).
+
+Creates --conversations synthetic conversations spread over --users users in
+a temporary directory for each backend, then times saves (each one rewrites
+a whole conversation, as /api/conversations/save does), reads, per-user
+listings and deletes.
+
+Run from the backend directory:
+    python -m benchmarks.bench_offline_storage
+    python -m benchmarks.bench_offline_storage --conversations 5000 --messages 100
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from app.core.json_store import JsonConversationStore
+from app.core.sqlite_store import SqliteConversationStore, SqliteDatabase
+
+
+def make_conversation(i: int, n_users: int, n_messages: int, rng: random.Random) -> dict:
+    saved_at = datetime(2024, 1, 1) + timedelta(minutes=i)
+    return {
+        "sessionId": f"session_{i:06d}",
+        "userId": f"user_{rng.randrange(n_users):04d}",
+        "messages": [
+            {"role": "user" if m % 2 == 0 else "assistant",
+             "content": "I have been feeling stressed about work lately. " * rng.randint(1, 4),
+             "timestamp": (saved_at + timedelta(seconds=m)).isoformat()}
+            for m in range(n_messages)
+        ],
+        "mainEmotion": rng.choice(["neutral", "anxious", "sad", "calm"]),
+        "riskLevel": rng.choice(["low", "medium", "high"]),
+        "savedAt": saved_at.isoformat(),
+        "messageCount": n_messages
+    }
+
+
+def timed_ops(fn, items) -> float:
+    """Operations per second of `fn` over `items`."""
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def run(store, conversations, users) -> dict:
+    rng = random.Random(1)
+    sample = rng.sample(conversations, min(500, len(conversations)))
+    results = {"save": timed_ops(store.save, conversations)}
+    results["resave"] = timed_ops(store.save, sample)
+    results["get"] = timed_ops(lambda doc: store.get(doc["sessionId"]), sample)
+    results["list"] = timed_ops(store.list_summaries, users)
+    results["delete"] = timed_ops(lambda doc: store.delete(doc["sessionId"]), sample)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON files vs. SQLite offline storage.")
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=40)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    conversations = [make_conversation(i, args.users, args.messages, rng) for i in range(args.conversations)]
+    users = sorted({doc["userId"] for doc in conversations})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "json": JsonConversationStore(os.path.join(tmp, "conversations")),
+            "sqlite": SqliteConversationStore(SqliteDatabase(os.path.join(tmp, "serenova.db"))),
+        }
+        results = {name: run(store, conversations, users) for name, store in backends.items()}
+
+    print(f"{args.conversations} conversations, {args.users} users, {args.messages} messages each (ops/s)")
+    print(f"{'operation':>9} | {'json':>10} | {'sqlite':>10} | {'ratio':>6}")
+    print("-" * 45)
+    for op in results["json"]:
+        json_ops, sqlite_ops = results["json"][op], results["sqlite"][op]
+        print(f"{op:>9} | {json_ops:>10.0f} | {sqlite_ops:>10.0f} | {sqlite_ops / json_ops:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Evaluation harness: "fast" vs "accurate" analysis profiles.
+
+For each clip, runs resampling + feature extraction + classification under
+both profiles and reports the latency saved, how often the stress level (and
+emotion) agree, and how far the inputs to the decision move: the unclamped
+stress score and the MFCC statistics it is computed from. The clamped score
+saturates at 0 or 1 for many inputs, where agreement says nothing about the
+features, so the share of saturated clips is reported as well.
+
+Synthetic clips mix speech-like audio with background noise at levels chosen
+so the accurate-profile score spans all stress levels; pass a folder to
+evaluate real recordings (decoding included in the timings).
+
+Run from the backend directory:
+    python -m benchmarks.bench_profiles
+    python -m benchmarks.bench_profiles path/to/recordings
+"""
+
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from app.core.analysis_profiles import PROFILES, ACCURATE, FAST
+from app.core.audio_decode import decode_audio, resample
+from app.core.audio_features import compute_features
+from app.core.stress_classifier import MockStressClassifier, compute_mfcc_stats
+from benchmarks.synthetic_audio import make_signal, SAMPLE_RATE
+
+N_SYNTHETIC = 40
+# Noise levels whose clips score from low to high (and past 1) with the mock classifier
+NOISE_LEVELS = (0.05, 0.3)
+STAT_KEYS = ("var", "std", "temporal_var")  # The mean sits near 0, so relative deltas of it are noise
+AUDIO_EXTENSIONS = {".wav", ".flac", ".ogg", ".mp3", ".webm", ".m4a", ".opus"}
+
+classifier = MockStressClassifier()
+
+
+def synthetic_clips():
+    """Speech-like clips of varying length and loudness over a log-spaced range of noise levels."""
+    rng = np.random.default_rng(1)
+    for i, noise in enumerate(np.geomspace(*NOISE_LEVELS, N_SYNTHETIC)):
+        duration = float(rng.uniform(4, 30))
+        audio = make_signal(duration, seed=i) * float(rng.uniform(0.3, 2.0))
+        audio += float(noise) * rng.standard_normal(len(audio)).astype(np.float32)
+        yield f"synthetic_{i}", audio.astype(np.float32), SAMPLE_RATE
+
+
+def folder_clips(folder: Path):
+    for path in sorted(p for p in folder.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS):
+        yield path.name, path.read_bytes(), None
+
+
+def analyze(source, sr, profile: str):
+    """Resample/decode, extract and classify under one profile; returns (seconds, prediction, stats)."""
+    settings = PROFILES[profile]
+    start = time.perf_counter()
+    if sr is None:
+        audio, audio_sr = decode_audio(source, settings["sample_rate"])
+    else:
+        audio, audio_sr = resample(source, sr, settings["sample_rate"]), settings["sample_rate"]
+    features = compute_features(
+        audio, audio_sr, n_fft=settings["n_fft"], hop_length=settings["hop_length"], n_mels=settings["n_mels"]
+    )
+    prediction = classifier.predict(features["mfcc"])
+    elapsed = time.perf_counter() - start
+    return elapsed, prediction, compute_mfcc_stats(features["mfcc"])
+
+
+def relative_delta(a: float, b: float) -> float:
+    return abs(a - b) / max(abs(a), 1e-9)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    clips = list(folder_clips(Path(argv[0])) if argv else synthetic_clips())
+    if not clips:
+        print("No clips to evaluate")
+        return 1
+
+    # Warm up filterbank/DCT caches for both profiles
+    name, source, sr = clips[0]
+    for profile in PROFILES:
+        analyze(source, sr, profile)
+
+    totals = {ACCURATE: 0.0, FAST: 0.0}
+    level_agree = emotion_agree = saturated = 0
+    levels = {}
+    score_diffs, raw_diffs = [], []
+    stat_deltas = {key: [] for key in STAT_KEYS}
+    for name, source, sr in clips:
+        t_acc, (level_acc, emotion_acc, _, _), stats_acc = analyze(source, sr, ACCURATE)
+        t_fast, (level_fast, emotion_fast, _, _), stats_fast = analyze(source, sr, FAST)
+        totals[ACCURATE] += t_acc
+        totals[FAST] += t_fast
+        level_agree += level_acc == level_fast
+        emotion_agree += emotion_acc == emotion_fast
+        levels[level_acc] = levels.get(level_acc, 0) + 1
+        raw_acc, raw_fast = classifier.raw_stress_score(stats_acc), classifier.raw_stress_score(stats_fast)
+        saturated += not 0 < raw_acc < 1
+        score_diffs.append(abs(classifier.stress_score(stats_acc) - classifier.stress_score(stats_fast)))
+        raw_diffs.append(abs(raw_acc - raw_fast))
+        for key in STAT_KEYS:
+            stat_deltas[key].append(relative_delta(stats_acc[key], stats_fast[key]))
+
+    n = len(clips)
+    print(f"Clips evaluated:          {n}")
+    print(f"Accurate avg latency:     {totals[ACCURATE] / n * 1000:.2f} ms")
+    print(f"Fast avg latency:         {totals[FAST] / n * 1000:.2f} ms "
+          f"({1 - totals[FAST] / totals[ACCURATE]:.0%} saved)")
+    print("Accurate stress levels:   " + ", ".join(f"{level}={count}" for level, count in sorted(levels.items())))
+    print(f"Saturated (accurate):     {saturated / n:.0%} of clips score outside 0-1 before clamping")
+    print(f"Stress level agreement:   {level_agree / n:.0%}")
+    print(f"Emotion agreement:        {emotion_agree / n:.0%}")
+    print(f"Mean |score difference|:  {np.mean(score_diffs):.3f} clamped, {np.mean(raw_diffs):.3f} unclamped")
+    for key in STAT_KEYS:
+        print(f"MFCC {key + ' delta:':<20} {np.median(stat_deltas[key]):.1%} median, {np.max(stat_deltas[key]):.1%} max")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Benchmark: concurrent throughput of synchronous pymongo calls made inside
+async handlers (the old routes) vs. awaited motor calls (the repositories).
+
+Each simulated request does what GET /api/users/profile/{id} does: one
+find_one and one update_one. With --url the two clients run against a real
+mongod (a throwaway `serenova_bench` database, dropped afterwards); without
+it an in-process stand-in answers after --latency-ms per round trip, which
+is enough to show whether calls serialize on the event loop.
+
+Run from the backend directory:
+    python -m benchmarks.bench_storage
+    python -m benchmarks.bench_storage --url mongodb://localhost:27017 --concurrency 1,16,64
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+N_USERS = 200
+
+
+class SyncStandIn:
+    """pymongo-shaped collection whose calls block for one round trip."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.docs = {}
+
+    def find_one(self, query):
+        time.sleep(self.latency)
+        return self.docs.get(query["_id"])
+
+    def update_one(self, query, update, upsert=False):
+        time.sleep(self.latency)
+        self.docs.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+
+class AsyncStandIn(SyncStandIn):
+    """motor-shaped collection: the round trip is awaited instead."""
+
+    async def find_one(self, query):
+        await asyncio.sleep(self.latency)
+        return self.docs.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        await asyncio.sleep(self.latency)
+        self.docs.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+
+def user_id(i: int) -> str:
+    return f"bench_{i % N_USERS}"
+
+
+async def sync_request(col, i: int):
+    # What the routes did: a blocking driver call inside `async def`
+    col.find_one({"_id": user_id(i)})
+    col.update_one({"_id": user_id(i)}, {"$set": {"profile.lastActive": time.time()}}, upsert=True)
+
+
+async def async_request(col, i: int):
+    await col.find_one({"_id": user_id(i)})
+    await col.update_one({"_id": user_id(i)}, {"$set": {"profile.lastActive": time.time()}}, upsert=True)
+
+
+async def run(request, col, concurrency: int, total: int) -> dict:
+    """Issue `total` requests, `concurrency` at a time; returns req/s and latency percentiles."""
+    latencies = []
+    queue = iter(range(total))
+
+    async def worker():
+        for i in queue:
+            start = time.perf_counter()
+            await request(col, i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main_async(args):
+    if args.url:
+        from pymongo import MongoClient
+        from motor.motor_asyncio import AsyncIOMotorClient
+        sync_client, async_client = MongoClient(args.url), AsyncIOMotorClient(args.url)
+        sync_col = sync_client["serenova_bench"]["users"]
+        async_col = async_client["serenova_bench"]["users"]
+        sync_col.insert_many([{"_id": user_id(i), "profile": {"userId": user_id(i)}} for i in range(N_USERS)])
+        target = args.url
+    else:
+        latency = args.latency_ms / 1000
+        sync_col, async_col = SyncStandIn(latency), AsyncStandIn(latency)
+        target = f"in-process stand-in, {args.latency_ms:g} ms per round trip"
+
+    print(f"Target: {target}, {args.requests} requests per run")
+    print(f"{'concurrency':>11} | {'sync req/s':>10} | {'p95 ms':>8} | {'motor req/s':>11} | {'p95 ms':>8} | {'speedup':>7}")
+    print("-" * 72)
+    try:
+        for concurrency in args.concurrency:
+            sync = await run(sync_request, sync_col, concurrency, args.requests)
+            motor = await run(async_request, async_col, concurrency, args.requests)
+            print(
+                f"{concurrency:>11} | {sync['rps']:>10.0f} | {sync['p95_ms']:>8.1f} | "
+                f"{motor['rps']:>11.0f} | {motor['p95_ms']:>8.1f} | {motor['rps'] / sync['rps']:>6.1f}x"
+            )
+    finally:
+        if args.url:
+            sync_client.drop_database("serenova_bench")
+            sync_client.close()
+            async_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent throughput: blocking pymongo vs motor.")
+    parser.add_argument("--url", help="MongoDB URL of a local/test mongod (default: in-process stand-in)")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Stand-in round-trip time")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=500)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
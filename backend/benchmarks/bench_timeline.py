@@ -0,0 +1,46 @@
+"""
+Benchmark: overhead of the sliding-window stress timeline.
+
+Compares feature extraction + single clip score with the same path plus
+`build_timeline` (2 s windows, 1 s hop).
+
+Run from the backend directory:
+    python -m benchmarks.bench_timeline
+"""
+
+from app.core.audio_features import compute_features
+from app.core.stress_classifier import MockStressClassifier
+from app.core.voice_timeline import build_timeline
+from benchmarks.bench_audio_features import best_time, DURATIONS
+from benchmarks.synthetic_audio import make_signal, SAMPLE_RATE
+
+classifier = MockStressClassifier()
+
+
+def single_score(audio):
+    features = compute_features(audio, SAMPLE_RATE)
+    return classifier.predict(features["mfcc"])
+
+
+def with_timeline(audio):
+    features = compute_features(audio, SAMPLE_RATE)
+    return classifier.predict(features["mfcc"]), build_timeline(features, SAMPLE_RATE, classifier)
+
+
+def main():
+    single_score(make_signal(1))
+    print(f"{'clip':>6} | {'single ms':>9} | {'+timeline ms':>12} | {'overhead':>8} | windows")
+    print("-" * 60)
+    for duration in DURATIONS:
+        audio = make_signal(duration)
+        t_single = best_time(single_score, audio)
+        t_timeline = best_time(with_timeline, audio)
+        windows = len(with_timeline(audio)[1])
+        print(
+            f"{duration:>5}s | {t_single * 1000:>9.2f} | {t_timeline * 1000:>12.2f} | "
+            f"{(t_timeline / t_single - 1):>7.1%} | {windows}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Benchmark: round trips and bytes per users.py mutation, read-modify-write
+(find_one, then `$set` of the whole document) vs. one field-level
+`find_one_and_update`.
+
+With --url every command is counted by a pymongo CommandListener against a
+real mongod (throwaway `serenova_bench` database, dropped afterwards).
+Without it an in-process stand-in applies the same updates and sizes each
+command and reply as BSON, which is what would cross the wire.
+
+Run from the backend directory:
+    python -m benchmarks.bench_user_updates
+    python -m benchmarks.bench_user_updates --url mongodb://localhost:27017 --assessments 200
+"""
+
+import argparse
+import copy
+from datetime import datetime
+import bson
+from pymongo import MongoClient, ReturnDocument
+from pymongo.monitoring import CommandListener
+from app.core.update_ops import apply_update
+
+USER_ID = "bench_user"
+
+
+class WireCounter:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def record(self, command: dict, reply: dict):
+        self.round_trips += 1
+        self.bytes_sent += len(bson.encode(command))
+        self.bytes_received += len(bson.encode(reply))
+
+
+class ListenerCounter(WireCounter, CommandListener):
+    """Counts the commands a real client sends (replies sized on success)."""
+
+    def started(self, event):
+        self.round_trips += 1
+        self.bytes_sent += len(bson.encode(event.command))
+
+    def succeeded(self, event):
+        self.bytes_received += len(bson.encode(event.reply))
+
+    def failed(self, event):
+        pass
+
+
+def project(doc: dict, projection) -> dict:
+    if not projection:
+        return copy.deepcopy(doc)
+    return {key: copy.deepcopy(doc[key]) for key in ["_id", *projection] if key in doc}
+
+
+class StandInCollection:
+    """pymongo-shaped collection that records what each call would put on the wire."""
+
+    def __init__(self, counter: WireCounter):
+        self.counter = counter
+        self.docs = {}
+
+    def insert_one(self, doc):
+        self.docs[doc["_id"]] = copy.deepcopy(doc)
+
+    def find_one(self, query):
+        doc = copy.deepcopy(self.docs.get(query["_id"]))
+        self.counter.record({"find": "users", "filter": query, "limit": 1},
+                            {"cursor": {"firstBatch": [doc] if doc else [], "id": 0}, "ok": 1})
+        return doc
+
+    def update_one(self, query, update, upsert=False):
+        self.counter.record({"update": "users", "updates": [{"q": query, "u": update, "upsert": upsert}]},
+                            {"n": 1, "nModified": 1, "ok": 1})
+        apply_update(self.docs.setdefault(query["_id"], {"_id": query["_id"]}), update)
+
+    def find_one_and_update(self, query, update, projection=None, return_document=None):
+        doc = self.docs.get(query["_id"])
+        if doc is not None:
+            apply_update(doc, update)
+        result = project(doc, projection) if doc is not None else None
+        self.counter.record({"findAndModify": "users", "query": query, "update": update,
+                             "fields": projection or {}, "new": True},
+                            {"lastErrorObject": {"n": 1, "updatedExisting": True}, "value": result, "ok": 1})
+        return result
+
+
+def make_user(n_assessments: int, n_conversations: int) -> dict:
+    now = datetime.now().isoformat()
+    return {
+        "_id": USER_ID,
+        "profile": {"userId": USER_ID, "email": "bench@example.com", "firstName": "Bench", "lastName": "User",
+                    "age": 30, "createdAt": now, "lastActive": now, "consentGiven": True},
+        "assessmentHistory": [
+            {"date": now, "depressionScore": 5, "anxietyScore": 7, "stressScore": 9, "overallScore": 21,
+             "severity": "moderate"}
+            for _ in range(n_assessments)
+        ],
+        "conversationIds": [f"session_{i:06d}" for i in range(n_conversations)],
+        "preferences": {"theme": "light", "notifications": True, "language": "en"},
+        "emergencyContacts": [],
+    }
+
+
+def read_modify_write(col, mutate):
+    """What users.py did: fetch the whole document, change it in Python, `$set` all of it back."""
+    doc = col.find_one({"_id": USER_ID})
+    mutate(doc)
+    doc["profile"]["lastActive"] = datetime.now().isoformat()
+    col.update_one({"_id": USER_ID}, {"$set": doc}, upsert=True)
+
+
+def field_update(col, update, projection=None):
+    update.setdefault("$set", {})["profile.lastActive"] = datetime.now().isoformat()
+    col.find_one_and_update({"_id": USER_ID}, update, projection=projection, return_document=ReturnDocument.AFTER)
+
+
+ASSESSMENT = {"date": "2024-01-01T00:00:00", "depressionScore": 3, "anxietyScore": 4, "stressScore": 5,
+              "overallScore": 12, "severity": "mild"}
+
+OPERATIONS = {
+    "get profile": (
+        lambda doc: None,
+        lambda: ({}, None)
+    ),
+    "update profile": (
+        lambda doc: doc["profile"].update(firstName="Updated"),
+        lambda: ({"$set": {"profile.firstName": "Updated"}}, {"profile": 1})
+    ),
+    "add assessment": (
+        lambda doc: doc["assessmentHistory"].append(dict(ASSESSMENT)),
+        lambda: ({"$push": {"assessmentHistory": dict(ASSESSMENT)}}, {"_id": 1})
+    ),
+    "link conversation": (
+        lambda doc: doc["conversationIds"].append("session_new"),
+        lambda: ({"$addToSet": {"conversationIds": "session_new"}}, {"_id": 1})
+    ),
+    "preferences": (
+        lambda doc: doc["preferences"].update(theme="dark"),
+        lambda: ({"$set": {"preferences.theme": "dark"}}, {"preferences": 1})
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round trips and bytes: read-modify-write vs field-level updates.")
+    parser.add_argument("--url", help="MongoDB URL of a local/test mongod (default: in-process stand-in)")
+    parser.add_argument("--assessments", type=int, default=50, help="Assessment history length of the test user")
+    parser.add_argument("--conversations", type=int, default=100, help="Linked conversation count of the test user")
+    args = parser.parse_args()
+
+    user = make_user(args.assessments, args.conversations)
+    if args.url:
+        counter = ListenerCounter()
+        client = MongoClient(args.url, event_listeners=[counter])
+        col = client["serenova_bench"]["users"]
+        col.drop()
+    else:
+        client = None
+        counter = WireCounter()
+        col = StandInCollection(counter)
+
+    print(f"User document: {len(bson.encode(user)) / 1024:.1f}KB "
+          f"({args.assessments} assessments, {args.conversations} conversations)"
+          f"{'' if args.url else ', in-process stand-in'}")
+    print(f"{'operation':>17} | {'old trips':>9} | {'new trips':>9} | {'old KB':>7} | {'new KB':>7} | {'bytes saved':>11}")
+    print("-" * 76)
+    try:
+        for name, (mutate, field_args) in OPERATIONS.items():
+            results = []
+            for run in (lambda: read_modify_write(col, mutate), lambda: field_update(col, *field_args())):
+                col.delete_one({"_id": USER_ID}) if args.url else col.docs.clear()
+                col.insert_one(copy.deepcopy(user))
+                counter.reset()
+                run()
+                results.append((counter.round_trips, (counter.bytes_sent + counter.bytes_received) / 1024))
+            (old_trips, old_kb), (new_trips, new_kb) = results
+            print(f"{name:>17} | {old_trips:>9} | {new_trips:>9} | {old_kb:>7.1f} | {new_kb:>7.1f} | "
+                  f"{1 - new_kb / old_kb:>10.0%}")
+    finally:
+        if client is not None:
+            client.drop_database("serenova_bench")
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: silence trimming before feature extraction and the Whisper upload.
+
+Clips are speech with leading/trailing silence and long pauses, as recorded
+in the app. Compares feature extraction time and Opus upload size with and
+without `compact_speech`.
+
+Run from the backend directory:
+    python -m benchmarks.bench_vad
+"""
+
+import numpy as np
+from app.core.audio_features import compute_features
+from app.core.vad import compact_speech
+from benchmarks.bench_audio_features import best_time
+from benchmarks.synthetic_audio import make_signal, SAMPLE_RATE
+
+# (leading silence, [speech, pause, speech, ...], trailing silence) in seconds
+LAYOUTS = [
+    (1.5, [4.0], 2.0),
+    (2.0, [6.0, 2.5, 5.0], 3.0),
+    (3.0, [8.0, 4.0, 8.0, 3.0, 6.0], 5.0),
+]
+
+
+def make_clip(leading: float, segments: list, trailing: float, seed: int = 0) -> np.ndarray:
+    """Speech segments separated by quiet background noise."""
+    rng = np.random.default_rng(seed)
+    parts = [0.002 * rng.standard_normal(int(leading * SAMPLE_RATE))]
+    for i, seconds in enumerate(segments):
+        if i % 2 == 0:
+            parts.append(make_signal(seconds, seed=seed + i))
+        else:
+            parts.append(0.002 * rng.standard_normal(int(seconds * SAMPLE_RATE)))
+    parts.append(0.002 * rng.standard_normal(int(trailing * SAMPLE_RATE)))
+    return np.concatenate(parts).astype(np.float32)
+
+
+def main():
+    try:
+        from app.core.audio_transcode import encode_opus
+        encode_opus(np.zeros(SAMPLE_RATE, dtype=np.float32))
+    except Exception:
+        encode_opus = None  # PyAV not installed: report compute only
+
+    compute_features(make_signal(1), SAMPLE_RATE)
+
+    print(f"{'clip s':>6} | {'speech s':>8} | {'ratio':>5} | {'vad ms':>6} | {'features ms':>17} | {'upload KB':>13}")
+    print("-" * 75)
+    for leading, segments, trailing in LAYOUTS:
+        audio = make_clip(leading, segments, trailing)
+        compacted, info = compact_speech(audio, SAMPLE_RATE)
+
+        t_vad = best_time(compact_speech, audio, SAMPLE_RATE)
+        t_full = best_time(compute_features, audio, SAMPLE_RATE)
+        t_trim = best_time(compute_features, compacted, SAMPLE_RATE)
+        upload = "n/a"
+        if encode_opus is not None:
+            upload = f"{len(encode_opus(audio)) / 1024:.0f} → {len(encode_opus(compacted)) / 1024:.0f}"
+
+        print(
+            f"{info['original_duration']:>6.1f} | {info['speech_duration']:>8.1f} | {info['speech_ratio']:>5.2f} | "
+            f"{t_vad * 1000:>6.2f} | {t_full * 1000:>7.2f} → {t_trim * 1000:>7.2f} | {upload:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
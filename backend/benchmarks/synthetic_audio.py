@@ -0,0 +1,81 @@
+"""
+Deterministic synthetic speech-like audio for benchmarks.
+
+Signals are a pitch-modulated harmonic stack with a syllable-rate envelope,
+optional pauses and background noise; the same (duration, sr, seed) always
+gives the same samples. `encode` packs them into the containers clients
+upload (WAV, FLAC, and WebM/Opus when PyAV is installed).
+"""
+
+import io
+from typing import List
+import numpy as np
+import soundfile as sf
+
+try:
+    import av
+except ImportError:
+    av = None
+
+SAMPLE_RATE = 16000
+CONTENT_TYPES = {"wav": "audio/wav", "flac": "audio/flac", "webm": "audio/webm"}
+
+
+def make_signal(duration: float, sr: int = SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    """Deterministic speech-like test signal: a modulated harmonic stack plus noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sr)) / sr
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    # Harmonics above Nyquist would alias at low sample rates
+    n_harmonics = max(1, min(7, int((sr / 2) // 200)))
+    voiced = sum(np.sin(k * phase) / k for k in range(1, n_harmonics + 1))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 3.0 * t)) ** 2
+    return (0.3 * envelope * voiced + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def make_speech(
+    duration: float,
+    sr: int = SAMPLE_RATE,
+    seed: int = 0,
+    pause_every: float = 4.0,
+    pause_seconds: float = 0.6,
+    noise_level: float = 0.002,
+) -> np.ndarray:
+    """`make_signal` with regular pauses (quiet background noise) every `pause_every` seconds."""
+    audio = make_signal(duration, sr, seed)
+    if pause_every > 0 and pause_seconds > 0:
+        rng = np.random.default_rng(seed + 1)
+        t = np.arange(len(audio)) / sr
+        in_pause = (t % pause_every) >= (pause_every - pause_seconds)
+        audio[in_pause] = noise_level * rng.standard_normal(int(in_pause.sum())).astype(np.float32)
+    return audio
+
+
+def available_containers() -> List[str]:
+    return ["wav", "flac"] + (["webm"] if av is not None else [])
+
+
+def encode(audio: np.ndarray, sr: int, container: str) -> bytes:
+    """Encode mono float32 samples as an upload in `container`."""
+    if container in ("wav", "flac"):
+        buffer = io.BytesIO()
+        sf.write(buffer, audio, sr, format=container.upper(), subtype="PCM_16")
+        return buffer.getvalue()
+    if container == "webm":
+        if av is None:
+            raise RuntimeError("PyAV is required for webm output")
+        # Opus only supports 8/12/16/24/48 kHz; browsers record at 48 kHz
+        buffer = io.BytesIO()
+        with av.open(buffer, mode="w", format="webm") as out:
+            stream = out.add_stream("libopus", rate=48000, layout="mono")
+            stream.bit_rate = 32000
+            frame = av.AudioFrame.from_ndarray(audio.reshape(1, -1).astype(np.float32), format="flt", layout="mono")
+            frame.sample_rate = sr
+            # The encoder resamples to its own rate
+            for packet in stream.encode(frame):
+                out.mux(packet)
+            for packet in stream.encode(None):
+                out.mux(packet)
+        return buffer.getvalue()
+    raise ValueError(f"Unsupported container '{container}'")
@@ -0,0 +1,228 @@
+"""
+Voice pipeline benchmark suite.
+
+Generates deterministic synthetic speech (see `benchmarks.synthetic_audio`)
+for every combination of duration, sample rate and container, and times each
+stage of the voice path in-process:
+
+- decode:   container bytes -> 16 kHz mono float32
+- features: VAD trim + fused MFCC/ZCR/centroid/RMS extraction
+- classify: the active stress classifier (CNN if configured, else mock)
+- route:    POST /api/voice/voice end to end through the FastAPI app
+
+Each stage reports the median wall time over --repeats runs and the peak
+traced allocation of one extra run under tracemalloc (numpy buffers are
+traced; memory held inside native decoders is not). Results can be stored as
+a baseline and later runs compared against it; the exit status is 1 when a
+stage is slower or larger than the baseline by more than --tolerance.
+
+Run from the backend directory:
+    python -m benchmarks.voice_suite --save-baseline
+    python -m benchmarks.voice_suite
+    python -m benchmarks.voice_suite --durations 5 --containers wav --no-route
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from app.core.audio_decode import decode_audio
+from app.core.audio_features import compute_features
+from app.core.vad import trim_for_analysis
+from app.core.voice_model import get_classifier
+from benchmarks.synthetic_audio import CONTENT_TYPES, available_containers, encode, make_speech
+
+DEFAULT_BASELINE = Path(__file__).parent / "results" / "voice_baseline.json"
+ANALYSIS_SAMPLE_RATE = 16000
+STAGES = ["decode", "features", "classify", "route"]
+MIN_REGRESSION_MS = 1.0      # Ignore slowdowns smaller than this (timer noise on short stages)
+MIN_REGRESSION_KB = 64.0
+
+
+def parse_list(value: str, cast):
+    return [cast(item) for item in value.split(",") if item]
+
+
+def case_name(container: str, sr: int, duration: float) -> str:
+    return f"{container}-{sr // 1000}k-{duration:g}s"
+
+
+def measure(fn, make_input, repeats: int) -> dict:
+    """Median time over `repeats` runs, then peak traced memory of one more run."""
+    timings = []
+    for i in range(repeats):
+        arg = make_input(i)
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+
+    arg = make_input(repeats)
+    tracemalloc.start()
+    try:
+        fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"ms": round(statistics.median(timings) * 1000, 3), "peak_kb": round(peak / 1024, 1)}
+
+
+def route_client():
+    """In-process client for the FastAPI app, or None if the test client is unavailable."""
+    try:
+        from fastapi.testclient import TestClient
+        from app.main import app
+    except ImportError as e:
+        print(f"⚠️ Skipping route stage: {e}")
+        return None
+    return TestClient(app)
+
+
+def run_case(container: str, sr: int, duration: float, repeats: int, client) -> dict:
+    classifier = get_classifier()
+
+    def upload(seed: int) -> bytes:
+        return encode(make_speech(duration, sr, seed=seed), sr, container)
+
+    data = upload(0)
+    decoded, _ = decode_audio(data, ANALYSIS_SAMPLE_RATE)
+    trimmed, _ = trim_for_analysis(decoded, ANALYSIS_SAMPLE_RATE)
+    mfcc = compute_features(trimmed, ANALYSIS_SAMPLE_RATE)["mfcc"]
+
+    def extract(audio):
+        audio, _ = trim_for_analysis(audio, ANALYSIS_SAMPLE_RATE)
+        return compute_features(audio, ANALYSIS_SAMPLE_RATE)
+
+    result = {
+        "bytes": len(data),
+        "decode": measure(lambda d: decode_audio(d, ANALYSIS_SAMPLE_RATE), lambda i: data, repeats),
+        "features": measure(extract, lambda i: decoded, repeats),
+        "classify": measure(classifier.predict, lambda i: mfcc, repeats),
+    }
+
+    if client is not None:
+        # A new seed per run so the analysis/feature caches never short-circuit the route
+        uploads = {}
+
+        def post(seed: int):
+            response = client.post(
+                "/api/voice/voice",
+                params={"profile": "accurate"},
+                files={"audio": (f"bench.{container}", uploads.pop(seed), CONTENT_TYPES[container])},
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/voice/voice returned {response.status_code}: {response.text}")
+
+        def route_input(i: int) -> int:
+            seed = 1000 + i
+            uploads[seed] = upload(seed)
+            return seed
+
+        result["route"] = measure(post, route_input, repeats)
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """List of regression descriptions (time or memory beyond tolerance)."""
+    regressions = []
+    for case, stages in results.items():
+        base_stages = baseline.get(case)
+        if not base_stages:
+            continue
+        for stage in STAGES:
+            current, base = stages.get(stage), base_stages.get(stage)
+            if not current or not base:
+                continue
+            if current["ms"] > base["ms"] * (1 + tolerance) and current["ms"] - base["ms"] > MIN_REGRESSION_MS:
+                regressions.append(f"{case} {stage}: {base['ms']:.2f} -> {current['ms']:.2f} ms")
+            if (current["peak_kb"] > base["peak_kb"] * (1 + tolerance)
+                    and current["peak_kb"] - base["peak_kb"] > MIN_REGRESSION_KB):
+                regressions.append(f"{case} {stage}: {base['peak_kb']:.0f} -> {current['peak_kb']:.0f} KB peak")
+    return regressions
+
+
+def change(current: float, base) -> str:
+    if not base:
+        return ""
+    return f"{(current - base) / base:+.0%}"
+
+
+def print_results(results: dict, baseline: dict):
+    print(f"{'case':>16} | {'stage':>8} | {'ms':>9} | {'vs base':>7} | {'peak KB':>9} | {'vs base':>7}")
+    print("-" * 72)
+    for case, stages in results.items():
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            current = stages[stage]
+            base = baseline.get(case, {}).get(stage, {})
+            print(
+                f"{case:>16} | {stage:>8} | {current['ms']:>9.2f} | {change(current['ms'], base.get('ms')):>7} | "
+                f"{current['peak_kb']:>9.0f} | {change(current['peak_kb'], base.get('peak_kb')):>7}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the voice analysis pipeline on synthetic audio.")
+    parser.add_argument("--durations", default="5,30,60", help="Clip lengths in seconds (comma-separated)")
+    parser.add_argument("--sample-rates", default="16000,48000", help="Source sample rates (comma-separated)")
+    parser.add_argument("--containers", default=",".join(available_containers()),
+                        help=f"Containers to encode (available: {', '.join(available_containers())})")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-route", action="store_true", help="Skip the end-to-end /api/voice/voice stage")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown/growth before failing")
+    args = parser.parse_args(argv)
+
+    containers = parse_list(args.containers, str)
+    unsupported = set(containers) - set(available_containers())
+    if unsupported:
+        parser.error(f"container(s) not available here: {', '.join(sorted(unsupported))}")
+
+    client = None if args.no_route else route_client()
+    results = {}
+    for container in containers:
+        for sr in parse_list(args.sample_rates, int):
+            for duration in parse_list(args.durations, float):
+                name = case_name(container, sr, duration)
+                print(f"⏱️ {name}")
+                results[name] = run_case(container, sr, duration, args.repeats, client)
+
+    baseline = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text()).get("results", {})
+
+    print()
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeats": args.repeats,
+            "results": results,
+        }, indent=2))
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Import the JSON file fallback (data/users, data/conversations) into SQLite.
+
+Existing rows with the same userId/sessionId are replaced, so the import can
+be re-run. Set OFFLINE_STORAGE=sqlite afterwards to use the database.
+
+Run from the backend directory:
+    python -m tools.migrate_to_sqlite
+    python -m tools.migrate_to_sqlite --db data/serenova.db --batch-size 1000
+"""
+
+import argparse
+import sys
+import time
+from app.core.json_store import CONVERSATIONS_DIR, USERS_DIR, JsonConversationStore, JsonFileStore
+from app.core.sqlite_store import SQLITE_PATH, SqliteConversationStore, SqliteDatabase, SqliteDocumentStore
+
+
+def batches(items, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import JSON file storage into SQLite")
+    parser.add_argument("--db", default=SQLITE_PATH, help="SQLite database file")
+    parser.add_argument("--users-dir", default=USERS_DIR)
+    parser.add_argument("--conversations-dir", default=CONVERSATIONS_DIR)
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per transaction")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    db = SqliteDatabase(args.db)
+    users, conversations = SqliteDocumentStore(db), SqliteConversationStore(db)
+
+    user_count = 0
+    for batch in batches(JsonFileStore(args.users_dir).scan(), args.batch_size):
+        users.put_many({doc["profile"]["userId"]: doc for doc in batch})
+        user_count += len(batch)
+
+    conversation_count = 0
+    for batch in batches(JsonConversationStore(args.conversations_dir).scan(), args.batch_size):
+        conversations.save_many(batch)
+        conversation_count += len(batch)
+
+    print(
+        f"Imported {user_count} users and {conversation_count} conversations into {args.db} "
+        f"in {time.perf_counter() - start:.2f}s",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
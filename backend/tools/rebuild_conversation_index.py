@@ -0,0 +1,61 @@
+"""
+Rebuild the per-user conversation index of the file storage fallback.
+
+Reads every conversation file under data/conversations (sharded and
+pre-sharding top-level files), moves top-level files into their shard
+directory and replaces `_index/` with an index built from the files.
+
+Run from the backend directory:
+    python -m tools.rebuild_conversation_index
+    python -m tools.rebuild_conversation_index --no-migrate
+"""
+
+import argparse
+import os
+import sys
+import time
+from app.core.json_store import CONVERSATIONS_DIR, CONVERSATION_SHARD_CHARS, JsonFileStore
+from app.core.conversation_index import UserIndex
+
+
+def migrate_legacy_files(files: JsonFileStore) -> int:
+    """Move top-level conversation files into their shard directory."""
+    moved = 0
+    for filename in os.listdir(files.directory):
+        legacy_path = os.path.join(files.directory, filename)
+        if not filename.endswith('.json') or not os.path.isfile(legacy_path):
+            continue
+        target = files.path(filename[:-len('.json')])
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.exists(target):
+            # Already rewritten into its shard; the top-level copy is stale
+            os.remove(legacy_path)
+        else:
+            os.replace(legacy_path, target)
+        moved += 1
+    return moved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the conversation file index")
+    parser.add_argument("--dir", default=CONVERSATIONS_DIR, help="Conversations directory")
+    parser.add_argument("--no-migrate", action="store_true", help="Leave top-level files where they are")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    files = JsonFileStore(args.dir, shard_chars=CONVERSATION_SHARD_CHARS)
+    if not args.no_migrate:
+        moved = migrate_legacy_files(files)
+        print(f"Moved {moved} conversation files into shard directories", file=sys.stderr)
+
+    counts = UserIndex(args.dir).rebuild(files.scan())
+    print(
+        f"Indexed {counts['conversations']} conversations for {counts['users']} users "
+        f"in {time.perf_counter() - start:.2f}s",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Re-score stored voice analyses with the current classifier.
+
+Reads MFCC matrices from the `voice_features` collection (no audio is
+decoded), classifies them in batches and records the new result under
+`rescored` on each `voice_analyses` document. Only features computed with
+--profile (the one the classifier was trained on, "accurate" by default)
+are scored; others are skipped and counted.
+
+Run from the backend directory:
+    python -m tools.rescore_voice --model-name cnn-v2
+    python -m tools.rescore_voice --model-name cnn-v2-fast --profile fast
+    python -m tools.rescore_voice --report        # storage cost only
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pymongo import UpdateOne
+from app.core.analysis_profiles import PROFILES, ACCURATE
+from app.core.database import get_database
+from app.core.feature_store import decode_mfcc, stored_profile, storage_report
+from app.core.voice_model import get_classifier
+
+
+def flush(db, classifier, batch, model_name: str, profile: str, dry_run: bool) -> dict:
+    """Score one batch of feature documents; returns {stress_level: count}."""
+    predictions = classifier.predict_batch([decode_mfcc(doc) for doc in batch])
+    updates, levels = [], {}
+    for doc, (stress_level, emotion, confidence, emotion_scores, stress_score) in zip(batch, predictions):
+        levels[stress_level] = levels.get(stress_level, 0) + 1
+        updates.append(UpdateOne({"_id": doc["analysisId"]}, {"$set": {"rescored": {
+            "model": model_name,
+            "profile": profile,
+            "stressLevel": stress_level,
+            "emotion": emotion,
+            "confidence": confidence,
+            "emotionScores": emotion_scores,
+            "stressScore": round(float(stress_score), 4),
+            "rescoredAt": datetime.now()
+        }}}))
+    if updates and not dry_run:
+        db.voice_analyses.bulk_write(updates, ordered=False)
+    return levels
+
+
+def print_report(report: dict):
+    if not report["count"]:
+        print("No stored voice features", file=sys.stderr)
+        return
+    print(
+        f"Stored features: {report['count']} analyses, {report['bytes'] / 1024:.0f}KB total, "
+        f"{report['avg_bytes'] / 1024:.1f}KB per analysis "
+        f"({report['ratio']:.0%} of float32, {report['raw_bytes'] / 1024:.0f}KB)",
+        file=sys.stderr
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score stored voice features")
+    parser.add_argument("--model-name", default="current", help="Label recorded with the new scores")
+    parser.add_argument("--user", help="Only re-score this userId")
+    parser.add_argument("--profile", choices=list(PROFILES), default=ACCURATE,
+                        help="Analysis profile the classifier expects; features from other profiles are skipped")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--dry-run", action="store_true", help="Score but don't write results")
+    parser.add_argument("--report", action="store_true", help="Only print storage cost")
+    args = parser.parse_args(argv)
+
+    db = get_database()
+    if db is None:
+        print("MongoDB is not configured", file=sys.stderr)
+        return 1
+
+    print_report(storage_report(db))
+    if args.report:
+        return 0
+
+    classifier = get_classifier()
+    query = {"userId": args.user} if args.user else {}
+    cursor = db.voice_features.find(query).batch_size(args.batch_size)
+
+    start = time.perf_counter()
+    scored, skipped, levels, batch = 0, {}, {}, []
+    for doc in cursor:
+        profile = stored_profile(doc)
+        if profile != args.profile:
+            skipped[profile] = skipped.get(profile, 0) + 1
+            continue
+        batch.append(doc)
+        if len(batch) >= args.batch_size:
+            for level, count in flush(db, classifier, batch, args.model_name, args.profile, args.dry_run).items():
+                levels[level] = levels.get(level, 0) + count
+            scored += len(batch)
+            batch = []
+            print(f"  {scored} analyses re-scored", file=sys.stderr)
+    if batch:
+        for level, count in flush(db, classifier, batch, args.model_name, args.profile, args.dry_run).items():
+            levels[level] = levels.get(level, 0) + count
+        scored += len(batch)
+
+    elapsed = time.perf_counter() - start
+    rate = scored / elapsed if elapsed else 0
+    print(
+        f"Re-scored {scored} analyses in {elapsed:.1f}s ({rate:.0f}/s){' [dry run]' if args.dry_run else ''}: "
+        + ", ".join(f"{level}={count}" for level, count in sorted(levels.items())),
+        file=sys.stderr
+    )
+    if skipped:
+        print(
+            f"Skipped {sum(skipped.values())} analyses computed with another profile: "
+            + ", ".join(f"{profile or 'unknown'}={count}" for profile, count in sorted(skipped.items(), key=lambda item: str(item[0]))),
+            file=sys.stderr
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
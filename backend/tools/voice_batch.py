@@ -0,0 +1,64 @@
+"""
+Score a folder of voice recordings.
+
+Run from the backend directory:
+    python -m tools.voice_batch path/to/recordings --format csv --output results.csv
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from app.core.voice_batch import analyze_batch, to_csv, to_ndjson
+
+AUDIO_EXTENSIONS = {".wav", ".flac", ".ogg", ".mp3", ".webm", ".m4a", ".mp4", ".opus"}
+
+
+def find_recordings(folder: Path, recursive: bool):
+    pattern = "**/*" if recursive else "*"
+    return sorted(p for p in folder.glob(pattern) if p.suffix.lower() in AUDIO_EXTENSIONS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch voice stress analysis")
+    parser.add_argument("folder", type=Path, help="Folder containing recordings")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--output", type=Path, help="Output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--batch-size", type=int, default=64, help="Files decoded and scored per batch")
+    parser.add_argument("--recursive", action="store_true")
+    args = parser.parse_args(argv)
+
+    paths = find_recordings(args.folder, args.recursive)
+    if not paths:
+        print(f"No recordings found in {args.folder}", file=sys.stderr)
+        return 1
+
+    rows, totals = [], {"files": 0, "failed": 0, "seconds": 0.0, "audio_seconds": 0.0}
+    for start in range(0, len(paths), args.batch_size):
+        batch = paths[start:start + args.batch_size]
+        items = [(str(p.relative_to(args.folder)), p.read_bytes()) for p in batch]
+        batch_rows, throughput = analyze_batch(items, workers=args.workers, processes=True)
+        rows.extend(batch_rows)
+        for key in totals:
+            totals[key] += throughput[key]
+        print(f"  {totals['files']}/{len(paths)} files, {throughput['files_per_second']} files/s", file=sys.stderr)
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        (to_csv if args.format == "csv" else to_ndjson)(rows, out)
+    finally:
+        if args.output:
+            out.close()
+
+    rate = totals["files"] / totals["seconds"] if totals["seconds"] else 0
+    print(
+        f"Scored {totals['files']} files ({totals['failed']} failed, {totals['audio_seconds']:.0f}s of audio) "
+        f"in {totals['seconds']:.1f}s: {rate:.1f} files/s",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -43,6 +43,8 @@ export default function SupportBot() {
   const shouldReduceMotion = useReducedMotion()
   const chatEndRef = useRef<HTMLDivElement>(null)
   const inputRef = useRef<HTMLInputElement>(null)
+  // Last sequence number the server acknowledged for this session (appends send only newer messages)
+  const savedSeq = useRef({ sessionId: '', seq: 0 })
 
   useEffect(() => {
     // Load user-specific chat history
@@ -224,31 +226,48 @@ export default function SupportBot() {
       // Get userId directly from localStorage (set by Auth.tsx)
       const actualUserId = localStorage.getItem('userId') || 'anonymous'
 
-      console.log('💾 Saving conversation...', {
-        sessionId: intakeSummary.sessionId,
-        userId: actualUserId,
-        messageCount: conversationMessages.length
-      })
+      if (savedSeq.current.sessionId !== intakeSummary.sessionId) {
+        savedSeq.current = { sessionId: intakeSummary.sessionId, seq: 0 }
+      }
 
-      const response = await fetch(`${API_URL}/api/conversations/save`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
+      const appendFrom = async (afterSeq: number) => {
+        const newMessages = conversationMessages.slice(afterSeq)
+        console.log('💾 Saving conversation...', {
           sessionId: intakeSummary.sessionId,
           userId: actualUserId,
-          messages: conversationMessages.map(m => ({
-            role: m.role,
-            content: m.content,
-            timestamp: new Date().toISOString()
-          })),
-          intakeSummary: intakeSummary.summary,
-          mainEmotion: intakeSummary.mainEmotion,
-          riskLevel: intakeSummary.riskLevel
+          afterSeq,
+          newMessages: newMessages.length
         })
-      })
+
+        return fetch(`${API_URL}/api/conversations/append`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({
+            sessionId: intakeSummary.sessionId,
+            userId: actualUserId,
+            afterSeq,
+            messages: newMessages.map(m => ({
+              role: m.role,
+              content: m.content,
+              timestamp: new Date().toISOString()
+            })),
+            intakeSummary: intakeSummary.summary,
+            mainEmotion: intakeSummary.mainEmotion,
+            riskLevel: intakeSummary.riskLevel
+          })
+        })
+      }
+
+      let response = await appendFrom(savedSeq.current.seq)
+      if (response.status === 409) {
+        // The server has fewer messages than we thought: resend from its sequence number
+        const conflict = await response.json()
+        response = await appendFrom(conflict.detail.seq)
+      }
 
       if (response.ok) {
         const result = await response.json()
+        savedSeq.current.seq = result.seq
         console.log('✅ Conversation saved successfully:', result)
       } else {
         const errorText = await response.text()